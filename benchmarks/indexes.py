@@ -0,0 +1,168 @@
+"""
+Бенчмарк индексов горячих фильтров: benchmarks/indexes.py
+Заполняет временную БД SQLite синтетическим журналом простоев и задач, выполняет запросы репозиториев
+SuspensionRepository и TaskRepository без индексов и с индексами из моделей, печатает EXPLAIN QUERY PLAN и задержку.
+
+python -m benchmarks.indexes  # 1 000 000 простоев
+python -m benchmarks.indexes --rows 100000 --repeat 5
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from src.core.db.models import Base, Suspension, SuspensionsFiles, Task, TasksFiles
+from src.core.db.repository import SuspensionRepository, TaskRepository
+
+USERS = 50
+PAGE = 100
+SQLITE_DATE_TIME = "%Y-%m-%d %H:%M:%S.%f"  # формат хранения DateTime в SQLite у SQLAlchemy
+SQLITE_DATE = "%Y-%m-%d"
+INDEXED_TABLES = (Suspension.__table__, Task.__table__, TasksFiles.__table__, SuspensionsFiles.__table__)
+
+
+def fill_database(sync_engine: Engine, rows: int) -> None:
+    """Заполняет БД: пользователи, rows простоев, rows / 10 задач, rows / 100 файлов с отношениями."""
+    now = datetime.now()
+    rnd = random.Random(42)
+    with sync_engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO user (id, email, hashed_password, is_active, is_superuser, is_verified) "
+            "VALUES (?, ?, 'hash', 1, 0, 1)",
+            [(user_id, f"user_{user_id}@bench.com") for user_id in range(1, USERS + 1)]
+        )
+        suspensions = []
+        for suspension_id in range(1, rows + 1):
+            start = now - timedelta(minutes=rnd.randrange(2 * 365 * 24 * 60))
+            suspensions.append((
+                suspension_id, "bench", start.strftime(SQLITE_DATE_TIME),
+                (start + timedelta(minutes=rnd.randrange(1, 240))).strftime(SQLITE_DATE_TIME),
+                rnd.randrange(1, 10), "bench", rnd.randrange(1, USERS + 1),
+            ))
+        connection.exec_driver_sql(
+            "INSERT INTO suspensions (id, risk_accident, suspension_start, suspension_finish, tech_process, "
+            "implementing_measures, user_id, description) VALUES (?, ?, ?, ?, ?, ?, ?, 'bench')",
+            suspensions
+        )
+        tasks = []
+        for task_id in range(1, rows // 10 + 1):
+            task_start = (now - timedelta(days=rnd.randrange(2 * 365))).date()
+            tasks.append((
+                task_id, "bench", task_start.strftime(SQLITE_DATE),
+                (task_start + timedelta(days=rnd.randrange(1, 60))).strftime(SQLITE_DATE),
+                rnd.randrange(1, 10), rnd.randrange(1, USERS + 1), rnd.randrange(1, USERS + 1), rnd.random() < 0.8,
+            ))
+        connection.exec_driver_sql(
+            "INSERT INTO tasks (id, task, task_start, deadline, tech_process, user_id, executor_id, is_archived, "
+            "description) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'bench')",
+            tasks
+        )
+        files = max(rows // 100, 1)
+        connection.exec_driver_sql(
+            "INSERT INTO files (id, name, file) VALUES (?, ?, x'00')",
+            [(file_id, f"file_{file_id}.pdf") for file_id in range(1, files + 1)]
+        )
+        connection.exec_driver_sql(
+            "INSERT OR IGNORE INTO suspensions_files (suspension_id, file_id) VALUES (?, ?)",
+            [(rnd.randrange(1, rows + 1), rnd.randrange(1, files + 1)) for _ in range(files * 3)]
+        )
+        connection.exec_driver_sql(
+            "INSERT OR IGNORE INTO tasks_files (task_id, file_id) VALUES (?, ?)",
+            [(rnd.randrange(1, rows // 10 + 1), rnd.randrange(1, files + 1)) for _ in range(files * 3)]
+        )
+
+
+def set_indexes(sync_engine: Engine, create: bool) -> None:
+    """Удаляет или создает индексы, объявленные в моделях (кроме ix_user_email), и обновляет статистику."""
+    with sync_engine.begin() as connection:
+        for table in INDEXED_TABLES:
+            for index in table.indexes:
+                if create:
+                    index.create(connection)
+                else:
+                    index.drop(connection, checkfirst=True)
+        connection.exec_driver_sql("ANALYZE")
+
+
+def cases(session: AsyncSession) -> dict[str, Callable[[], Awaitable]]:
+    """Запросы репозиториев, которые выполняют эндпоинты аналитики и списков."""
+    suspensions, tasks = SuspensionRepository(session), TaskRepository(session)
+    user_id, finish = 7, datetime.now()
+    start = finish - timedelta(days=30)
+    return {
+        "analytics_all": lambda: suspensions.get_analytics_for_period_for_user(None, start, finish),
+        "analytics_user": lambda: suspensions.get_analytics_for_period_for_user(user_id, start, finish),
+        "period_page_all": lambda: suspensions.get_suspensions_for_period_for_user(None, start, finish, PAGE),
+        "period_page_user": lambda: suspensions.get_suspensions_for_period_for_user(user_id, start, finish, PAGE),
+        "my_suspensions_page": lambda: suspensions.get_suspensions_for_user(user_id, PAGE),
+        "suspensions_page": lambda: suspensions.get_all(PAGE),
+        "tasks_opened_page": lambda: tasks.get_all_opened(PAGE),
+        "my_tasks_ordered_page": lambda: tasks.get_tasks_ordered(user_id, PAGE),
+        "my_tasks_todo_page": lambda: tasks.get_tasks_todo(user_id, PAGE),
+    }
+
+
+async def measure(async_engine: AsyncEngine, sync_engine: Engine, repeat: int) -> dict[str, tuple[float, list[str]]]:
+    """Медиана задержки (мс) и план первого запроса для каждого сценария."""
+    statements: list[tuple[str, tuple]] = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", collect)
+    results = {}
+    async with AsyncSession(async_engine) as session:
+        for name, query in cases(session).items():
+            timings = []
+            for _ in range(repeat):
+                statements.clear()
+                started = time.perf_counter()
+                await query()
+                timings.append((time.perf_counter() - started) * 1000)
+                session.expunge_all()
+            statement, parameters = statements[0]
+            with sync_engine.connect() as connection:
+                plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            results[name] = statistics.median(timings), [row[-1] for row in plan]
+    event.remove(async_engine.sync_engine, "before_cursor_execute", collect)
+    return results
+
+
+async def main(rows: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp).joinpath("bench.db")
+        sync_engine = create_engine(f"sqlite:///{db_path}")
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        Base.metadata.create_all(sync_engine)
+        set_indexes(sync_engine, create=False)
+        started = time.perf_counter()
+        fill_database(sync_engine, rows)
+        print(f"filled {rows} suspensions in {time.perf_counter() - started:.1f}s")
+        before = await measure(async_engine, sync_engine, repeat)
+        started = time.perf_counter()
+        set_indexes(sync_engine, create=True)
+        print(f"indexes created in {time.perf_counter() - started:.1f}s")
+        after = await measure(async_engine, sync_engine, repeat)
+        await async_engine.dispose()
+        sync_engine.dispose()
+    print(f"\n{'case':<24}{'before, ms':>12}{'after, ms':>12}{'speedup':>10}")
+    for name, (before_ms, _) in before.items():
+        after_ms = after[name][0]
+        print(f"{name:<24}{before_ms:>12.2f}{after_ms:>12.2f}{before_ms / after_ms:>9.1f}x")
+    for name in before:
+        print(f"\n{name}\n  before: {' | '.join(before[name][1])}\n  after:  {' | '.join(after[name][1])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN и задержка запросов репозиториев без индексов и с ними.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="количество простоев в журнале")
+    parser.add_argument("--repeat", type=int, default=20, help="повторов каждого запроса")
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.rows, arguments.repeat))
@@ -0,0 +1,84 @@
+"""
+Бенчмарк восстановления БД из бэкапов: benchmarks/restore.py
+Создает временную БД SQLite заданного размера (синтетические строки, сжимаются примерно вдвое, как текст журнала),
+делает полный бэкап, меняет 1% строк, делает инкремент и восстанавливает БД из полного снимка + инкремента
+с проверкой целостности и числа строк. Печатает время и объем каждого шага.
+
+python -m benchmarks.restore  # 100 МБ и 1 ГБ
+python -m benchmarks.restore --sizes 10 100
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from src.services.db_backup import DBBackupService
+
+ROW_BYTES = 1024
+ROW_DISK_BYTES = 1370  # a row with its page and b-tree overhead in the db file
+MB = 2**20
+
+
+def fill_database(path: Path, size_mb: int) -> int:
+    """Заполняет БД строками по ROW_BYTES (hex случайных байт) до size_mb; возвращает число строк."""
+    rows = size_mb * MB // ROW_DISK_BYTES
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE journal (id INTEGER PRIMARY KEY, payload TEXT NOT NULL)")
+        for first in range(0, rows, 10_000):
+            connection.executemany(
+                "INSERT INTO journal (id, payload) VALUES (?, ?)",
+                [(row_id, os.urandom(ROW_BYTES // 2).hex()) for row_id in range(first, min(first + 10_000, rows))],
+            )
+    return rows
+
+
+def change_rows(path: Path, rows: int, share: float = 0.01) -> None:
+    """Меняет share строк, разбросанных по всей БД."""
+    step = int(1 / share)
+    with sqlite3.connect(path) as connection:
+        connection.executemany(
+            "UPDATE journal SET payload = ? WHERE id = ?",
+            [(os.urandom(ROW_BYTES // 2).hex(), row_id) for row_id in range(0, rows, step)],
+        )
+
+
+async def measure(size_mb: int) -> dict[str, float]:
+    """Время (с) и объем (МБ) полного бэкапа, инкремента и восстановления для БД размера size_mb."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source, folder = Path(tmp).joinpath("bench.db"), Path(tmp).joinpath("backups")
+        rows = fill_database(source, size_mb)
+        backup_service = DBBackupService()
+        backup_service.db_path = source
+        full = await backup_service.make_copy_db(folder)
+        change_rows(source, rows)
+        incremental = await backup_service.make_copy_db(folder)
+        started = time.perf_counter()
+        report = await backup_service.restore_db(incremental.created_at, folder, Path(tmp).joinpath("restored.db"))
+        restore_sec = time.perf_counter() - started
+    return {
+        "db_mb": report.size_bytes / MB,
+        "full_sec": full.duration_sec,
+        "full_mb": full.size_bytes / MB,
+        "incremental_sec": incremental.duration_sec,
+        "incremental_mb": incremental.size_bytes / MB,
+        "restore_sec": restore_sec,
+        "restore_mb_per_sec": report.size_bytes / MB / restore_sec,
+    }
+
+
+async def main(sizes: list[int]) -> None:
+    results = {size: await measure(size) for size in sizes}
+    columns = next(iter(results.values())).keys()
+    print("".join(f"{column:>20}" for column in columns))
+    for result in results.values():
+        print("".join(f"{value:>20.2f}" for value in result.values()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Время бэкапа и восстановления БД из полного снимка и инкремента.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000], help="размеры БД в МБ")
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.sizes))
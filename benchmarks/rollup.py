@@ -0,0 +1,135 @@
+"""
+Бенчмарк дневных итогов простоев: benchmarks/rollup.py
+Заполняет временную БД SQLite синтетическим журналом простоев за два года (триггеры ведут suspension_daily_rollup),
+сравнивает итоги аналитики за год и за месяц по всем простоям периода (прежний запрос) и по дневным итогам
+с краями периода (SuspensionRepository.get_period_totals). Печатает задержку, ускорение и стоимость записи.
+
+python -m benchmarks.rollup  # 1 000 000 простоев
+python -m benchmarks.rollup --rows 100000 --repeat 5
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import Engine, create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from src.core.db.daily_rollup import DAILY_ROLLUP_TRIGGER, sqlite_daily_rollup_ddl
+from src.core.db.expressions import days_between
+from src.core.db.models import Base, Suspension
+from src.core.db.repository import SuspensionRepository
+
+USERS = 5
+TECH_PROCESSES = 3  # как в TECH_PROCESS настроек: несколько тех-процессов на нескольких пользователей
+SQLITE_DATE_TIME = "%Y-%m-%d %H:%M:%S.%f"  # формат хранения DateTime в SQLite у SQLAlchemy
+
+
+def suspension_rows(rows: int) -> list[tuple]:
+    now = datetime.now()
+    rnd = random.Random(42)
+    suspensions = []
+    for _ in range(rows):
+        start = now - timedelta(minutes=rnd.randrange(2 * 365 * 24 * 60))
+        suspensions.append((
+            rnd.choice(("bench", "other", None)), start.strftime(SQLITE_DATE_TIME),
+            (start + timedelta(minutes=rnd.randrange(1, 240))).strftime(SQLITE_DATE_TIME),
+            rnd.randrange(1, TECH_PROCESSES + 1), rnd.randrange(1, USERS + 1),
+        ))
+    return suspensions
+
+
+def fill_database(sync_engine: Engine, suspensions: list[tuple], triggers: bool) -> float:
+    """Вставляет простои (с триггерами дневных итогов или без них) и возвращает время вставки в секундах."""
+    with sync_engine.begin() as connection:
+        for action in ("insert", "delete", "update"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {DAILY_ROLLUP_TRIGGER}_{action}")
+        if triggers:
+            for statement in sqlite_daily_rollup_ddl():
+                connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("DELETE FROM suspensions")
+        connection.exec_driver_sql(
+            "INSERT OR IGNORE INTO user (id, email, hashed_password, is_active, is_superuser, is_verified) "
+            "VALUES (?, ?, 'hash', 1, 0, 1)",
+            [(user_id, f"user_{user_id}@bench.com") for user_id in range(1, USERS + 1)]
+        )
+        started = time.perf_counter()
+        connection.exec_driver_sql(
+            "INSERT INTO suspensions (risk_accident, suspension_start, suspension_finish, tech_process, user_id, "
+            "implementing_measures, description) VALUES (?, ?, ?, ?, ?, 'bench', 'bench')",
+            suspensions
+        )
+        elapsed = time.perf_counter() - started
+        connection.exec_driver_sql("ANALYZE")
+    return elapsed
+
+
+def raw_totals(user_id: int | None, start_sample: datetime, finish_sample: datetime):
+    """Прежний запрос итогов: агрегат по всем простоям периода."""
+    duration = days_between(Suspension.suspension_start, Suspension.suspension_finish)
+    query = select(func.count(Suspension.id), func.sum(duration), func.max(duration)).where(
+        Suspension.suspension_start.between(start_sample, finish_sample)
+    )
+    return query if user_id is None else query.where(Suspension.user_id == user_id)
+
+
+async def measure(async_engine: AsyncEngine, repeat: int) -> dict[str, tuple[float, float]]:
+    """Медианы задержки (мс) запроса по простоям и по дневным итогам для каждого сценария."""
+    finish = datetime.now().replace(second=0, microsecond=0)
+    scenarios = {
+        "year_all": (None, finish - timedelta(days=365, hours=5)),
+        "year_user": (3, finish - timedelta(days=365, hours=5)),
+        "month_all": (None, finish - timedelta(days=30, hours=5)),
+        "month_user": (3, finish - timedelta(days=30, hours=5)),
+    }
+    results = {}
+    async with async_engine.connect() as connection:
+        for name, (user_id, start) in scenarios.items():
+            queries = (
+                raw_totals(user_id, start, finish),
+                select(SuspensionRepository.get_period_totals(user_id, start, finish)),
+            )
+            timings = {}
+            for number, query in enumerate(queries):
+                timings[number] = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    totals = (await connection.execute(query)).one()
+                    timings[number].append((time.perf_counter() - started) * 1000)
+                timings[number].append(totals)
+            raw, rollup = timings[0].pop(), timings[1].pop()
+            assert raw[0] == rollup[0] and abs(raw[1] - rollup[1]) < 1e-6, f"{name}: {raw} != {rollup}"
+            results[name] = statistics.median(timings[0]), statistics.median(timings[1])
+    return results
+
+
+async def main(rows: int, repeat: int) -> None:
+    suspensions = suspension_rows(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp).joinpath("bench.db")
+        sync_engine = create_engine(f"sqlite:///{db_path}")
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        Base.metadata.create_all(sync_engine)
+        without_triggers = fill_database(sync_engine, suspensions, triggers=False)
+        with_triggers = fill_database(sync_engine, suspensions, triggers=True)
+        with sync_engine.connect() as connection:
+            rollup_rows = connection.exec_driver_sql("SELECT count(*) FROM suspension_daily_rollup").scalar()
+        print(f"inserted {rows} suspensions: {without_triggers:.1f}s without triggers, {with_triggers:.1f}s with "
+              f"triggers ({with_triggers / without_triggers:.1f}x), {rollup_rows} rollup rows")
+        results = await measure(async_engine, repeat)
+        await async_engine.dispose()
+        sync_engine.dispose()
+    print(f"\n{'case':<16}{'raw, ms':>12}{'rollup, ms':>12}{'speedup':>10}")
+    for name, (raw_ms, rollup_ms) in results.items():
+        print(f"{name:<16}{raw_ms:>12.2f}{rollup_ms:>12.2f}{raw_ms / rollup_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Итоги аналитики за период: по простоям и по дневным итогам.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="количество простоев в журнале")
+    parser.add_argument("--repeat", type=int, default=20, help="повторов каждого запроса")
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.rows, arguments.repeat))
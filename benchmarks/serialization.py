@@ -0,0 +1,148 @@
+"""
+Бенчмарк сериализации ответов: benchmarks/serialization.py
+Собирает N словарей простоев (как perform_changed_schema) и сериализует их так же, как FastAPI для эндпоинта
+со схемой Sequence[AnalyticSuspensionResponse]: проверка схемой, model_dump(mode="json"), кодирование в JSON.
+Сравнивает прежнюю схему (длительность через strftime / strptime) со стандартным JSONResponse и текущую схему
+с FastJSONResponse (ujson), а также orjson, если он установлен. Печатает время этапов и запроса к эндпоинту.
+
+python -m benchmarks.serialization  # 10 000 простоев
+python -m benchmarks.serialization --rows 50000 --repeat 3
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections.abc import Callable, Sequence
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+from pydantic import PositiveInt, TypeAdapter, computed_field
+from src.api.constants import DATE_TIME_FORMAT, SUSPENSION_DURATION, SUSPENSION_DURATION_RESPONSE
+from src.api.responses import FastJSONResponse
+from src.api.schema import AnalyticSuspensionResponse
+from src.core.enums import RiskAccidentSource, TechProcess
+
+try:
+    import orjson
+except ImportError:  # not a dependency of the project: compared only if installed
+    orjson = None
+
+
+class LegacyAnalyticSuspensionResponse(AnalyticSuspensionResponse):
+    """Прежняя схема ответа: длительность через строку и обратно."""
+
+    @computed_field(alias=SUSPENSION_DURATION)
+    @property
+    def duration(self) -> PositiveInt | float:
+        suspension_finish = time.strptime(self.suspension_finish.strftime(DATE_TIME_FORMAT), DATE_TIME_FORMAT)
+        suspension_start = time.strptime(self.suspension_start.strftime(DATE_TIME_FORMAT), DATE_TIME_FORMAT)
+        return (time.mktime(suspension_finish) - time.mktime(suspension_start)) / SUSPENSION_DURATION_RESPONSE
+
+
+def suspension_rows(rows: int) -> list[dict]:
+    """Словари простоев в том виде, в каком их отдает SuspensionService.perform_changed_schema."""
+    now = datetime.now()
+    tech_process = next(iter(TechProcess))
+    return [
+        {
+            "id": number + 1,
+            "suspension_start": now - timedelta(minutes=10 * number + 7),
+            "suspension_finish": now - timedelta(minutes=10 * number),
+            "risk_accident": next(iter(RiskAccidentSource)).value,
+            "tech_process": int(tech_process.value),
+            "description": "Описание случая простоя для бенчмарка сериализации",
+            "implementing_measures": "Предпринятые действия",
+            "created_at": now,
+            "updated_at": now,
+            "business_process": tech_process.name,
+            "user_email": "bench@bench.com",
+            "user_id": 1,
+            "extra_files": [f"file_{number}.pdf"],
+        } for number in range(rows)
+    ]
+
+
+def median_ms(function: Callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def measure_stages(rows: list[dict], repeat: int) -> dict[str, dict[str, float]]:
+    """Время (мс) этапов сериализации FastAPI: проверка схемой, model_dump(mode="json") и кодирование."""
+    encoders = {
+        "json": lambda content: JSONResponse(content).body,
+        "ujson": lambda content: FastJSONResponse(content).body,
+    }
+    if orjson is not None:
+        encoders["orjson"] = orjson.dumps
+    results = {}
+    for name, schema in (("legacy", LegacyAnalyticSuspensionResponse), ("current", AnalyticSuspensionResponse)):
+        adapter = TypeAdapter(Sequence[schema])
+        value = adapter.validate_python(rows)
+        content = adapter.dump_python(value, mode="json", by_alias=True, exclude_none=True)
+        results[name] = {
+            "validate": median_ms(lambda: adapter.validate_python(rows), repeat),
+            "dump_json_mode": median_ms(
+                lambda: adapter.dump_python(value, mode="json", by_alias=True, exclude_none=True), repeat
+            ),
+        }
+        for encoder, encode in encoders.items():
+            results[name][encoder] = median_ms(lambda: encode(content), repeat)
+    return results
+
+
+async def measure_endpoint(rows: list[dict], repeat: int) -> dict[str, tuple[float, int]]:
+    """Медианная задержка (мс) и размер ответа эндпоинта, возвращающего простои, для каждого варианта."""
+    app = FastAPI()
+    variants = {
+        "legacy+json": (LegacyAnalyticSuspensionResponse, JSONResponse),
+        "current+ujson": (AnalyticSuspensionResponse, FastJSONResponse),
+    }
+    for name, (schema, response_class) in variants.items():
+        async def endpoint() -> Sequence[schema]:
+            return rows
+
+        app.get(f"/{name}", response_model_exclude_none=True, response_class=response_class)(endpoint)
+    results = {}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        bodies = {}
+        for name in variants:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                response = await client.get(f"/{name}")
+                timings.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.text
+            bodies[name] = response.content
+            results[name] = statistics.median(timings), len(response.content)
+    legacy_body, current_body = bodies.values()
+    assert json.loads(legacy_body) == json.loads(current_body), "The responses differ"
+    return results
+
+
+async def main(rows: int, repeat: int) -> None:
+    suspensions = suspension_rows(rows)
+    stages = measure_stages(suspensions, repeat)
+    columns = next(iter(stages.values())).keys()
+    print(f"{rows} suspensions, median of {repeat}, ms")
+    print(f"{'schema':<10}" + "".join(f"{column:>16}" for column in columns))
+    for name, result in stages.items():
+        print(f"{name:<10}" + "".join(f"{value:>16.2f}" for value in result.values()))
+    print(f"\n{'endpoint':<16}{'median_ms':>12}{'bytes':>12}")
+    for name, (latency, size) in (await measure_endpoint(suspensions, repeat)).items():
+        print(f"{name:<16}{latency:>12.2f}{size:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сериализация N простоев: прежняя схема и json, текущая и ujson.")
+    parser.add_argument("--rows", type=int, default=10_000, help="количество простоев в ответе")
+    parser.add_argument("--repeat", type=int, default=5, help="повторов каждого замера")
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.rows, arguments.repeat))
@@ -0,0 +1,129 @@
+"""
+Бенчмарк сессий запроса: benchmarks/sessions.py
+Поднимает приложение на временной БД SQLite и выполняет запросы к эндпоинтам простоев с прежней зависимостью
+get_session (фабрика сессий на каждый вызов, соединение берется из пула заново после каждого commit) и с текущей
+(одна сессия на одном соединении пула на весь запрос). Печатает число выдач соединения из пула на запрос и задержку.
+
+python -m benchmarks.sessions
+python -m benchmarks.sessions --requests 500
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from src.api.constants import (ANALYTICS, ANALYTICS_FINISH, ANALYTICS_START, DATE_TIME_FORMAT, IMPLEMENTING_MEASURES,
+                               MY_SUSPENSIONS, POST_SUSPENSION_FORM, RISK_ACCIDENT_SOURCE, SUSPENSION_DESCRIPTION,
+                               TECH_PROCESS)
+from src.api.router import api_router
+from src.core.db import db
+from src.core.db.db import get_session
+from src.core.db.models import Base, Suspension, User
+from src.core.db.user import current_user
+from src.settings import settings
+
+SUSPENSIONS = 1000
+SUSPENSIONS_PATH = settings.ROOT_PATH + "/suspensions"
+
+
+async def legacy_get_session():
+    """Прежняя зависимость: новая фабрика на каждый вызов, сессия без привязки к соединению."""
+    async_session_maker = async_sessionmaker(db.engine, expire_on_commit=False)
+    async with async_session_maker() as session:
+        yield session
+
+
+async def bench_user(session: AsyncSession = Depends(get_session)) -> User:
+    """Пользователь запроса читается через сессию запроса, как у fastapi-users, но без проверки JWT."""
+    return await session.get(User, 1)
+
+
+async def fill_database() -> None:
+    now = datetime.now()
+    async with db.engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(db.engine)() as session:
+        session.add(User(id=1, email="bench@bench.com", hashed_password="hash", is_active=True, is_verified=True))
+        session.add_all(
+            Suspension(
+                risk_accident=next(iter(json.loads(settings.RISK_SOURCE).values())),
+                description="bench",
+                suspension_start=now - timedelta(minutes=10 * number + 5),
+                suspension_finish=now - timedelta(minutes=10 * number),
+                tech_process=next(iter(json.loads(settings.TECH_PROCESS).values())),
+                implementing_measures="bench",
+                user_id=1,
+            ) for number in range(SUSPENSIONS)
+        )
+        await session.commit()
+
+
+def get_scenarios() -> dict[str, tuple[str, str, dict]]:
+    """Эндпоинты: чтение списков и аналитики и запись простоя (commit + refresh)."""
+    now = datetime.now()
+    return {
+        "analytics": ("GET", SUSPENSIONS_PATH + ANALYTICS, {
+            ANALYTICS_START: (now - timedelta(days=30)).strftime(DATE_TIME_FORMAT),
+            ANALYTICS_FINISH: now.strftime(DATE_TIME_FORMAT),
+        }),
+        "my_suspensions": ("GET", SUSPENSIONS_PATH + MY_SUSPENSIONS, {}),
+        "post_suspension_form": ("POST", SUSPENSIONS_PATH + POST_SUSPENSION_FORM, {
+            ANALYTICS_START: (now - timedelta(minutes=10)).strftime(DATE_TIME_FORMAT),
+            ANALYTICS_FINISH: (now - timedelta(minutes=5)).strftime(DATE_TIME_FORMAT),
+            SUSPENSION_DESCRIPTION: "bench",
+            IMPLEMENTING_MEASURES: "bench",
+            TECH_PROCESS: next(iter(json.loads(settings.TECH_PROCESS).values())),
+            RISK_ACCIDENT_SOURCE: next(iter(json.loads(settings.RISK_SOURCE).values())),
+        }),
+    }
+
+
+async def measure(app: FastAPI, method: str, url: str, params: dict, requests: int) -> tuple[float, float]:
+    """Среднее число выдач соединения из пула на запрос и медианная задержка запроса (мс)."""
+    checkouts, latencies = [], []
+
+    def _checkout(*args) -> None:
+        checkouts.append(1)
+
+    event.listen(db.engine.sync_engine.pool, "checkout", _checkout)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await client.request(method, url, params=params)
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.text
+    finally:
+        event.remove(db.engine.sync_engine.pool, "checkout", _checkout)
+    return len(checkouts) / requests, statistics.median(latencies)
+
+
+async def main(requests: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db.engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp).joinpath('bench.db')}")
+        await fill_database()
+        app = FastAPI()
+        app.include_router(api_router)
+        app.dependency_overrides[current_user] = bench_user
+        print(f"{'endpoint':<24}{'session':>10}{'checkouts':>12}{'median_ms':>12}")
+        for name, (method, url, params) in get_scenarios().items():
+            for session_name, dependency in (("legacy", legacy_get_session), ("request", get_session)):
+                app.dependency_overrides[get_session] = dependency
+                per_request, latency = await measure(app, method, url, params, requests)
+                print(f"{name:<24}{session_name:>10}{per_request:>12.2f}{latency:>12.2f}")
+        await db.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Выдачи соединений из пула на запрос: прежняя и текущая сессия.")
+    parser.add_argument("--requests", type=int, default=200, help="число запросов к каждому эндпоинту")
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.requests))
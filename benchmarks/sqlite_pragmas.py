@@ -0,0 +1,119 @@
+"""
+Бенчмарк профиля SQLite: benchmarks/sqlite_pragmas.py
+На временной БД SQLite с журналом простоев запускает N писателей (вставка простоя - отдельная транзакция,
+как отправка формы) и M читателей (агрегат длительности простоев, как аналитика) одновременно на заданное время:
+сначала с настройками SQLite по умолчанию (журнал отката), затем с профилем SQLITE_* из настроек.
+Печатает пропускную способность записи и чтения, ошибки "database is locked" и задержку записи.
+
+python -m benchmarks.sqlite_pragmas  # 4 писателя, 8 читателей, 10 с
+python -m benchmarks.sqlite_pragmas --writers 8 --readers 16 --seconds 20
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from src.core.db.db import set_sqlite_pragmas
+from src.core.db.expressions import days_between
+from src.core.db.models import Base, Suspension, User
+
+ROWS = 20_000
+
+
+def suspension_row(number: int) -> dict:
+    start = datetime.now() - timedelta(minutes=number % 100_000)
+    return {
+        "risk_accident": "bench",
+        "description": "bench",
+        "suspension_start": start,
+        "suspension_finish": start + timedelta(minutes=5),
+        "tech_process": 25,
+        "implementing_measures": "bench",
+        "user_id": 1,
+    }
+
+
+async def fill_database(engine: AsyncEngine) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(insert(User).values(id=1, email="bench@bench.com", hashed_password="hash"))
+        await connection.execute(insert(Suspension), [suspension_row(number) for number in range(ROWS)])
+
+
+async def write(engine: AsyncEngine, deadline: float, stats: dict) -> None:
+    """Писатель: вставка простоя отдельной транзакцией."""
+    number = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            async with engine.begin() as connection:
+                await connection.execute(insert(Suspension).values(**suspension_row(number)))
+            stats["write_ms"].append((time.perf_counter() - started) * 1000)
+        except OperationalError:  # database is locked
+            stats["errors"] += 1
+        number += 1
+
+
+async def read(engine: AsyncEngine, deadline: float, stats: dict) -> None:
+    """Читатель: число и суммарная длительность простоев."""
+    while time.perf_counter() < deadline:
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(select(
+                    func.count(), func.sum(days_between(Suspension.suspension_start, Suspension.suspension_finish))
+                ))
+            stats["reads"] += 1
+        except OperationalError:
+            stats["errors"] += 1
+
+
+async def measure(tuned: bool, writers: int, readers: int, seconds: float) -> dict[str, float]:
+    """Записей и чтений в секунду, ошибок блокировки и задержка записи (мс) для одного профиля."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp).joinpath('bench.db')}", pool_size=writers + readers, max_overflow=0
+        )
+        if tuned:
+            event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+        await fill_database(engine)
+        stats = {"write_ms": [], "reads": 0, "errors": 0}
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            *(write(engine, deadline, stats) for _ in range(writers)),
+            *(read(engine, deadline, stats) for _ in range(readers)),
+        )
+        await engine.dispose()
+    write_ms = stats["write_ms"] or [0.0]
+    return {
+        "writes_per_sec": len(stats["write_ms"]) / seconds,
+        "reads_per_sec": stats["reads"] / seconds,
+        "locked_errors": stats["errors"],
+        "write_p50_ms": statistics.median(write_ms),
+        "write_max_ms": max(write_ms),
+    }
+
+
+async def main(writers: int, readers: int, seconds: float) -> None:
+    results = {
+        "default": await measure(False, writers, readers, seconds),
+        "tuned": await measure(True, writers, readers, seconds),
+    }
+    columns = next(iter(results.values())).keys()
+    print(f"{'profile':<10}" + "".join(f"{column:>16}" for column in columns))
+    for profile, result in results.items():
+        print(f"{profile:<10}" + "".join(f"{value:>16.2f}" for value in result.values()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="N писателей и M читателей SQLite: по умолчанию и с профилем.")
+    parser.add_argument("--writers", type=int, default=4, help="число писателей")
+    parser.add_argument("--readers", type=int, default=8, help="число читателей")
+    parser.add_argument("--seconds", type=float, default=10, help="длительность каждого прогона")
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.writers, arguments.readers, arguments.seconds))
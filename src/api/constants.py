@@ -36,6 +36,8 @@ TO_TIME_PERIOD = datetime.now(TZINFO).isoformat(timespec='minutes')
 
 # forms settings
 FILE_NAME_LENGTH = 128
+FILE_CONTENT_HASH_LENGTH = 64  # sha256 hexdigest
+FILE_CONTENT_TYPE_LENGTH = 128
 TASK_DESCRIPTION_LENGTH = 512
 TASK_NAME_LENGTH = 128
 SUSPENSION_DESCRIPTION_LENGTH = 256
@@ -46,12 +48,15 @@ DOWNLOAD_FILES = "/download_files"
 FILE_ID = "/{file_id}"
 GET_FILES = "/get_files"
 GET_FILES_UNUSED = "/get_files_unused"
+SEARCH = "/search"
 
 LOGIN = "api/auth/jwt/login"
 
 # endpoints services
 GET_TEST_URL = "/test_url"
 DB_BACKUP = "/db_backup"
+DB_RESTORE = "/db_restore"
+USER_CACHE = "/user_cache"
 
 # endpoints suspensions
 ADD_FILES_TO_SUSPENSION = "/add_files_to_suspension"
@@ -71,6 +76,16 @@ POST_TASK_FORM = "/post_task_form"
 POST_TASK_FILES_FORM = "/post_task_with_files_form"
 TASK_ID = "/{task_id}"
 
+# pagination
+NEXT_CURSOR = "X-Next-Cursor"  # response header with an opaque cursor of the next page
+PAGE_CURSOR = "Курсор страницы"
+PAGE_LIMIT = "Записей на странице"
+
+# conditional GET
+ETAG = "ETag"  # response header with a weak validator of the list or the object
+IF_NONE_MATCH = "If-None-Match"  # request header: the response is 304 if the validator has not changed
+NOT_MODIFIED_RESPONSE = {"description": "Not modified since the ETag of If-None-Match."}
+
 # endpoints TAGS
 ANALYTICS_SUSPENSION = "Аналитика случаев простоя"
 FILES = "Файлы: загрузка, получение, удаление"  # кириллица в swagger
@@ -85,6 +100,8 @@ IS_REGISTERED = " is registered."
 # files_alias
 ARRAYS_DIFFERENCE = "Бесхозные файлы (ids): "
 CHOICE_FORMAT = "Формат представления: "
+FILE_CONTENT_DEDUPLICATED = "Содержимое файла уже есть в хранилище, добавлена ссылка: "
+FILE_CONTENT_RELEASED = "Из хранилища удалено содержимое файлов без ссылок: "
 FILES_IDS_DELETED = "ids удаленных файлов: "
 FILES_IDS_INTERSECTION = "Общие ids множеств: "
 FILES_IDS_UNUSED_IN_DB = "ids бесхозных файлов в БД: "
@@ -96,9 +113,9 @@ FILES_UNUSED_IN_DB = "Бесхозные файлы в БД: "
 FILES_UNUSED_IN_DB_REMOVED = "Из БД удалены бесхозные файлы: "
 FILES_RECEIVED = "Files_received: "
 FILES_SET_TO = "Привязанные файлы: "
-FILE_SIZE_ENCODE = "utf-8"
+FILE_CONTENT_TYPE = "Тип содержимого"
+FILE_SIZE = "Размер файла (байт)"
 FILE_SIZE_IN = 1000  # in kb
-FILE_SIZE_VOLUME = " kb."
 FILES_TO_REMOVE = "Удаляемые файлы: "
 FILES_UNUSED_IN_FOLDER = "Бесхозные файлы в каталоге файлов: "
 FILES_UNUSED_IN_FOLDER_REMOVED = "Из каталога удалены бесхозные файлы: "
@@ -109,6 +126,8 @@ ROUND_FILE_SIZE = 1
 SOME_NAME = "dd-mm-2024"  # "could_find_names_and_digits_eng"
 SEARCH_FILES_BY_NAME = "Поиск файлов по имени: "
 SEARCH_FILES_BY_ID = "Поиск файлов по id файлов: "
+SEARCH_TEXT = "Поисковый запрос"
+TEMP_FILE_SUFFIX = ".tmp"
 
 # files_descriptions
 FILES_ATTACHED_TO_SUSPENSION = ". К случаю простоя добавлены следующие файлы: "
@@ -117,6 +136,7 @@ FILE_DELETE = "Удалить файл (только админ)."
 FILE_NAME = "Имя файла."
 GET_SEVERAL_FILES = "Получить несколько файлов."
 MANAGE_FILES_UNUSED = "Управление бесхозными файлами (только админ)."
+SEARCH_FILES = "Полнотекстовый поиск файлов по имени (кириллицей или транслитом)."
 UPLOAD_FILES_BY_FORM = "Загрузка файлов из формы: "
 
 # suspensions_alias
@@ -127,6 +147,7 @@ IMPLEMENTING_MEASURES = "Предпринятые действия"
 MINS_TOTAL = "Сумма простоев в периоде (мин.)"
 RISK_ACCIDENT = "Риск-инцидент"
 RISK_ACCIDENT_SOURCE = "Источник угроз"
+SUMMARY_ONLY = "Только итоги (без списка простоев)"
 SUSPENSION = "Простой: "
 SUSPENSION_CREATE_FORM = "Фиксация простоя из формы с возможностью загрузки 1 файла."
 SUSPENSION_FILES_CREATE_FORM = "Фиксация простоя из формы с обязательной загрузкой нескольких файлов."
@@ -148,6 +169,7 @@ USER_ID = "id пользователя"
 
 # suspensions_descriptions
 ANALYTICS_SUSPENSION_LIST = "Аналитика случаев простоя."
+SEARCH_SUSPENSIONS = "Полнотекстовый поиск случаев простоя по описанию и предпринятым действиям."
 SET_FILES_LIST_TO_SUSPENSION = "Прикрепляет к случаю простоя список файлов."
 SUSPENSION_DELETE = "Удалить случай простоя (только админ)."
 SUSPENSION_LIST = "Список всех случаев простоя."
@@ -177,6 +199,7 @@ TASK_START = "Дата постановки задачи"
 TASK_USER_ID = "Постановщик задачи"
 
 # tasks_descriptions
+SEARCH_TASKS = "Полнотекстовый поиск задач по названию и описанию."
 SET_FILES_LIST_TO_TASK = "Присваивает задаче список файлов."
 TASK_DELETE = "Удалить задачу (только админ)."
 TASK_LIST = "Список всех задач."
@@ -196,6 +219,7 @@ FIlE_SIZE_EXCEEDED = " Превышен допустимый размер фай
 FILE_TYPE_DOWNLOAD_NOT_ALLOWED = " - данный тип файла не допустим для закгрузки!"
 FILE_SEARCH_DOWNLOAD_OPTION = "Выберите тип поиска: по id или имени файла (не одновременно)!"
 FUNCTION_STARTS = "Запущенна функция: "
+INVALID_CURSOR = "Некорректный курсор страницы: "
 MISS_LOGGING_UPDATES = "Следующие Updates не были пойманы ни одним из обработчиков"
 NOT_DATETIME_FORMAT = "Ошибка ввода даты и (или) времени! "
 NO_USER = "Check USER is not NONE!"
@@ -211,23 +235,42 @@ TASKS_FILES_REMOVE_AND_SET = "Запрещено одновременно уда
 USER_NOT_PROVIDED = "User is not provided: making a request of user in db "
 PASSWORD_LENGTH_WARNING = "Password should be at least 6 characters!"
 PASSWORD_EMAIL_WARNING = "Password should not contain e-mail!"
+USER_CACHE_DESCRIPTION = "Справочник пользователей в памяти процесса: попадания, промахи и размер (только админ)."
 
 # register_connection_errors: check Internet access info
 GET_URL_DESCRIPTION = "Проверка доступа к сайту."
 FAILED_GET_URL = "Failed_get_url."
-FIRST_COUNTER = "First_time_counter."
 INFO_CONNECTIONS = "Info_connections"
-SUPPOSE_OK = "Didn't try, suppose OK!"
+INTERNET_ACCESS_TARGET = "internet_access"
+LATENCY_PERCENTILES = "latency_percentiles_ms"
+MONITORING_STARTED = "Monitoring_started."
+MONITORING_TARGETS_NOT_UNIQUE = "Monitoring target names must be unique."
+OUTAGE_STATE_CHANGED = "Outage_state_changed."
 SUSPENSION_CREATED = "Suspension_created."
 SUSPENSION_DB_LOADED = "Suspension_loaded_in_db."
-TIME_COUNTER = "Time_counter."
 TIME_INFO = "time"
 URL_CONNECTION_ERROR = "ConnectionError"
 WITH_ID = " with id - "
 
+# worker: leader election of monitoring and db backups
+WORKER_LEADER = "Worker_is_leader."
+WORKER_STANDBY = "Worker_in_standby: lock is held by another worker."
+WORKER_STOPPED = "Worker_stopped."
+
 # db_backups
 COPY_FILE_ERROR = "Ошибка при копировании файла."
+DB_BACKUP_DELTA_ERROR = "Файл не является инкрементом бэкапа БД."
 DB_BACKUP_DESCRIPTION = "Бэкап БД."
+DB_RESTORE_DESCRIPTION = (
+    "Восстановление БД из последнего бэкапа не позже указанного момента (по умолчанию - из последнего): "
+    "полный снимок + инкремент, проверка целостности и числа строк, миграции alembic. "
+    "Текущая БД предварительно сохраняется бэкапом."
+)
+DB_RESTORE_POINT_NOT_FOUND = "Нет бэкапа БД не позже момента: "
+DB_RESTORE_UNTIL = "Момент восстановления"
+DB_RESTORE_VERIFICATION_ERROR = "Восстановленная БД не прошла проверку: "
+DB_RESTORED = "БД восстановлена из бэкапа."
+DB_BACKUP_INTEGRITY_ERROR = "Снимок БД не прошел проверку целостности и удален."
 DELETED_OK = " успешно удален(а)."
 DIR_CREATED = "Создан каталог."
 DIR_CREATED_ERROR = "Ошибка создания каталога."
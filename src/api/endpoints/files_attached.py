@@ -14,7 +14,7 @@ from src.api.schema import (FileBase, FileDBUnusedDeletedResponse,
                             FileUnusedResponse, FileUploadedResponse)
 from src.api.services import FileService
 from src.api.validators import check_same_files_not_to_download
-from src.core.db.models import FileAttached
+from src.core.db.models import FileAttached, User
 from src.core.db.user import current_superuser, current_user
 from src.core.enums import ChoiceDownloadFiles, ChoiceRemoveFilesUnused
 from src.settings import settings
@@ -35,7 +35,6 @@ async def file_uploader(files: list[UploadFile]):
 @file_router.post(
     DOWNLOAD_FILES,
     description=UPLOAD_FILES_BY_FORM,
-    dependencies=[Depends(current_superuser)],
     summary=UPLOAD_FILES_BY_FORM,
     tags=[FILES],
     responses={
@@ -47,12 +46,13 @@ async def upload_files_by_form(
     *,
     files_to_upload: list[UploadFile] = Depends(file_uploader),  # tried to make list[UploadFile] optional
     file_service: FileService = Depends(),
+    user: User = Depends(current_superuser),
 ) -> FileUploadedResponse:
     """Загружает файлы в каталог и записывает их в БД."""
     await check_same_files_not_to_download(files_to_upload)
     file_timestamp = (datetime.now(TZINFO)).strftime(FILE_DATETIME_FORMAT)  # for equal file_name in db & upload folder
     file_names_and_ids_written_in_db = await file_service.download_and_write_files_in_db(
-        files_to_upload, FILES_DIR, file_timestamp
+        files_to_upload, FILES_DIR, file_timestamp, user.id
     )
     file_ids_in_db = file_names_and_ids_written_in_db[1]
     files_uploaded: Sequence[FileAttached] = await file_service.get_by_ids(file_ids_in_db)
@@ -92,6 +92,31 @@ async def get_files(
     return await file_service.zip_files(files_to_zip)
 
 
+@file_router.get(
+    SEARCH,
+    response_model=Sequence[FileBase],
+    dependencies=[Depends(current_user)],
+    description=SEARCH_FILES,
+    summary=SEARCH_FILES,
+    tags=[FILES],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: INACTIVE_USER_WARNING,
+    },
+)
+async def search_files(
+        response: Response,
+        search_text: str = Query(..., min_length=1, example=SOME_NAME, alias=SEARCH_TEXT),
+        limit: PositiveInt = Query(None, le=settings.PAGE_SIZE_MAX, alias=PAGE_LIMIT),
+        cursor: str = Query(None, alias=PAGE_CURSOR),
+        file_service: FileService = Depends(),
+):
+    """Ищет файлы по словам из имени: сначала наиболее релевантные (постранично, если задан limit)."""
+    files_db, next_cursor = await file_service.search(search_text, limit, cursor)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR] = next_cursor
+    return files_db
+
+
 @file_router.get(
     FILE_ID,
     response_model=FileBase,
@@ -186,6 +211,7 @@ async def get_files_unused(
             )
         files_to_delete: list[Path] = await file_service.prepare_files_to_work_with(files_unused_in_folder, FILES_DIR)
         await file_service.delete_files_in_folder(files_to_delete)
+        await file_service.release_unreferenced_blobs(FILES_DIR)
         await log.ainfo("{}{}".format(FILES_UNUSED_IN_FOLDER_REMOVED, files_unused_in_folder))
         return FileUnusedDeletedResponse(files_unused=files_unused_in_folder,)
 
@@ -1,12 +1,14 @@
 """src/api/endpoints/service_router.py"""
 
-import requests
+from datetime import datetime
+
 import structlog
 from fastapi import APIRouter, Depends, Query, status
-from requests.exceptions import SSLError
 from src.api.constants import *
-from src.api.schemas import DBBackupResponse
+from src.api.schemas import DBBackupResponse, DBRestoreReport, UserCacheStats
 from src.core.db.user import current_superuser
+from src.core.db.user_cache import user_cache
+from src.services.connection_probe import ConnectionProbe
 from src.services.db_backup import DBBackupService
 from src.settings import settings
 
@@ -18,14 +20,13 @@ service_router = APIRouter()
 async def get_url(
     url: str = Query(..., example=settings.CONNECTION_TEST_URL_BASE),
 ) -> dict[str, int | str] | None:
-    """Проверяет доступ к интерне указанного url."""
-    try:
-        status_code = requests.get(url).status_code
-        await log.ainfo("{}".format(GET_URL_DESCRIPTION), status_code=status_code, url=url)
-        return {url: status_code, "time": ANALYTIC_TO_TIME}
-    except SSLError as error:
-        await log.aerror("{}".format(FAILED_GET_URL), error=error, url=url)
-        return {"error": str(error), "time": ANALYTIC_TO_TIME, "url": url}
+    """Проверяет доступ к интерне указанного url (без блокировки сервера на время ожидания ответа)."""
+    async with ConnectionProbe() as probe:
+        result = await probe.probe(url)
+    if not result.is_up:
+        return {"error": result.error, "time": ANALYTIC_TO_TIME, "url": url}
+    await log.ainfo("{}".format(GET_URL_DESCRIPTION), status_code=result.status_code, url=url)
+    return {url: result.status_code, "time": ANALYTIC_TO_TIME}
 
 
 @service_router.get(
@@ -41,20 +42,50 @@ async def db_backup(
     backup_service: DBBackupService = Depends(),
 ) -> DBBackupResponse:
     """Делает мануальный бэкап БД."""
-    await backup_service.make_copy_db()
-    list_of_files_names = await backup_service.get_list_of_names_in_dir()
-    total_backups = len(list_of_files_names)
+    report = await backup_service.make_copy_db()
+    backups = backup_service.read_manifest()
+    total_backups = len(backups)
     if total_backups == 0:
-        await log.aerror(
-            "{}".format(DIR_CREATED_ERROR), list_of_files=list_of_files_names, folder=settings.DB_BACKUP_DIR
-        )
+        await log.aerror("{}".format(DIR_CREATED_ERROR), folder=settings.DB_BACKUP_DIR)
         last_backup, first_backup = None, None
     else:
-        last_backup = max(list_of_files_names)[0]
-        first_backup = min(list_of_files_names)[0]
+        last_backup = str(backups[-1].created_at.date())
+        first_backup = str(backups[0].created_at.date())
     return DBBackupResponse(
         total_backups=total_backups,
         last_backup=last_backup,
         first_backup=first_backup,
+        last_run=report,
         time=ANALYTIC_TO_TIME
     )
+
+
+@service_router.post(
+    DB_RESTORE,
+    description=DB_RESTORE_DESCRIPTION,
+    dependencies=[Depends(current_superuser)],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: INACTIVE_USER_WARNING,
+        status.HTTP_403_FORBIDDEN: NOT_SUPER_USER_WARNING,
+    },
+)
+async def db_restore(
+    until: datetime | None = Query(None, alias=DB_RESTORE_UNTIL),
+    backup_service: DBBackupService = Depends(),
+) -> DBRestoreReport:
+    """Восстанавливает БД из бэкапа на момент until."""
+    return await backup_service.restore_db(until)
+
+
+@service_router.get(
+    USER_CACHE,
+    description=USER_CACHE_DESCRIPTION,
+    dependencies=[Depends(current_superuser)],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: INACTIVE_USER_WARNING,
+        status.HTTP_403_FORBIDDEN: NOT_SUPER_USER_WARNING,
+    },
+)
+async def get_user_cache_stats() -> UserCacheStats:
+    """Отдает счетчики справочника пользователей этого процесса API."""
+    return UserCacheStats(**user_cache.stats)
@@ -9,21 +9,25 @@ from fastapi import (APIRouter, Depends, File, Query, Response, UploadFile,
                      status)
 from pydantic import PositiveInt
 from src.api.constants import *
+from src.api.responses import FastJSONResponse
 from src.api.schema import (AnalyticsSuspensions,
                             AnalyticSuspensionResponse, SuspensionCreate,
                             SuspensionDeletedResponse, SuspensionResponse)
-from src.api.services import FileService, SuspensionService, UsersService
+from src.api.services import (ConditionalGet, FileService, SuspensionService,
+                              UsersService)
 from src.api.validators import (
     check_author_or_super_user, check_exist_files_attached,
     check_not_download_and_delete_files_at_one_time,
     check_start_not_exceeds_finish)
-from src.core.db.models import Suspension, User
+from src.core.db.models import (FileAttached, Suspension, SuspensionsFiles,
+                                User)
 from src.core.db.user import current_superuser, current_user
 from src.core.enums import (ChoiceDownloadFiles, Executor, RiskAccidentSource,
                             TechProcess)
 
 log = structlog.get_logger()
-suspension_router = APIRouter()
+suspension_router = APIRouter(default_response_class=FastJSONResponse)  # heavy lists of suspensions
+suspensions_etag = ConditionalGet(Suspension, SuspensionsFiles, FileAttached, User)  # tables of the response
 
 SERVICES_DIR = Path(__file__).resolve().parent.parent.parent.parent
 FILES_DIR = SERVICES_DIR.joinpath(settings.FILES_DOWNLOAD_DIR)
@@ -42,6 +46,7 @@ FILES_DIR = SERVICES_DIR.joinpath(settings.FILES_DOWNLOAD_DIR)
     },
 )
 async def get_all_for_period_time(
+    response: Response,
     start_sample: str = Query(
         ...,
         example=ANALYTIC_FROM_TIME,
@@ -57,6 +62,9 @@ async def get_all_for_period_time(
         # description=ANALYTIC_TO_TIME,
     ),
     user: Executor = Query(None, alias=USER_MAIL),
+    limit: PositiveInt = Query(None, le=settings.PAGE_SIZE_MAX, alias=PAGE_LIMIT),
+    cursor: str = Query(None, alias=PAGE_CURSOR),
+    summary_only: bool = Query(False, alias=SUMMARY_ONLY),
     suspension_service: SuspensionService = Depends(),
     users_service: UsersService = Depends(),
 ) -> AnalyticsSuspensions:
@@ -69,24 +77,16 @@ async def get_all_for_period_time(
     else:
         user: User = await users_service.get_by_email(user.value)
         user_id = user.id
-    suspensions: Sequence[Suspension] = await suspension_service.get_suspensions_for_users(
-        user_id, start_sample, finish_sample
+    analytics: dict = await suspension_service.get_analytics_for_period(user_id, start_sample, finish_sample)
+    if summary_only:
+        return AnalyticsSuspensions(**analytics)
+    suspensions, next_cursor = await suspension_service.get_suspensions_for_users(
+        user_id, start_sample, finish_sample, limit, cursor
     )
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR] = next_cursor
     suspensions_list = await suspension_service.perform_changed_schema(suspensions)
-    return AnalyticsSuspensions(
-        suspensions_in_mins_total=(
-            await suspension_service.sum_suspensions_time_for_period(user_id, start_sample, finish_sample)
-        ),
-        suspensions_total=(
-            await suspension_service.count_suspensions_for_period(user_id, start_sample, finish_sample)
-        ),
-        suspension_max_time_for_period=(
-            await suspension_service.suspension_max_time_for_period(user_id, start_sample, finish_sample)
-        ),
-        last_time_suspension=await suspension_service.get_last_suspension_time(user_id),
-        last_time_suspension_id=await suspension_service.get_last_suspension_id(user_id),
-        suspensions_list=suspensions_list
-    )
+    return AnalyticsSuspensions(**analytics, suspensions_list=suspensions_list)
 
 
 @suspension_router.post(
@@ -143,7 +143,7 @@ async def create_new_suspension_by_form(
     # 2. Download and write files in db and make records in tables "files" & "suspensions_files" in db:
     file_timestamp = (datetime.now(TZINFO)).strftime(FILE_DATETIME_FORMAT)  # timestamp in filename
     file_names_and_ids: tuple[list[str], list[PositiveInt]] = await file_service.download_and_write_files_in_db(
-        [file_to_upload], FILES_DIR, file_timestamp
+        [file_to_upload], FILES_DIR, file_timestamp, user.id
     )
     suspension_id = new_suspension.id
     file_id = file_names_and_ids[1]
@@ -208,7 +208,7 @@ async def create_new_suspension_by_form_with_files(
     # 2. Download and write files in db and make records in tables "files" & "suspensions_files" in db:
     file_timestamp = (datetime.now(TZINFO)).strftime(FILE_DATETIME_FORMAT)  # timestamp in filename
     file_names_and_ids: tuple[list[str], list[PositiveInt]] = await file_service.download_and_write_files_in_db(
-        files_to_upload, FILES_DIR, file_timestamp
+        files_to_upload, FILES_DIR, file_timestamp, user.id
     )
     suspension_id = new_suspension.id
     files_ids = file_names_and_ids[1]
@@ -343,7 +343,7 @@ async def partially_update_suspension_by_form(
         file_timestamp = (datetime.now(TZINFO)).strftime(FILE_DATETIME_FORMAT)  # метка времени в имени файла
         file_names_and_ids_attached: tuple[list[str], list[PositiveInt]] = (
             await file_service.download_and_write_files_in_db(
-                [file_to_upload], FILES_DIR, file_timestamp)
+                [file_to_upload], FILES_DIR, file_timestamp, user.id)
         )
         new_file_id = file_names_and_ids_attached[1]
         new_file_name = file_names_and_ids_attached[0]
@@ -373,20 +373,27 @@ async def partially_update_suspension_by_form(
 
 @suspension_router.get(
     MAIN_ROUTE,
-    dependencies=[Depends(current_user)],
+    dependencies=[Depends(current_user), Depends(suspensions_etag)],
     response_model_exclude_none=True,
     description=SUSPENSION_LIST,
     summary=SUSPENSION_LIST,
     tags=[SUSPENSIONS_GET],
     responses={
+        status.HTTP_304_NOT_MODIFIED: NOT_MODIFIED_RESPONSE,
         status.HTTP_401_UNAUTHORIZED: INACTIVE_USER_WARNING,
     },
 )
 async def get_all_suspensions(
+        response: Response,
+        limit: PositiveInt = Query(None, le=settings.PAGE_SIZE_MAX, alias=PAGE_LIMIT),
+        cursor: str = Query(None, alias=PAGE_CURSOR),
         suspension_service: SuspensionService = Depends()
 ) -> Sequence[AnalyticSuspensionResponse]:
-    """Все случаи простоя."""
-    return await suspension_service.perform_changed_schema(await suspension_service.get_all())  # noqa
+    """Все случаи простоя (постранично, если задан limit: курсор следующей страницы - в заголовке ответа)."""
+    suspensions, next_cursor = await suspension_service.get_all(limit, cursor)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR] = next_cursor
+    return await suspension_service.perform_changed_schema(suspensions)  # noqa
 
 
 @suspension_router.get(
@@ -400,23 +407,53 @@ async def get_all_suspensions(
     },
 )
 async def get_all_my_suspensions(
+    response: Response,
+    limit: PositiveInt = Query(None, le=settings.PAGE_SIZE_MAX, alias=PAGE_LIMIT),
+    cursor: str = Query(None, alias=PAGE_CURSOR),
     suspension_service: SuspensionService = Depends(),
     user: User = Depends(current_user)
 ) -> Sequence[AnalyticSuspensionResponse]:
-    """Все случаи простоя, зафиксированные текущим пользователем."""
-    return await suspension_service.perform_changed_schema(  # noqa
-        await suspension_service.get_all_my_suspensions(user.id), user  # noqa
-    )  # noqa
+    """Все случаи простоя, зафиксированные текущим пользователем (постранично, если задан limit)."""
+    suspensions, next_cursor = await suspension_service.get_all_my_suspensions(user.id, limit, cursor)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR] = next_cursor
+    return await suspension_service.perform_changed_schema(suspensions, user)  # noqa
+
+
+@suspension_router.get(
+    SEARCH,
+    dependencies=[Depends(current_user)],
+    response_model_exclude_none=True,
+    description=SEARCH_SUSPENSIONS,
+    summary=SEARCH_SUSPENSIONS,
+    tags=[SUSPENSIONS_GET],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: INACTIVE_USER_WARNING,
+    },
+)
+async def search_suspensions(
+    response: Response,
+    search_text: str = Query(..., min_length=1, example=CREATE_DESCRIPTION, alias=SEARCH_TEXT),
+    limit: PositiveInt = Query(None, le=settings.PAGE_SIZE_MAX, alias=PAGE_LIMIT),
+    cursor: str = Query(None, alias=PAGE_CURSOR),
+    suspension_service: SuspensionService = Depends()
+) -> Sequence[AnalyticSuspensionResponse]:
+    """Случаи простоя, найденные по описанию и предпринятым действиям: сначала наиболее релевантные."""
+    suspensions, next_cursor = await suspension_service.search(search_text, limit, cursor)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR] = next_cursor
+    return await suspension_service.perform_changed_schema(suspensions)  # noqa
 
 
 @suspension_router.get(
     SUSPENSION_ID,
     response_model=None,  # Invalid args for response field -> response_model=None
-    dependencies=[Depends(current_user)],
+    dependencies=[Depends(current_user), Depends(suspensions_etag)],
     description=SUSPENSION_DESCRIPTION,
     summary=SUSPENSION_DESCRIPTION,
     tags=[SUSPENSIONS_GET],
     responses={
+        status.HTTP_304_NOT_MODIFIED: NOT_MODIFIED_RESPONSE,
         status.HTTP_401_UNAUTHORIZED: INACTIVE_USER_WARNING,
     },
 )
@@ -5,23 +5,27 @@ from pathlib import Path
 from typing import Optional
 
 import structlog
-from fastapi import APIRouter, Depends, File, Query, Response, UploadFile
+from fastapi import (APIRouter, Depends, File, Query, Response, UploadFile,
+                     status)
 from pydantic import EmailStr, PositiveInt
 from src.api.constants import *
+from src.api.responses import FastJSONResponse
 from src.api.schema import (AnalyticTaskResponse, TaskCreate,
                             TaskDeletedResponse, TaskResponse)
-from src.api.services import FileService, TaskService, UsersService
+from src.api.services import (ConditionalGet, FileService, TaskService,
+                              UsersService)
 from src.api.validators import (
     check_author_or_super_user, check_exist_files_attached,
     check_not_download_and_delete_files_at_one_time,
     check_same_files_not_to_download, check_start_not_exceeds_finish)
-from src.core.db.models import Task, User
+from src.core.db.models import FileAttached, Task, TasksFiles, User
 from src.core.db.user import current_superuser, current_user
 from src.core.enums import ChoiceDownloadFiles, Executor, TechProcess
 from src.settings import settings
 
 log = structlog.get_logger()
-task_router = APIRouter()
+task_router = APIRouter(default_response_class=FastJSONResponse)  # heavy lists of tasks
+tasks_etag = ConditionalGet(Task, TasksFiles, FileAttached, User)  # tables of the response
 
 SERVICES_DIR = Path(__file__).resolve().parent.parent.parent.parent
 FILES_DIR = SERVICES_DIR.joinpath(settings.FILES_DOWNLOAD_DIR)
@@ -70,7 +74,7 @@ async def create_new_task_by_form(
     # 2. Download and write files in db and make records in tables "files" & "tasks_files" in db:
     file_timestamp = (datetime.now(TZINFO)).strftime(FILE_DATETIME_FORMAT)  # timestamp in filename
     file_names_and_ids: tuple[list[str], list[PositiveInt]] = await file_service.download_and_write_files_in_db(
-        [file_to_upload], FILES_DIR, file_timestamp
+        [file_to_upload], FILES_DIR, file_timestamp, user.id
     )
     task_id = new_task.id
     file_id = file_names_and_ids[1]
@@ -121,7 +125,7 @@ async def create_new_task_by_form_with_files(
     # 2. Download and write files in db and make records in tables "files" & "tasks_files" in db:
     file_timestamp = (datetime.now(TZINFO)).strftime(FILE_DATETIME_FORMAT)  # timestamp in filename
     file_names_and_ids: tuple[list[str], list[PositiveInt]] = await file_service.download_and_write_files_in_db(
-        files_to_upload, FILES_DIR, file_timestamp
+        files_to_upload, FILES_DIR, file_timestamp, user.id
     )
     task_id = new_task.id
     files_ids = file_names_and_ids[1]
@@ -238,7 +242,7 @@ async def partially_update_task_by_form(
         file_timestamp = (datetime.now(TZINFO)).strftime(FILE_DATETIME_FORMAT)  # метка времени в имени файла
         file_names_and_ids_attached: tuple[list[str], list[PositiveInt]] = (
             await file_service.download_and_write_files_in_db(
-                [file_to_upload], FILES_DIR, file_timestamp)
+                [file_to_upload], FILES_DIR, file_timestamp, user.id)
         )
         new_file_id = file_names_and_ids_attached[1]
         new_file_name = file_names_and_ids_attached[0]
@@ -266,28 +270,46 @@ async def partially_update_task_by_form(
 
 @task_router.get(
     MAIN_ROUTE,
-    dependencies=[Depends(current_user)],
+    dependencies=[Depends(current_user), Depends(tasks_etag)],
     response_model_exclude_none=True,
     description=TASK_LIST,
     summary=TASK_LIST,
-    tags=[TASKS_GET]
+    tags=[TASKS_GET],
+    responses={status.HTTP_304_NOT_MODIFIED: NOT_MODIFIED_RESPONSE},
 )
-async def get_all_tasks(task_service: TaskService = Depends()) -> Sequence[AnalyticTaskResponse]:
-    """Возвращает из БД все задачи: исполненные и открытые для всех пользователей."""
-    return await task_service.perform_changed_schema(await task_service.get_all())  # noqa
+async def get_all_tasks(
+    response: Response,
+    limit: PositiveInt = Query(None, le=settings.PAGE_SIZE_MAX, alias=PAGE_LIMIT),
+    cursor: str = Query(None, alias=PAGE_CURSOR),
+    task_service: TaskService = Depends()
+) -> Sequence[AnalyticTaskResponse]:
+    """Возвращает из БД все задачи: исполненные и открытые для всех пользователей (постранично, если задан limit)."""
+    tasks, next_cursor = await task_service.get_all(limit, cursor)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR] = next_cursor
+    return await task_service.perform_changed_schema(tasks)  # noqa
 
 
 @task_router.get(
     GET_OPENED_ROUTE,
-    dependencies=[Depends(current_user)],
+    dependencies=[Depends(current_user), Depends(tasks_etag)],
     response_model_exclude_none=True,
     description=TASK_OPENED_LIST,
     summary=TASK_OPENED_LIST,
-    tags=[TASKS_GET]
+    tags=[TASKS_GET],
+    responses={status.HTTP_304_NOT_MODIFIED: NOT_MODIFIED_RESPONSE},
 )
-async def get_all_opened_tasks(task_service: TaskService = Depends()) -> Sequence[AnalyticTaskResponse]:
-    """Возвращает из БД все невыполненные задачи для всех пользователей."""
-    return await task_service.perform_changed_schema(await task_service.get_all_opened())  # noqa
+async def get_all_opened_tasks(
+    response: Response,
+    limit: PositiveInt = Query(None, le=settings.PAGE_SIZE_MAX, alias=PAGE_LIMIT),
+    cursor: str = Query(None, alias=PAGE_CURSOR),
+    task_service: TaskService = Depends()
+) -> Sequence[AnalyticTaskResponse]:
+    """Возвращает из БД все невыполненные задачи для всех пользователей (постранично, если задан limit)."""
+    tasks, next_cursor = await task_service.get_all_opened(limit, cursor)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR] = next_cursor
+    return await task_service.perform_changed_schema(tasks)  # noqa
 
 
 @task_router.get(
@@ -298,11 +320,17 @@ async def get_all_opened_tasks(task_service: TaskService = Depends()) -> Sequenc
     tags=[TASKS_GET]
 )
 async def get_my_tasks_ordered(
+    response: Response,
+    limit: PositiveInt = Query(None, le=settings.PAGE_SIZE_MAX, alias=PAGE_LIMIT),
+    cursor: str = Query(None, alias=PAGE_CURSOR),
     task_service: TaskService = Depends(),
     user: User = Depends(current_user)
 ) -> Sequence[AnalyticTaskResponse]:
-    """Возвращает все неисполненные задачи, выставленные текущим пользователем."""
-    return await task_service.perform_changed_schema(await task_service.get_tasks_ordered(user.id), user, None)  # noqa
+    """Возвращает все неисполненные задачи, выставленные текущим пользователем (постранично, если задан limit)."""
+    tasks, next_cursor = await task_service.get_tasks_ordered(user.id, limit, cursor)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR] = next_cursor
+    return await task_service.perform_changed_schema(tasks, user, None)  # noqa
 
 
 @task_router.get(
@@ -313,11 +341,39 @@ async def get_my_tasks_ordered(
     tags=[TASKS_GET]
 )
 async def get_my_tasks_todo(
+    response: Response,
+    limit: PositiveInt = Query(None, le=settings.PAGE_SIZE_MAX, alias=PAGE_LIMIT),
+    cursor: str = Query(None, alias=PAGE_CURSOR),
     task_service: TaskService = Depends(),
     user: User = Depends(current_user)
 ) -> Sequence[AnalyticTaskResponse]:
-    """Возвращает все неисполненные задачи, выставленные текущему пользователю."""
-    return await task_service.perform_changed_schema(await task_service.get_my_tasks_todo(user.id), None, user)  # noqa
+    """Возвращает все неисполненные задачи, выставленные текущему пользователю (постранично, если задан limit)."""
+    tasks, next_cursor = await task_service.get_my_tasks_todo(user.id, limit, cursor)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR] = next_cursor
+    return await task_service.perform_changed_schema(tasks, None, user)  # noqa
+
+
+@task_router.get(
+    SEARCH,
+    dependencies=[Depends(current_user)],
+    response_model_exclude_none=True,
+    description=SEARCH_TASKS,
+    summary=SEARCH_TASKS,
+    tags=[TASKS_GET]
+)
+async def search_tasks(
+    response: Response,
+    search_text: str = Query(..., min_length=1, example=TASK_DESCRIPTION, alias=SEARCH_TEXT),
+    limit: PositiveInt = Query(None, le=settings.PAGE_SIZE_MAX, alias=PAGE_LIMIT),
+    cursor: str = Query(None, alias=PAGE_CURSOR),
+    task_service: TaskService = Depends()
+) -> Sequence[AnalyticTaskResponse]:
+    """Возвращает задачи, найденные по названию и описанию: сначала наиболее релевантные (постранично)."""
+    tasks, next_cursor = await task_service.search(search_text, limit, cursor)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR] = next_cursor
+    return await task_service.perform_changed_schema(tasks)  # noqa
 
 
 @task_router.get(
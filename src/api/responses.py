@@ -0,0 +1,15 @@
+"""src/api/responses.py"""
+from typing import Any
+
+import ujson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-ответ для тяжелых списков: FastAPI уже привел ответ схемой pydantic к json-типам (model_dump, mode="json"),
+    остается только кодирование - ujson (как в логах) вместо стандартного json; кириллица без экранирования.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return ujson.dumps(content, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
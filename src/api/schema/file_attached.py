@@ -9,7 +9,10 @@ from src.settings import settings
 class FileCreate(BaseModel):
     """Схема cоздания объекта в БД."""
     name: str = Field(..., max_length=FILE_NAME_LENGTH, title=FILE_NAME, serialization_alias=FILE_NAME)
-    file: bytes
+    size: int = Field(..., ge=0)
+    content_type: str | None = Field(None, max_length=FILE_CONTENT_TYPE_LENGTH)
+    content_hash: str | None = Field(None, max_length=FILE_CONTENT_HASH_LENGTH)
+    user_id: PositiveInt | None = None
 
 
 class FileBase(BaseModel):
@@ -21,6 +24,8 @@ class FileBase(BaseModel):
         title=FILE_NAME,
         serialization_alias=FILE_NAME,
     )
+    size: int | None = Field(None, serialization_alias=FILE_SIZE)
+    content_type: str | None = Field(None, serialization_alias=FILE_CONTENT_TYPE)
     created_at: datetime = Field(..., serialization_alias=CREATED)
     updated_at: datetime = Field(..., serialization_alias=UPDATED)
 
@@ -48,8 +48,9 @@ class SuspensionBase(BaseModel):
     @computed_field(alias=SUSPENSION_DURATION)
     @property
     def duration(self) -> PositiveInt | float:
-        suspension_finish = time.strptime(self.suspension_finish.strftime(DATE_TIME_FORMAT), DATE_TIME_FORMAT)
-        suspension_start = time.strptime(self.suspension_start.strftime(DATE_TIME_FORMAT), DATE_TIME_FORMAT)
+        # local time to a minute as strptime(strftime(DATE_TIME_FORMAT)) gave, without the round trip through str:
+        suspension_finish = self.suspension_finish.replace(second=0, microsecond=0, tzinfo=None).timetuple()
+        suspension_start = self.suspension_start.replace(second=0, microsecond=0, tzinfo=None).timetuple()
         return (time.mktime(suspension_finish) - time.mktime(suspension_start)) / SUSPENSION_DURATION_RESPONSE  # mins
 
     @field_serializer("created_at", "updated_at")
@@ -142,7 +143,7 @@ class AnalyticsSuspensions(BaseModel):
     suspension_max_time_for_period: int = Field(..., serialization_alias=SUSPENSION_MAX_TIME)
     last_time_suspension: datetime = Field(..., serialization_alias=SUSPENSION_LAST_TIME)
     last_time_suspension_id: int = Field(..., serialization_alias=SUSPENSION_LAST_ID)
-    suspensions_list: list[AnalyticSuspensionResponse] = Field(..., serialization_alias=SUSPENSION_LIST)
+    suspensions_list: Optional[list[AnalyticSuspensionResponse]] = Field(None, serialization_alias=SUSPENSION_LIST)
 
     class Config:
         from_attributes = True  # in V2: 'orm_mode' has been renamed! In order to serialize ORM-model into schema.
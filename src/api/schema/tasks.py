@@ -46,8 +46,8 @@ class TaskBase(TaskCreate):
     @computed_field(alias=TASK_DURATION)
     @property
     def duration(self) -> int | float:
-        task_finish = time.strptime(self.deadline.strftime(DATE_TIME_FORMAT), DATE_TIME_FORMAT)
-        today = time.strptime(date.today().strftime(DATE_TODAY_FORMAT), DATE_TODAY_FORMAT)
+        task_finish = self.deadline.timetuple()  # midnight as strptime(strftime()) gave, without the round trip
+        today = date.today().timetuple()
         return (time.mktime(task_finish) - time.mktime(today)) / TASK_DURATION_RESPONSE  # in days
 
     @field_serializer("created_at", "updated_at")
@@ -1,7 +1,12 @@
 """src/api/schemas.py"""
+from datetime import datetime
 
 from fastapi_users import schemas
-from pydantic import BaseModel, PositiveInt
+from pydantic import (BaseModel, Field, PositiveFloat, PositiveInt,
+                      field_validator)
+from src.api.constants import INTERNET_ERROR, MEASURES
+from src.core.enums import BackupKind, RiskAccidentSource, TechProcess
+from src.settings import settings
 
 
 # https://github.com/fastapi-users/fastapi-users/blob/master/fastapi_users/schemas.py
@@ -35,9 +40,83 @@ class UserUpdate(schemas.BaseUserUpdate):
     pass
 
 
+class DBBackupReport(BaseModel):
+    """
+    Отчет о бэкапе БД и запись манифеста бэкапов: файл, вид, полный снимок-основа инкремента,
+    размер на диске (сжатый), число страниц, измененные страницы, длительность и проверка целостности.
+    """
+    file: str
+    kind: BackupKind
+    base: str | None = None
+    created_at: datetime
+    size_bytes: int
+    pages: int
+    page_size: int
+    changed_pages: int
+    duration_sec: float
+    integrity: str
+    row_counts: dict[str, int] = {}
+
+
+class DBRestoreReport(BaseModel):
+    """Отчет о восстановлении БД: точка восстановления, файлы бэкапа, число строк, ревизии alembic, длительность."""
+    restore_point: datetime
+    files: list[str]
+    target: str
+    size_bytes: int
+    row_counts: dict[str, int]
+    revision_before: str | None
+    revision_after: str | None
+    duration_sec: float
+
+
 class DBBackupResponse(BaseModel):
     """Класс ответа для бэкапа БД."""
     last_backup: str | None
     first_backup: str | None
     total_backups: PositiveInt
+    last_run: DBBackupReport | None = None
     time: str
+
+
+class UserCacheStats(BaseModel):
+    """Счетчики справочника пользователей в памяти процесса."""
+    hits: int
+    misses: int
+    hit_ratio: float
+    size: int
+    ttl: float
+
+
+class ProbeResult(BaseModel):
+    """Результат проверки доступа к url: вердикт, код ответа или ошибка и перцентили времени ответа (мс)."""
+    url: str
+    is_up: bool
+    status_code: int | None = None
+    error: str | None = None
+    latency_ms: float | None = None
+    percentiles_ms: dict[str, float] = {}
+
+
+class MonitoringTarget(BaseModel):
+    """
+    Цель мониторинга: группа url (цель доступна, если отвечает хотя бы один), интервал, разброс старта
+    и таймаут проверок; тех-процесс и источник угроз, к которым относится простой цели.
+    """
+    name: str
+    urls: list[str] = Field(..., min_length=1)
+    tech_process: TechProcess
+    risk_accident: RiskAccidentSource
+    description: str = INTERNET_ERROR
+    implementing_measures: str = MEASURES
+    interval: PositiveFloat = settings.SLEEP_TEST_CONNECTION
+    jitter: float = Field(0, ge=0)  # seconds: random delay spreads probes of targets with the same interval
+    timeout: PositiveFloat | None = None  # None: settings.PROBE_READ_TIMEOUT
+
+    @field_validator("risk_accident", mode="before")
+    @classmethod
+    def risk_accident_by_name(cls, risk_accident: str) -> str:
+        """Источник угроз задается ключом из RISK_SOURCE (например, "ROUTER") или его значением."""
+        if risk_accident in RiskAccidentSource.__members__:
+            return RiskAccidentSource[risk_accident].value
+        return risk_accident
@@ -1,10 +1,12 @@
 from .base import ContentService
+from .conditional_get import ConditionalGet
 from .file_attached import FileService
 from .suspension import SuspensionService
 from .task import TaskService
 from .users import UsersService
 
 __all__ = (
+    "ConditionalGet",
     "ContentService",
     "FileService",
     "SuspensionService",
@@ -0,0 +1,59 @@
+"""src/api/services/conditional_get.py"""
+import hashlib
+from datetime import date
+from typing import Any
+
+from fastapi import Depends, Request, Response
+from src.api.constants import ETAG, IF_NONE_MATCH
+from src.core.db.models import Base, User
+from src.core.db.repository import DataVersionRepository
+from src.core.db.user import current_user
+from src.core.exceptions import NotModifiedException
+
+
+def make_weak_etag(*parts: Any) -> str:
+    """Слабый ETag: хэш от частей, определяющих ответ."""
+    return 'W/"{}"'.format(hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest())
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Слабое сравнение ETag с заголовком If-None-Match (список ETag через запятую или *)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(","))
+
+
+class ConditionalGet:
+    """
+    Условный GET эндпоинтов чтения: ETag ответа вычисляется по версиям данных таблиц, из которых собирается ответ,
+    адресу запроса с параметрами, пользователю и текущей дате (длительность задач считается от сегодняшнего дня) -
+    одним запросом к data_versions.
+    Если If-None-Match содержит тот же ETag - ответ 304 без чтения данных и сборки ответа (perform_changed_schema),
+    иначе ETag добавляется в заголовки ответа.
+    """
+
+    def __init__(self, *models: type[Base]) -> None:
+        self.table_names = sorted(model.__tablename__ for model in models)
+
+    async def __call__(
+            self,
+            request: Request,
+            response: Response,
+            user: User = Depends(current_user),
+            data_version_repository: DataVersionRepository = Depends(),
+    ) -> str:
+        versions = await data_version_repository.get_versions(self.table_names)
+        etag = make_weak_etag(
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            user.id,
+            date.today().isoformat(),
+            [tuple(row) for row in versions],
+        )
+        if etag_matches(request.headers.get(IF_NONE_MATCH), etag):
+            raise NotModifiedException(etag)
+        response.headers[ETAG] = etag
+        return etag
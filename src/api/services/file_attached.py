@@ -1,15 +1,20 @@
 """src/api/services/file_attached.py"""
 
+import hashlib
 import io
 import os
+import shutil
+import uuid
 import zipfile
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
 from pathlib import Path
 from typing import Any
 
+import anyio
 import numpy as np
 import structlog
 from fastapi import Depends, HTTPException, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.api.constants import *
 from src.api.schema import FileCreate
@@ -23,6 +28,31 @@ from src.settings import settings
 log = structlog.get_logger()
 
 
+class ZipStream(io.RawIOBase):
+    """Несмещаемый (unseekable) буфер для zipfile: накапливает записанные байты до выдачи очередной части архива."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    @property
+    def pending(self) -> bool:
+        """Есть ли в буфере невыданные байты."""
+        return bool(self._chunks)
+
+    def pop(self) -> bytes:
+        """Отдает накопленные байты и очищает буфер."""
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
 class FileService:
     """Сервис для работы с моделью FileAttached."""
 
@@ -45,8 +75,8 @@ class FileService:
             await log.ainfo("{}".format(DIR_CREATED), folder=folder)
 
     async def get_all_files_names_in_folder(self, folder: Path) -> Sequence[str]:
-        """Отдает список имен всех файлов в директории."""
-        return [file.name for file in folder.glob('*')]
+        """Отдает список имен всех файлов в директории (без каталога хранилища содержимого)."""
+        return [file.name for file in folder.glob('*') if file.is_file()]
 
     async def rename_and_validate_file(self, file_timestamp: str, file: UploadFile) -> tuple[str, int]:
         """Переименовывает загружаемый файл под требуемый формат и валидирует его размер и тип."""
@@ -75,31 +105,89 @@ class FileService:
             raise HTTPException(status_code=403, detail=details)
         return file_name, file_size
 
+    async def get_blob_path(self, files_folder: Path, content_hash: str) -> Path:
+        """Путь к содержимому файла в хранилище: каталоги шардируются по первым символам хэша."""
+        return files_folder.joinpath(settings.FILES_STORE_DIR, content_hash[:2], content_hash[2:4], content_hash)
+
+    async def save_file_in_folder(self, file: UploadFile, file_path: Path) -> tuple[int, str]:
+        """
+        Потоково пишет загружаемый файл частями по FILE_UPLOAD_CHUNK_SIZE (запись - в пуле потоков), считая его хэш
+        и проверяя MAX_FILE_SIZE_DOWNLOAD по мере чтения: недописанный файл удаляется.
+        Содержимое хранится один раз в хранилище (по хэшу), а file_path - жесткая ссылка на него.
+        Отдает размер в байтах и хэш содержимого.
+        """
+        max_file_size = settings.MAX_FILE_SIZE_DOWNLOAD * FILE_SIZE_IN
+        file_size = 0
+        content_hash = hashlib.sha256()
+        store_folder = file_path.parent.joinpath(settings.FILES_STORE_DIR)
+        await anyio.Path(store_folder).mkdir(parents=True, exist_ok=True)
+        temp_path = store_folder.joinpath(uuid.uuid4().hex + TEMP_FILE_SUFFIX)
+        await file.seek(0)
+        async with await anyio.open_file(temp_path, "wb") as f:
+            while chunk := await file.read(settings.FILE_UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > max_file_size:
+                    break
+                await anyio.to_thread.run_sync(content_hash.update, chunk)
+                await f.write(chunk)
+        if file_size > max_file_size:
+            await anyio.Path(temp_path).unlink(missing_ok=True)
+            details = "{}{}{}{}{}".format(
+                file_path.name,
+                FIlE_SIZE_EXCEEDED,
+                round(file_size / FILE_SIZE_IN, ROUND_FILE_SIZE),
+                ALLOWED_FILE_SIZE_DOWNLOAD,
+                settings.MAX_FILE_SIZE_DOWNLOAD
+            )
+            await log.aerror(details)
+            raise HTTPException(status_code=403, detail=details)
+        content_hash = content_hash.hexdigest()
+        blob_path = anyio.Path(await self.get_blob_path(file_path.parent, content_hash))
+        if await blob_path.exists():  # the same content is already stored: keep only a new link to it
+            await anyio.Path(temp_path).unlink()
+            await log.ainfo("{}".format(FILE_CONTENT_DEDUPLICATED), file=file_path.name, content_hash=content_hash)
+        else:
+            await blob_path.parent.mkdir(parents=True, exist_ok=True)
+            await anyio.Path(temp_path).replace(blob_path)
+        await anyio.Path(file_path).unlink(missing_ok=True)  # a file with the same name is overwritten as before
+        try:
+            await anyio.Path(file_path).hardlink_to(blob_path)
+        except OSError:  # file system without hard links: fall back to a copy
+            await anyio.to_thread.run_sync(shutil.copyfile, blob_path, file_path)
+        return file_size, content_hash
+
     async def download_files_in_folder(
             self,
             files: list[UploadFile],
             files_folder: Path,
             file_timestamp: str = FILE_NAME_SAVE_FORMAT
-    ) -> list[str] | dict:
-        """Загружает файлы в указанный каталог на сервере."""
+    ) -> tuple[list[str], list[dict]]:
+        """Загружает файлы в указанный каталог на сервере и отдает их имена и метаданные (размер, тип, хэш)."""
         file_names_downloaded = []
+        files_metadata = []
         await self.check_folder_exists(files_folder)
         for file in files:
             file_name_and_size = await self.rename_and_validate_file(file_timestamp, file)
             try:
-                with open(files_folder.joinpath(file_name_and_size[0]), "wb") as f:
-                    f.write(file.file.read())
-                file_names_downloaded.append(file_name_and_size[0])
-            except Exception as e:
-                return {"message": e.args}
+                file_size, content_hash = await self.save_file_in_folder(
+                    file, files_folder.joinpath(file_name_and_size[0])
+                )
+            except OSError as e:
+                details = "{}{}{}".format(FILES_DOWNLOAD_ERROR, file_name_and_size[0], e.args)
+                await log.aerror(details, downloaded=file_names_downloaded)
+                raise HTTPException(status_code=409, detail=details)
+            file_names_downloaded.append(file_name_and_size[0])
+            files_metadata.append({"size": file_size, "content_type": file.content_type, "content_hash": content_hash})
         await log.ainfo("{}".format(FILES_UPLOADED), files=file_names_downloaded)
-        return file_names_downloaded
+        return file_names_downloaded, files_metadata
 
     async def write_files_in_db(
             self,
             file_names_downloaded: list[str],
             files_to_write: list[UploadFile],
-            file_timestamp: str = FILE_NAME_SAVE_FORMAT
+            file_timestamp: str = FILE_NAME_SAVE_FORMAT,
+            files_metadata: Sequence[dict] = (),
+            user_id: int | None = None,
     ) -> tuple[list[str], list[int]]:
         """Пишет файлы в БД и проверяет, что загруженные файлы соответствуют тем, что записываются в БД."""
         file_names_written_in_db = []
@@ -113,14 +201,13 @@ class FileService:
             raise HTTPException(status_code=409, detail=details)
         file_names_written_in_db = []
         to_create = []
-        for file in files_to_write:
+        files_metadata = list(files_metadata) or [
+            {"size": file.size, "content_type": file.content_type} for file in files_to_write
+        ]
+        for file, file_metadata in zip(files_to_write, files_metadata):
             file_name_and_size = await self.rename_and_validate_file(file_timestamp, file)
             file_name = file_name_and_size[0]
-            file_size = file_name_and_size[1]
-            file_object = {
-                "name": file_name,
-                "file": bytes("{}{}".format(file_size, FILE_SIZE_VOLUME), FILE_SIZE_ENCODE),
-            }
+            file_object = {"name": file_name, "user_id": user_id, **file_metadata}
             file_names_written_in_db.append(file_name)
             to_create.append(FileAttached(**FileCreate(**file_object).model_dump()))  # create with pydantic validate!
         files_in_db: Sequence[FileAttached] = await self._repository.create_all(to_create)
@@ -131,12 +218,15 @@ class FileService:
             self,
             files_to_upload: list[UploadFile],
             files_folder: Path,
-            file_timestamp: str = FILE_NAME_SAVE_FORMAT
+            file_timestamp: str = FILE_NAME_SAVE_FORMAT,
+            user_id: int | None = None,
     ) -> tuple[list[str], list[int]]:
         """Сохраняет файлы, записывает их в БД и отдает их имена и ids."""
-        file_names_downloaded = await self.download_files_in_folder(files_to_upload, files_folder, file_timestamp)
+        file_names_downloaded, files_metadata = await self.download_files_in_folder(
+            files_to_upload, files_folder, file_timestamp
+        )
         file_names_and_ids_written_in_db = await self.write_files_in_db(
-            file_names_downloaded, files_to_upload, file_timestamp
+            file_names_downloaded, files_to_upload, file_timestamp, files_metadata, user_id
         )
         await log.ainfo(
             "{}".format(FILES_IDS_WRITTEN_DB),
@@ -145,6 +235,29 @@ class FileService:
         )
         return file_names_and_ids_written_in_db
 
+    async def release_blobs(self, content_hashes: Sequence[str | None], files_folder: Path) -> list[str]:
+        """
+        Подсчет ссылок: удаляет из хранилища содержимое, на которое больше не ссылается ни одна запись FileAttached.
+        Отдает хэши удаленного содержимого.
+        """
+        content_hashes = {content_hash for content_hash in content_hashes if content_hash is not None}
+        if not content_hashes:
+            return []
+        referenced: set[str] = await self._repository.get_referenced_content_hashes(content_hashes)
+        released = sorted(content_hashes - referenced)
+        for content_hash in released:
+            await anyio.Path(await self.get_blob_path(files_folder, content_hash)).unlink(missing_ok=True)
+        await log.ainfo("{}".format(FILE_CONTENT_RELEASED), released=released)
+        return released
+
+    async def release_unreferenced_blobs(self, files_folder: Path) -> list[str]:
+        """Удаляет из хранилища все содержимое, на которое не ссылается ни одна запись FileAttached."""
+        store_folder = files_folder.joinpath(settings.FILES_STORE_DIR)
+        stored_hashes: list[str] = await anyio.to_thread.run_sync(
+            lambda: [blob.name for blob in store_folder.glob("*/*/*") if blob.is_file()]
+        )
+        return await self.release_blobs(stored_hashes, files_folder)
+
     async def prepare_files_to_work_with(self, files_attributes: Sequence[int | str], files_dir: Path) -> list[Path]:
         """Отдает список файлов (Path) для последующей обработки."""
         if isinstance(files_attributes[0], str):
@@ -176,24 +289,44 @@ class FileService:
         return await self._repository.remove_all(FileAttached, files_to_delete)
 
     async def zip_files(self, files_to_zip: list[Path]) -> Response | dict:
-        """Архивирует в zip список переданных файлов."""
-        virtual_binary_file = io.BytesIO()  # Open to grab in-memory ZIP contents: virtual binary data file for r & w
-        zip_file = zipfile.ZipFile(virtual_binary_file, "w")
-        for file_path in files_to_zip:
-            file_dir, file_name = os.path.split(file_path)  # Calculate path for file in zip
+        """Архивирует в zip список переданных файлов: архив отдается потоково, по мере упаковки файлов."""
+        for file_path in files_to_zip:  # check files before streaming: the response status can't be changed later
+            file_dir, file_name = os.path.split(file_path)
             try:
-                zip_file.write(file_path, file_name)  # Add file, at correct path
+                await anyio.Path(file_path).stat()
             except FileNotFoundError as e:
                 details = "{}{}".format(FILES_IN_FOLDER, NOT_FOUND)
                 await log.aerror(details, files_to_zip=files_to_zip, error=e, file_not_found=file_name)
                 return {"message": e.args, "file_not_found": file_name}
-        zip_file.close()  # Must close zip for all contents to be written
-        return Response(
-            virtual_binary_file.getvalue(),  # Grab ZIP file from in-memory, make response with correct MIME-type
+        return StreamingResponse(
+            self.stream_zip(files_to_zip),
             media_type="application/x-zip-compressed",
             headers={'Content-Disposition': f'attachment;filename={FILE_NAME_SAVE_FORMAT + "_archive.zip"}'}
         )
 
+    async def stream_zip(self, files_to_zip: list[Path]) -> AsyncIterator[bytes]:
+        """
+        Отдает zip-архив частями: файлы читаются по FILE_UPLOAD_CHUNK_SIZE, а чтение и сжатие идут в пуле потоков.
+        Уже сжатые форматы (ZIP_STORED_FILE_TYPES) кладутся в архив без сжатия.
+        """
+        zip_stream = ZipStream()
+        with zipfile.ZipFile(zip_stream, "w") as zip_file:
+            for file_path in files_to_zip:
+                file_dir, file_name = os.path.split(file_path)  # Calculate path for file in zip
+                zip_info = zipfile.ZipInfo.from_file(file_path, file_name)
+                zip_info.compress_type = (
+                    zipfile.ZIP_STORED if file_path.suffix.lower().lstrip(".") in settings.ZIP_STORED_FILE_TYPES
+                    else zipfile.ZIP_DEFLATED
+                )
+                async with await anyio.open_file(file_path, "rb") as source:
+                    with zip_file.open(zip_info, "w") as zip_entry:
+                        while chunk := await source.read(settings.FILE_UPLOAD_CHUNK_SIZE):
+                            await anyio.to_thread.run_sync(zip_entry.write, chunk)
+                            if zip_stream.pending:  # deflate may buffer the chunk without output
+                                yield zip_stream.pop()
+                yield zip_stream.pop()  # the rest of the entry and its data descriptor are written on close
+        yield zip_stream.pop()  # central directory is written on close of the archive
+
     async def get_arrays_intersection(
             self, array_1: Sequence[str | int], array_2: Sequence[str | int]
     ) -> Sequence[str | int]:
@@ -218,9 +351,18 @@ class FileService:
         """Возвращает все объекты модели из базы данных."""
         return await self._repository.get_all()
 
+    async def search(
+            self,
+            search_text: str,
+            limit: int | None = None,
+            cursor: str | None = None
+    ) -> tuple[Sequence[FileAttached], str | None]:
+        """Возвращает страницу найденных по имени файлов (по релевантности) и курсор следующей страницы."""
+        return await self._repository.search(search_text, limit, cursor)
+
     async def get_all_db_file_names_and_ids(self) -> tuple[list[str], list[int]]:
         """Отдает кортеж из имен и их ids всех файлов в БД."""
-        db_files = await self._repository.get_all()
+        db_files = await self._repository.get_all_names_and_ids()
         return [db_file.name for db_file in db_files], [db_file.id for db_file in db_files]
 
     async def get_all_for_search_word(self, search_word: str) -> Sequence[FileAttached]:
@@ -233,8 +375,7 @@ class FileService:
 
     async def get_names_by_file_ids(self, ids: Sequence[int]) -> Sequence[str]:
         """Отдает имена файлов, по их ids."""
-        files: Sequence[FileAttached] = await self._repository.get_by_ids(ids)
-        return [file.name for file in files]
+        return await self._repository.get_names_by_ids(ids)
 
     async def get_all_file_ids_from_tasks(self) -> Sequence[int]:
         """Отдает ids файлов, привязанных ко всем задачам."""
@@ -258,7 +399,9 @@ class FileService:
             await log.aerror(details, intersection=intersection)
             raise HTTPException(status_code=403, detail=details)
         files_to_remove: Sequence[Path] = await self.prepare_files_to_work_with(files, folder)
+        content_hashes: Sequence[str | None] = await self._repository.get_content_hashes_by_ids(files)
         await log.ainfo("{}".format(FILES_TO_REMOVE), files_to_remove=files_to_remove)
         await self.delete_files_in_folder(files_to_remove)
         await self.delete_files_in_db(files)
+        await self.release_blobs(content_hashes, folder)
         return files_to_remove
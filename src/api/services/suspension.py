@@ -8,10 +8,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.api.constants import *
 from src.api.schema import SuspensionCreate
 from src.core.db import get_session
+from src.core.db.analytics_cache import analytics_cache
 from src.core.db.models import FileAttached, Suspension, SuspensionsFiles, User
-from src.core.db.repository import (FileRepository, SuspensionRepository,
-                                    UsersRepository)
+from src.core.db.repository import (DataVersionRepository, FileRepository,
+                                    SuspensionRepository, UsersRepository)
 from src.core.enums import TechProcess
+from src.core.exceptions import NotFoundException
 
 log = structlog.get_logger()
 
@@ -24,13 +26,21 @@ class SuspensionService:
         file_repository: FileRepository = Depends(),
         suspension_repository: SuspensionRepository = Depends(),
         users_repository: UsersRepository = Depends(),
+        data_version_repository: DataVersionRepository = Depends(),
         session: AsyncSession = Depends(get_session)
     ) -> None:
         self._file_repository: FileRepository = file_repository
         self._repository: SuspensionRepository = suspension_repository
         self._users_repository: UsersRepository = users_repository
+        self._data_version_repository: DataVersionRepository = data_version_repository
         self._session: AsyncSession = session
 
+    async def get_data_version(self) -> tuple:
+        """Версия данных простоев для кэша аналитики: общая для всех процессов, ее увеличивают триггеры БД."""
+        return tuple(
+            tuple(row) for row in await self._data_version_repository.get_versions([Suspension.__tablename__])
+        )
+
     async def change_schema_response(self, suspension: Suspension, user: User = None) -> dict:
         """Изменяет и добавляет поля в словарь в целях наглядного представления в ответе api."""
         if user is None:
@@ -67,12 +77,43 @@ class SuspensionService:
             raise HTTPException(status_code=206, detail=details)
         return files_names_and_ids_from_file_attached[0]
 
+    async def get_files_names_for_suspensions(  # move to services/base.py todo
+            self,
+            suspensions: Sequence[Suspension],
+    ) -> dict[int, list[str]]:
+        """Отдает имена файлов для списка простоев за 1 запрос в БД, сгруппированные по id простоя в памяти."""
+        files_names_for_suspensions: dict[int, list[str]] = {suspension.id: [] for suspension in suspensions}
+        files_ids_for_suspensions: dict[int, list[int]] = {suspension.id: [] for suspension in suspensions}
+        relations = await self._repository.get_files_names_for_suspensions(list(files_names_for_suspensions))
+        for suspension_id, file_id, file_name in relations:
+            files_ids_for_suspensions[suspension_id].append(file_id)
+            if file_name is not None:
+                files_names_for_suspensions[suspension_id].append(file_name)
+        for suspension_id, files_ids in files_ids_for_suspensions.items():
+            if len(files_ids) != len(files_names_for_suspensions[suspension_id]):
+                details = "{}{}{}{}{}".format(
+                    SUSPENSION, suspension_id, SUSPENSION_FILES_MISMATCH, files_ids,
+                    files_names_for_suspensions[suspension_id]
+                )
+                await log.aerror(
+                    details,
+                    suspension_id=suspension_id,
+                    ids_from_suspension_files=files_ids,
+                    names_from_file_attached=files_names_for_suspensions[suspension_id]
+                )
+                raise HTTPException(status_code=206, detail=details)
+        return files_names_for_suspensions
+
     async def perform_changed_schema(  # move to services/base.py (change_schema_response - своя, а сервис общий) todo
             self,
             suspensions: Suspension | Sequence[Suspension],
             user: User | None = None
     ) -> Sequence[dict]:
-        """Готовит список словарей для отправки в api."""
+        """
+        Готовит список словарей для отправки в api.
+        Список простоев собирается пакетно: пользователи должны быть загружены вместе с простоями (joinedload),
+        а имена файлов запрашиваются одним запросом для всего списка.
+        """
         list_changed_response = []
         if not isinstance(suspensions, Sequence):
             file_names: Sequence[str] = await self.validate_files_exist_and_get_file_names(suspensions.id)
@@ -80,10 +121,12 @@ class SuspensionService:
             suspensions_response["extra_files"]: list[str] = file_names
             list_changed_response.append(suspensions_response)
         else:
+            files_names_for_suspensions = await self.get_files_names_for_suspensions(suspensions)
             for suspension in suspensions:
-                file_names: Sequence[str] = await self.validate_files_exist_and_get_file_names(suspension.id)
-                suspension_response: dict = await self.change_schema_response(suspension, user)
-                suspension_response["extra_files"]: list[str] = file_names
+                suspension_response: dict = await self.change_schema_response(
+                    suspension, suspension.user if user is None else user
+                )
+                suspension_response["extra_files"]: list[str] = files_names_for_suspensions[suspension.id]
                 list_changed_response.append(suspension_response)
         return list_changed_response
 
@@ -112,9 +155,22 @@ class SuspensionService:
         """Возвращает объект модели из базы."""
         return await self._repository.get(suspension_id)
 
-    async def get_all(self) -> Sequence[Suspension]:  # move to services/base.py todo
-        """Возвращает все объекты модели из базы."""
-        return await self._repository.get_all()  # todo сделать новую с user, чтобы не делать 1000 запросов к БД
+    async def search(
+            self,
+            search_text: str,
+            limit: int | None = None,
+            cursor: str | None = None
+    ) -> tuple[Sequence[Suspension], str | None]:
+        """Возвращает страницу найденных полнотекстовым поиском объектов (по релевантности) и курсор следующей."""
+        return await self._repository.search(search_text, limit, cursor)
+
+    async def get_all(
+            self,
+            limit: int | None = None,
+            cursor: str | None = None
+    ) -> tuple[Sequence[Suspension], str | None]:  # move to services/base.py todo
+        """Возвращает страницу объектов модели из базы и курсор следующей страницы."""
+        return await self._repository.get_all(limit, cursor)
 
     async def count_suspensions_for_period(
             self,
@@ -123,7 +179,11 @@ class SuspensionService:
             finish_sample: datetime = FROM_TIME_NOW
     ) -> int:
         """Количество простоев в периоде для пользователя (или для всех, если пользователь не передан)."""
-        return await self._repository.count_for_period_for_user(user_id, start_sample, finish_sample)
+        return await analytics_cache.read_through(
+            ("count", user_id, start_sample, finish_sample),
+            await self.get_data_version(),
+            lambda: self._repository.count_for_period_for_user(user_id, start_sample, finish_sample),
+        )
 
     async def get_last_suspension_id(self, user_id: int) -> int:
         """Возвращает id крайнего случая простоя, зафиксированного текущим пользователем (или всех)."""
@@ -134,18 +194,27 @@ class SuspensionService:
         last_suspension = await self._repository.get(await self._repository.get_last_id_by_time_for_user(user_id))
         return last_suspension.suspension_start
 
-    async def get_all_my_suspensions(self, user_id: int) -> Sequence[Suspension]:
-        """Возвращает из БД все случаи простоя, зафиксированные текущим пользователем."""
-        return await self._repository.get_suspensions_for_user(user_id)
+    async def get_all_my_suspensions(
+            self,
+            user_id: int,
+            limit: int | None = None,
+            cursor: str | None = None
+    ) -> tuple[Sequence[Suspension], str | None]:
+        """Возвращает из БД страницу случаев простоя, зафиксированных текущим пользователем."""
+        return await self._repository.get_suspensions_for_user(user_id, limit, cursor)
 
     async def get_suspensions_for_users(
         self,
         user_id: int | None,
         start_sample: datetime = TO_TIME_PERIOD,
-        finish_sample: datetime = FROM_TIME_NOW
-    ) -> Sequence[Suspension]:
-        """Cписок простоев в периоде для пользователя (или для всех, если пользователь не передан)."""
-        return await self._repository.get_suspensions_for_period_for_user(user_id, start_sample, finish_sample)
+        finish_sample: datetime = FROM_TIME_NOW,
+        limit: int | None = None,
+        cursor: str | None = None
+    ) -> tuple[Sequence[Suspension], str | None]:
+        """Cтраница простоев в периоде для пользователя (или для всех, если пользователь не передан)."""
+        return await self._repository.get_suspensions_for_period_for_user(
+            user_id, start_sample, finish_sample, limit, cursor
+        )
 
     async def sum_suspensions_time_for_period(
             self,
@@ -154,8 +223,10 @@ class SuspensionService:
             finish_sample: datetime = FROM_TIME_NOW
     ) -> int:
         """Сумма простоев в периоде для пользователя (или для всех, если пользователь не передан)."""
-        total_time_suspensions = await self._repository.sum_time_for_period_for_user(
-            user_id, start_sample, finish_sample
+        total_time_suspensions = await analytics_cache.read_through(
+            ("sum", user_id, start_sample, finish_sample),
+            await self.get_data_version(),
+            lambda: self._repository.sum_time_for_period_for_user(user_id, start_sample, finish_sample),
         )
         if total_time_suspensions is None:
             return 0
@@ -168,13 +239,37 @@ class SuspensionService:
             finish_sample: datetime = FROM_TIME_NOW
     ) -> int:
         """Максимальный простой в периоде для пользователя (или для всех, если пользователь не передан)."""
-        max_time_for_period = await self._repository.suspension_max_time_for_period_for_user(
-            user_id, start_sample, finish_sample
+        max_time_for_period = await analytics_cache.read_through(
+            ("max", user_id, start_sample, finish_sample),
+            await self.get_data_version(),
+            lambda: self._repository.suspension_max_time_for_period_for_user(user_id, start_sample, finish_sample),
         )
         if max_time_for_period is None:
             return 0
         return round(max_time_for_period * settings.SUSPENSION_DISPLAY_TIME)  # in mins as part of a day
 
+    async def get_analytics_for_period(
+            self,
+            user_id: int | None,
+            start_sample: datetime = TO_TIME_PERIOD,
+            finish_sample: datetime = FROM_TIME_NOW
+    ) -> dict:
+        """Итоги аналитики простоев в периоде для пользователя (или для всех) одним запросом в БД или из кэша."""
+        analytics = await analytics_cache.read_through(
+            ("analytics", user_id, start_sample, finish_sample),
+            await self.get_data_version(),
+            lambda: self._repository.get_analytics_for_period_for_user(user_id, start_sample, finish_sample),
+        )
+        if analytics.last_suspension_id is None:
+            raise NotFoundException(object_name=Suspension.__name__, object_id=None)
+        return dict(
+            suspensions_in_mins_total=round((analytics.sum_time or 0) * settings.SUSPENSION_DISPLAY_TIME),
+            suspensions_total=analytics.suspensions_total,
+            suspension_max_time_for_period=round((analytics.max_time or 0) * settings.SUSPENSION_DISPLAY_TIME),
+            last_time_suspension=analytics.last_suspension_start,
+            last_time_suspension_id=analytics.last_suspension_id,
+        )
+
     async def remove(self, suspension_id: int) -> None:
         """Удаляет объект модели из базы данных."""
         return await self._repository.remove(await self._repository.get(suspension_id))
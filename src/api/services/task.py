@@ -69,13 +69,40 @@ class TaskService:
             raise HTTPException(status_code=206, detail=details)
         return files_names_and_ids_from_file_attached[0]
 
+    async def get_files_names_for_tasks(self, tasks: Sequence[Task]) -> dict[int, list[str]]:  # todo в base.py
+        """Отдает имена файлов для списка задач за 1 запрос в БД, сгруппированные по id задачи в памяти."""
+        files_names_for_tasks: dict[int, list[str]] = {task.id: [] for task in tasks}
+        files_ids_for_tasks: dict[int, list[int]] = {task.id: [] for task in tasks}
+        relations = await self._repository.get_files_names_for_tasks(list(files_names_for_tasks))
+        for task_id, file_id, file_name in relations:
+            files_ids_for_tasks[task_id].append(file_id)
+            if file_name is not None:
+                files_names_for_tasks[task_id].append(file_name)
+        for task_id, files_ids in files_ids_for_tasks.items():
+            if len(files_ids) != len(files_names_for_tasks[task_id]):
+                details = "{}{}{}{}{}".format(
+                    TASK, task_id, TASKS_FILES_MISMATCH, files_ids, files_names_for_tasks[task_id]
+                )
+                await log.aerror(
+                    details,
+                    task_id=task_id,
+                    ids_from_task_files=files_ids,
+                    names_from_file_attached=files_names_for_tasks[task_id]
+                )
+                raise HTTPException(status_code=206, detail=details)
+        return files_names_for_tasks
+
     async def perform_changed_schema(  # move to services/base.py (change_schema_response - своя, а сервис общий) todo
             self,
             tasks: Task | Sequence[Task],
             user: User | None = None,
             executor: User | None = None
     ) -> Sequence[dict]:
-        """Готовит список словарей для отправки в api."""
+        """
+        Готовит список словарей для отправки в api.
+        Список задач собирается пакетно: постановщик и исполнитель должны быть загружены вместе с задачами
+        (joinedload), а имена файлов запрашиваются одним запросом для всего списка.
+        """
         list_changed_response = []
         if not isinstance(tasks, Sequence):
             file_names: Sequence[str] = await self.validate_files_exist_and_get_file_names(tasks.id)
@@ -83,10 +110,14 @@ class TaskService:
             task_response["extra_files"]: list[str] = file_names
             list_changed_response.append(task_response)
         else:
+            files_names_for_tasks = await self.get_files_names_for_tasks(tasks)
             for task in tasks:
-                file_names: Sequence[str] = await self.validate_files_exist_and_get_file_names(task.id)
-                task_response: dict = await self.change_schema_response(task, user, executor)
-                task_response["extra_files"]: list[str] = file_names
+                task_response: dict = await self.change_schema_response(
+                    task,
+                    task.user if user is None else user,
+                    task.executor if executor is None else executor
+                )
+                task_response["extra_files"]: list[str] = files_names_for_tasks[task.id]
                 list_changed_response.append(task_response)
         return list_changed_response
 
@@ -115,21 +146,48 @@ class TaskService:
         """Возвращает объект модели из базы."""
         return await self._repository.get(task_id)
 
-    async def get_all(self) -> Sequence[Task]:  # move to services/base.py todo
-        """Возвращает все объекты модели из базы."""
-        return await self._repository.get_all()
-
-    async def get_all_opened(self) -> Sequence[Task]:
-        """Возвращает все незакрытые задачи из базы."""
-        return await self._repository.get_all_opened()
+    async def search(
+            self,
+            search_text: str,
+            limit: int | None = None,
+            cursor: str | None = None
+    ) -> tuple[Sequence[Task], str | None]:
+        """Возвращает страницу найденных полнотекстовым поиском объектов (по релевантности) и курсор следующей."""
+        return await self._repository.search(search_text, limit, cursor)
+
+    async def get_all(
+            self,
+            limit: int | None = None,
+            cursor: str | None = None
+    ) -> tuple[Sequence[Task], str | None]:  # move to services/base.py todo
+        """Возвращает страницу объектов модели из базы и курсор следующей страницы."""
+        return await self._repository.get_all(limit, cursor)
 
-    async def get_tasks_ordered(self, user_id: int) -> Sequence[Task]:
-        """Возвращает выставленные текущим пользователем задачи из базы."""
-        return await self._repository.get_tasks_ordered(user_id)
+    async def get_all_opened(
+            self,
+            limit: int | None = None,
+            cursor: str | None = None
+    ) -> tuple[Sequence[Task], str | None]:
+        """Возвращает страницу незакрытых задач из базы и курсор следующей страницы."""
+        return await self._repository.get_all_opened(limit, cursor)
 
-    async def get_my_tasks_todo(self, user_id: int) -> Sequence[Task]:
-        """Возвращает выставленные текущему пользователю задачи из базы."""
-        return await self._repository.get_tasks_todo(user_id)
+    async def get_tasks_ordered(
+            self,
+            user_id: int,
+            limit: int | None = None,
+            cursor: str | None = None
+    ) -> tuple[Sequence[Task], str | None]:
+        """Возвращает страницу выставленных текущим пользователем задач из базы."""
+        return await self._repository.get_tasks_ordered(user_id, limit, cursor)
+
+    async def get_my_tasks_todo(
+            self,
+            user_id: int,
+            limit: int | None = None,
+            cursor: str | None = None
+    ) -> tuple[Sequence[Task], str | None]:
+        """Возвращает страницу выставленных текущему пользователю задач из базы."""
+        return await self._repository.get_tasks_todo(user_id, limit, cursor)
 
     async def remove(self, task_id: int) -> None:
         """Удаляет объект модели из базы."""
@@ -1,5 +1,4 @@
 """src/application.py"""
-import asyncio
 from datetime import datetime
 
 import structlog
@@ -7,11 +6,10 @@ from asgi_correlation_id import CorrelationIdMiddleware
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.api.constants import ETAG, NEXT_CURSOR
 from src.core.logging.middleware import LoggingMiddleware
 from src.core.logging.setup import setup_logging
 from src.core.logging.utils import logger_decor
-from src.services.db_backup import DBBackupService
-from src.services.register_connection_errors import ConnectionErrorService
 from src.settings import settings
 
 log = structlog.get_logger().bind(file_name=__file__)
@@ -31,6 +29,7 @@ def add_middleware(app: FastAPI):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[ETAG, NEXT_CURSOR],  # validator of the response and cursor of the next page of list endpoints
     )
     setup_logging()  # Procharity example of pytest settings
     app.add_middleware(LoggingMiddleware)  # creates api logs
@@ -50,8 +49,6 @@ def create_app() -> FastAPI:
     async def startup_event():
         """Действия при запуске сервера."""
         await log.ainfo("Server_started", time=str(datetime.now()))
-        asyncio.create_task(ConnectionErrorService().run_check_connection())
-        asyncio.create_task(DBBackupService().run_db_backup()) if settings.DB_BACKUP else None
 
     @app.on_event("shutdown")
     @logger_decor
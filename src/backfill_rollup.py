@@ -0,0 +1,27 @@
+"""src/backfill_rollup.py
+
+Пересборка дневных итогов простоев suspension_daily_rollup по всем простоям БД
+(после загрузки данных в обход триггеров или для сверки; в обычной работе итоги ведут триггеры БД):
+python -m src.backfill_rollup
+"""
+import argparse
+import asyncio
+
+from src.core.db.db import async_session_maker
+from src.core.db.repository.suspension import SuspensionRepository
+from src.core.logging.setup import setup_logging
+
+
+async def backfill_rollup() -> int:
+    async with async_session_maker() as session:
+        return await SuspensionRepository(session).rebuild_daily_rollup()
+
+
+def start_backfill_rollup():
+    argparse.ArgumentParser(description="Пересборка дневных итогов простоев по всем простоям БД.").parse_args()
+    setup_logging()
+    print(f"suspension_daily_rollup rows: {asyncio.run(backfill_rollup())}")
+
+
+if __name__ == "__main__":
+    start_backfill_rollup()
@@ -0,0 +1,62 @@
+"""src/core/db/analytics_cache.py"""
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from src.settings import settings
+
+
+class AnalyticsEntry(NamedTuple):
+    expires: float
+    data_version: tuple  # data version of the suspensions the value is computed from
+    value: Any
+
+
+class AnalyticsCache:
+    """
+    Кэш итогов аналитики простоев в памяти процесса: LRU на max_entries записей с ключом
+    (вид итога, пользователь или None - все, начало периода, конец периода).
+    Запись помечена версией данных простоев (data_versions, ее увеличивают триггеры БД при любой записи)
+    и отдается, только пока версия не изменилась: записи простоев из любого процесса (API, воркер мониторинга)
+    и восстановление БД сразу делают итоги устаревшими без сброса кэша в каждом процессе.
+    """
+
+    def __init__(self, max_entries: int = settings.ANALYTICS_CACHE_SIZE, ttl: float = settings.ANALYTICS_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, AnalyticsEntry] = OrderedDict()
+
+    async def read_through(
+            self,
+            key: tuple[str, int | None, datetime, datetime],
+            data_version: tuple,
+            compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Итог по ключу из кэша или вычисленный compute() и запомненный.
+        data_version - версия данных простоев, прочитанная до compute(): итог, посчитанный во время записи, устареет.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires >= time.monotonic() and entry.data_version == data_version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+        self.misses += 1
+        value = await compute()
+        if self.max_entries > 0 and self.ttl > 0:
+            self._entries[key] = AnalyticsEntry(time.monotonic() + self.ttl, data_version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Сбрасывает все итоги."""
+        self._entries.clear()
+
+
+analytics_cache = AnalyticsCache()  # one cache per process
@@ -0,0 +1,136 @@
+"""src/core/db/daily_rollup.py"""
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import MetaData, event
+
+DAILY_ROLLUP_TABLE = "suspension_daily_rollup"
+DAILY_ROLLUP_TRIGGER = "suspension_daily_rollup_sync"
+MINUTES_IN_DAY = 24 * 60
+ROLLUP_SOURCE_TABLE = "suspensions"
+ROLLUP_SOURCE_COLUMNS = ("suspension_start", "suspension_finish", "user_id", "tech_process", "risk_accident")
+
+
+def sqlite_daily_rollup_ddl() -> list[str]:
+    """
+    Триггеры SQLite, поддерживающие дневные итоги простоев при каждой записи в suspensions (из ORM, Core,
+    массового удаления или внешнего скрипта): вставка прибавляет простой к итогу своего дня, удаление вычитает,
+    изменение - вычитает старую версию и прибавляет новую. Максимум после вычитания пересчитывается по дню группы.
+    """
+    def minutes(row: str) -> str:
+        return f"coalesce((julianday({row}.suspension_finish) - julianday({row}.suspension_start)) * {MINUTES_IN_DAY}, 0)"
+
+    def group(row: str) -> str:
+        return (
+            f"day = date({row}.suspension_start) AND user_id = {row}.user_id "
+            f"AND tech_process = {row}.tech_process AND risk_accident = coalesce({row}.risk_accident, '')"
+        )
+
+    add_new = (
+        f"INSERT INTO {DAILY_ROLLUP_TABLE} "
+        f"(day, user_id, tech_process, risk_accident, suspensions_total, total_minutes, max_minutes) "
+        f"SELECT date(new.suspension_start), new.user_id, new.tech_process, coalesce(new.risk_accident, ''), "
+        f"1, {minutes('new')}, {minutes('new')} WHERE new.suspension_start IS NOT NULL "
+        f"ON CONFLICT (day, user_id, tech_process, risk_accident) DO UPDATE SET "
+        f"suspensions_total = suspensions_total + 1, total_minutes = total_minutes + excluded.total_minutes, "
+        f"max_minutes = max(max_minutes, excluded.max_minutes);"
+    )
+    group_max = (
+        f"(SELECT max({minutes(ROLLUP_SOURCE_TABLE)}) FROM {ROLLUP_SOURCE_TABLE} "
+        f"WHERE user_id = old.user_id AND suspension_start >= date(old.suspension_start) "
+        f"AND suspension_start < date(old.suspension_start, '+1 day') AND tech_process = old.tech_process "
+        f"AND coalesce(risk_accident, '') = coalesce(old.risk_accident, ''))"
+    )
+    subtract_old = (
+        f"UPDATE {DAILY_ROLLUP_TABLE} SET suspensions_total = suspensions_total - 1, "
+        f"total_minutes = total_minutes - {minutes('old')}, "
+        f"max_minutes = CASE WHEN {minutes('old')} < max_minutes THEN max_minutes "
+        f"ELSE coalesce({group_max}, 0) END WHERE {group('old')}; "
+        f"DELETE FROM {DAILY_ROLLUP_TABLE} WHERE {group('old')} AND suspensions_total <= 0;"
+    )
+    columns = ", ".join(ROLLUP_SOURCE_COLUMNS)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {DAILY_ROLLUP_TRIGGER}_insert AFTER INSERT ON {ROLLUP_SOURCE_TABLE} "
+        f"BEGIN {add_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {DAILY_ROLLUP_TRIGGER}_delete AFTER DELETE ON {ROLLUP_SOURCE_TABLE} "
+        f"BEGIN {subtract_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {DAILY_ROLLUP_TRIGGER}_update AFTER UPDATE OF {columns} "
+        f"ON {ROLLUP_SOURCE_TABLE} BEGIN {subtract_old} {add_new} END",
+    ]
+
+
+def postgres_daily_rollup_ddl() -> list[str]:
+    """
+    Триггер Postgres с той же логикой, что и в SQLite: функция plpgsql на каждую строку suspensions.
+    Прибавление и вычитание идут под блокировкой строки итога, поэтому параллельные записи не теряются.
+    """
+    return [
+        f"""CREATE OR REPLACE FUNCTION {DAILY_ROLLUP_TRIGGER}() RETURNS trigger AS $$
+DECLARE
+    duration double precision;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.suspension_start IS NOT NULL THEN
+        duration := coalesce(EXTRACT(EPOCH FROM (OLD.suspension_finish - OLD.suspension_start)) / 60.0, 0);
+        UPDATE {DAILY_ROLLUP_TABLE} AS rollup SET
+            suspensions_total = rollup.suspensions_total - 1,
+            total_minutes = rollup.total_minutes - duration,
+            max_minutes = CASE WHEN duration < rollup.max_minutes THEN rollup.max_minutes ELSE coalesce((
+                SELECT max(coalesce(EXTRACT(EPOCH FROM (s.suspension_finish - s.suspension_start)) / 60.0, 0))
+                FROM {ROLLUP_SOURCE_TABLE} AS s
+                WHERE s.user_id = OLD.user_id AND s.suspension_start >= OLD.suspension_start::date
+                AND s.suspension_start < OLD.suspension_start::date + 1 AND s.tech_process = OLD.tech_process
+                AND coalesce(s.risk_accident, '') = coalesce(OLD.risk_accident, '')
+            ), 0) END
+        WHERE rollup.day = OLD.suspension_start::date AND rollup.user_id = OLD.user_id
+            AND rollup.tech_process = OLD.tech_process AND rollup.risk_accident = coalesce(OLD.risk_accident, '');
+        DELETE FROM {DAILY_ROLLUP_TABLE} AS rollup
+        WHERE rollup.day = OLD.suspension_start::date AND rollup.user_id = OLD.user_id
+            AND rollup.tech_process = OLD.tech_process AND rollup.risk_accident = coalesce(OLD.risk_accident, '')
+            AND rollup.suspensions_total <= 0;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.suspension_start IS NOT NULL THEN
+        duration := coalesce(EXTRACT(EPOCH FROM (NEW.suspension_finish - NEW.suspension_start)) / 60.0, 0);
+        INSERT INTO {DAILY_ROLLUP_TABLE} AS rollup
+            (day, user_id, tech_process, risk_accident, suspensions_total, total_minutes, max_minutes)
+        VALUES (
+            NEW.suspension_start::date, NEW.user_id, NEW.tech_process, coalesce(NEW.risk_accident, ''),
+            1, duration, duration
+        )
+        ON CONFLICT (day, user_id, tech_process, risk_accident) DO UPDATE SET
+            suspensions_total = rollup.suspensions_total + 1,
+            total_minutes = rollup.total_minutes + EXCLUDED.total_minutes,
+            max_minutes = GREATEST(rollup.max_minutes, EXCLUDED.max_minutes);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+        f"DROP TRIGGER IF EXISTS {DAILY_ROLLUP_TRIGGER} ON {ROLLUP_SOURCE_TABLE}",
+        f"CREATE TRIGGER {DAILY_ROLLUP_TRIGGER} AFTER INSERT OR DELETE OR UPDATE OF "
+        f"{', '.join(ROLLUP_SOURCE_COLUMNS)} ON {ROLLUP_SOURCE_TABLE} "
+        f"FOR EACH ROW EXECUTE FUNCTION {DAILY_ROLLUP_TRIGGER}()",
+    ]
+
+
+def register_daily_rollup(metadata: MetaData) -> None:
+    """Триггеры дневных итогов создаются после всех таблиц (create_all): им нужны и suspensions, и итоги."""
+
+    @event.listens_for(metadata, "after_create")
+    def create_daily_rollup_triggers(target: MetaData, connection, **kwargs) -> None:
+        if connection.dialect.name == "sqlite":
+            statements = sqlite_daily_rollup_ddl()
+        elif connection.dialect.name == "postgresql":
+            statements = postgres_daily_rollup_ddl()
+        else:
+            return
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+
+
+def split_period(start_sample: datetime, finish_sample: datetime) -> tuple[date, date] | None:
+    """
+    Делит период [start_sample, finish_sample] на целые дни [first_day, last_day) - их итоги берутся
+    из дневных итогов - и края: простои с началом до полуночи first_day и с полуночи last_day читаются из suspensions.
+    Возвращает None, если целых дней в периоде нет.
+    """
+    first_day = start_sample.date() if start_sample.time() == time.min else start_sample.date() + timedelta(days=1)
+    last_day = finish_sample.date()
+    return (first_day, last_day) if first_day < last_day else None
@@ -0,0 +1,54 @@
+"""src/core/db/data_version.py"""
+from sqlalchemy import Table, event
+
+DATA_VERSION_TABLE = "data_versions"
+DATA_VERSION_SUFFIX = "_data_version"
+
+
+def bump_version_sql(table_name: str) -> str:
+    """Увеличивает версию таблицы (первая запись создает строку версии); время отличает версии до и после восстановления БД."""
+    return (
+        f"INSERT INTO {DATA_VERSION_TABLE} (table_name, version) VALUES ('{table_name}', 1) "
+        f"ON CONFLICT (table_name) DO UPDATE SET version = {DATA_VERSION_TABLE}.version + 1, "
+        f"updated_at = CURRENT_TIMESTAMP;"
+    )
+
+
+def sqlite_data_version_ddl(table_name: str) -> list[str]:
+    """Триггеры SQLite на вставку, изменение и удаление строк таблицы: каждая запись увеличивает версию таблицы."""
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {table_name}{DATA_VERSION_SUFFIX}_{action.lower()} AFTER {action} '
+        f'ON "{table_name}" BEGIN {bump_version_sql(table_name)} END'
+        for action in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+def postgres_data_version_ddl(table_name: str) -> list[str]:
+    """Триггер Postgres на уровне оператора: одна версия на INSERT / UPDATE / DELETE / TRUNCATE, а не на строку."""
+    return [
+        f"""CREATE OR REPLACE FUNCTION bump{DATA_VERSION_SUFFIX}() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO {DATA_VERSION_TABLE} (table_name, version) VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (table_name) DO UPDATE SET version = {DATA_VERSION_TABLE}.version + 1, updated_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+        f'DROP TRIGGER IF EXISTS {table_name}{DATA_VERSION_SUFFIX} ON "{table_name}"',
+        f'CREATE TRIGGER {table_name}{DATA_VERSION_SUFFIX} AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE '
+        f'ON "{table_name}" FOR EACH STATEMENT EXECUTE FUNCTION bump{DATA_VERSION_SUFFIX}()',
+    ]
+
+
+def register_data_version(target: Table) -> None:
+    """Регистрирует версию данных таблицы для ETag: триггеры создаются вместе с таблицей (create_all)."""
+
+    @event.listens_for(target, "after_create")
+    def create_data_version_triggers(table_: Table, connection, **kwargs) -> None:
+        if connection.dialect.name == "sqlite":
+            statements = sqlite_data_version_ddl(table_.name)
+        elif connection.dialect.name == "postgresql":
+            statements = postgres_data_version_ddl(table_.name)
+        else:
+            return
+        for statement in statements:
+            connection.exec_driver_sql(statement)
@@ -1,15 +1,78 @@
 """src/core/db/db.py"""
-from typing import Generator
+from typing import Any, Generator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from src.settings import settings
 
 
-engine = create_async_engine(settings.DATABASE_URL, echo=settings.ECHO)  # echo=True см. SQL-запросы в консоли
+def get_engine_options(database_url: str) -> dict[str, Any]:
+    """
+    Настройки движка по диалекту: для SQLite - по умолчанию, для серверных СУБД - пул соединений
+    (размер, переполнение, проверка перед выдачей, пересоздание старых), для asyncpg - кэш подготовленных запросов.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {  # the cache of SQLAlchemy and the own cache of asyncpg
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+def get_sqlite_pragmas() -> dict[str, str | int]:
+    """
+    Профиль SQLite из настроек: busy_timeout - первым, чтобы и переключение журнала ждало блокировку, а не падало
+    с "database is locked"; WAL - читатели не ждут писателя; synchronous=NORMAL - fsync только на checkpoint.
+    """
+    return {
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Обработчик события connect: профиль применяется к каждому новому соединению пула."""
+    cursor = dbapi_connection.cursor()
+    for pragma, value in get_sqlite_pragmas().items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
+def add_sqlite_pragmas(async_engine: AsyncEngine) -> AsyncEngine:
+    """Подключает профиль SQLite (SQLITE_PRAGMAS) к движку; для других СУБД движок не меняется."""
+    if async_engine.dialect.name == "sqlite" and settings.SQLITE_PRAGMAS:
+        event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return async_engine
+
+
+engine = add_sqlite_pragmas(create_async_engine(  # echo=True см. SQL-запросы в консоли
+    settings.database_url, echo=settings.ECHO, **get_engine_options(settings.database_url)
+))
 # connect_args={"check_same_thread": False} - только для SQLlite
 # connect_args для create_async_engine не нужен!!!
+async_session_maker = async_sessionmaker(engine, expire_on_commit=False)  # one factory per process
+
 
 async def get_session() -> Generator[AsyncSession, None, None]:
-    async_session = async_sessionmaker(engine, expire_on_commit=False)
-    async with async_session() as session:
-        yield session
+    """
+    Сессия - единица работы запроса: FastAPI кэширует зависимость в пределах запроса, поэтому репозитории,
+    сервисы и менеджер пользователей одного запроса получают одну сессию. Сессия привязана к одному соединению
+    пула на весь запрос: commit фиксирует транзакцию, но соединение возвращается в пул только в конце запроса.
+    """
+    async with engine.connect() as connection:
+        async with async_session_maker(bind=connection) as session:
+            yield session
@@ -0,0 +1,49 @@
+"""src/core/db/expressions.py"""
+from sqlalchemy import Date, Float
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+SECONDS_IN_DAY = 24 * 60 * 60
+
+
+class days_between(FunctionElement):
+    """
+    Длительность между двумя моментами времени в сутках (дробное число) - одинаковое выражение для всех СУБД:
+    days_between(Suspension.suspension_start, Suspension.suspension_finish). SQL выбирается диалектом при компиляции.
+    """
+    type = Float()
+    inherit_cache = True
+    name = "days_between"
+
+
+@compiles(days_between)
+def compile_days_between(element: days_between, compiler, **kwargs) -> str:
+    start, finish = list(element.clauses)
+    return "(julianday({}) - julianday({}))".format(
+        compiler.process(finish, **kwargs), compiler.process(start, **kwargs)
+    )
+
+
+@compiles(days_between, "postgresql")
+def compile_days_between_postgresql(element: days_between, compiler, **kwargs) -> str:
+    start, finish = list(element.clauses)
+    return "(EXTRACT(EPOCH FROM ({} - {})) / {})".format(
+        compiler.process(finish, **kwargs), compiler.process(start, **kwargs), float(SECONDS_IN_DAY)
+    )
+
+
+class day_of(FunctionElement):
+    """День (дата без времени) момента времени: date() в SQLite, приведение к date в Postgres."""
+    type = Date()
+    inherit_cache = True
+    name = "day_of"
+
+
+@compiles(day_of)
+def compile_day_of(element: day_of, compiler, **kwargs) -> str:
+    return "date({})".format(compiler.process(element.clauses, **kwargs))
+
+
+@compiles(day_of, "postgresql")
+def compile_day_of_postgresql(element: day_of, compiler, **kwargs) -> str:
+    return "CAST({} AS DATE)".format(compiler.process(element.clauses, **kwargs))
@@ -0,0 +1,139 @@
+"""src/core/db/full_text_search.py"""
+import re
+
+from sqlalchemy import Select, Table, column, event, false, func, literal_column, table
+from sqlalchemy.orm import DeclarativeBase
+from src.api.constants import TRANSLATION_TABLE
+
+FULL_TEXT_INDEXES: dict[str, tuple[str, ...]] = {}  # table name -> indexed columns
+FULL_TEXT_SUFFIX = "_fts"
+POSTGRES_TEXT_SEARCH_CONFIG = "'simple'::regconfig"  # без стемминга: имена файлов и описания на разных языках
+SQLITE_TOKENIZER = "unicode61 remove_diacritics 2"
+TERM_CHARACTERS = re.compile(r"[^\W_]+")  # буквы и цифры: так же токены режут FTS5 unicode61 и парсер Postgres
+
+
+def sqlite_full_text_ddl(table_name: str, columns: tuple[str, ...]) -> list[str]:
+    """
+    DDL индекса FTS5 для SQLite: external content таблица (текст не дублируется, хранится только индекс)
+    и триггеры, синхронизирующие индекс при вставке, изменении и удалении строк; rebuild индексирует старые строки.
+    """
+    fts_table = table_name + FULL_TEXT_SUFFIX
+    names = ", ".join(columns)
+    new_values = ", ".join("new." + name for name in columns)
+    old_values = ", ".join("old." + name for name in columns)
+    delete_old = f"INSERT INTO {fts_table}({fts_table}, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts_table}(rowid, {names}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+        f"{names}, content='{table_name}', content_rowid='id', tokenize='{SQLITE_TOKENIZER}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {table_name} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {table_name} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE OF {names} ON {table_name} "
+        f"BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+    ]
+
+
+def postgres_document(columns: tuple[str, ...], table_name: str | None = None) -> str:
+    """tsvector документа строки: одно и то же выражение в индексе и в запросе, иначе индекс не используется."""
+    prefix = "" if table_name is None else table_name + "."
+    document = " || ' ' || ".join(f"coalesce({prefix}{name}, '')" for name in columns)
+    return f"to_tsvector({POSTGRES_TEXT_SEARCH_CONFIG}, {document})"
+
+
+def postgres_full_text_ddl(table_name: str, columns: tuple[str, ...]) -> list[str]:
+    """DDL индекса для Postgres: GIN по выражению tsvector, синхронизируется самой СУБД без триггеров."""
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}{FULL_TEXT_SUFFIX} "
+        f"ON {table_name} USING gin ({postgres_document(columns)})"
+    ]
+
+
+def register_full_text_index(target: Table, *columns: str) -> None:
+    """Регистрирует полнотекстовый индекс по колонкам таблицы: создается и удаляется вместе с таблицей (create_all)."""
+    FULL_TEXT_INDEXES[target.name] = columns
+
+    @event.listens_for(target, "after_create")
+    def create_full_text_index(table_: Table, connection, **kwargs) -> None:
+        if connection.dialect.name == "sqlite":
+            statements = sqlite_full_text_ddl(table_.name, columns)
+        elif connection.dialect.name == "postgresql":
+            statements = postgres_full_text_ddl(table_.name, columns)
+        else:
+            return
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+
+    @event.listens_for(target, "before_drop")
+    def drop_full_text_index(table_: Table, connection, **kwargs) -> None:
+        if connection.dialect.name == "sqlite":  # триггеры удаляются вместе с таблицей, виртуальная таблица - нет
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {table_.name}{FULL_TEXT_SUFFIX}")
+
+
+def get_search_terms(search_text: str, transliterate: bool = False) -> list[tuple[str, ...]]:
+    """
+    Разбивает поисковый запрос на слова; для каждого слова - варианты написания.
+    С transliterate к слову добавляется транслитерация TRANSLATION_TABLE: так кириллический запрос
+    находит имена файлов, транслитерированные при загрузке.
+    """
+    terms = []
+    for word in search_text.lower().split():
+        if TERM_CHARACTERS.search(word) is None:
+            continue
+        variants = (word,)
+        if transliterate and word.translate(TRANSLATION_TABLE) != word:
+            variants += (word.translate(TRANSLATION_TABLE),)
+        terms.append(variants)
+    return terms
+
+
+def sqlite_match_query(terms: list[tuple[str, ...]]) -> str:
+    """
+    Запрос FTS5 MATCH: слова через AND, варианты слова через OR, каждое слово - префиксная фраза в кавычках
+    (знаки внутри слова, например в "18-10-2024" или "ob!ekt", режет тот же токенизатор, что и при индексации).
+    """
+    return " AND ".join(
+        "(" + " OR ".join('"{}"*'.format(variant.replace('"', '""')) for variant in variants) + ")"
+        for variants in terms
+    )
+
+
+def postgres_ts_query(terms: list[tuple[str, ...]]) -> str:
+    """Запрос to_tsquery: слова через &, варианты через |, части слова - фраза (<->) с префиксом у последней части."""
+    return " & ".join(
+        "(" + " | ".join(" <-> ".join(TERM_CHARACTERS.findall(variant)) + ":*" for variant in variants) + ")"
+        for variants in terms
+    )
+
+
+def apply_full_text_search(
+        query: Select,
+        model: type[DeclarativeBase],
+        search_text: str,
+        dialect_name: str,
+        transliterate: bool = False,
+) -> Select:
+    """
+    Ограничивает запрос строками модели, найденными по полнотекстовому индексу, и сортирует их по релевантности
+    (bm25 в SQLite, ts_rank в Postgres), при равной релевантности - сначала новые.
+    Запрос без единого слова не находит ничего.
+    """
+    terms = get_search_terms(search_text, transliterate)
+    if not terms:
+        return query.where(false())
+    table_name = model.__tablename__
+    if dialect_name == "postgresql":
+        document = literal_column(postgres_document(FULL_TEXT_INDEXES[table_name], table_name))
+        ts_query = func.to_tsquery(literal_column(POSTGRES_TEXT_SEARCH_CONFIG), postgres_ts_query(terms))
+        return (
+            query
+            .where(document.bool_op("@@")(ts_query))
+            .order_by(func.ts_rank(document, ts_query).desc(), model.id.desc())
+        )
+    fts_table = table(table_name + FULL_TEXT_SUFFIX, column("rowid"), column("rank"))
+    return (
+        query
+        .join(fts_table, fts_table.c.rowid == model.id)
+        .where(literal_column(fts_table.name).op("MATCH")(sqlite_match_query(terms)))
+        .order_by(fts_table.c.rank, model.id.desc())  # rank FTS5 = bm25(): чем меньше, тем релевантнее
+    )
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 
 from alembic import context
 
+from src.core.db.full_text_search import FULL_TEXT_SUFFIX
 from src.core.db.models import Base
 from src.settings import settings
 
@@ -25,10 +26,12 @@ config = context.config
 # Установим для переменной sqlalchemy.url значение из нашего .env файла.
 #config.set_main_option('sqlalchemy.url', os.environ['DATABASE_URL'])
 # ИЛИ
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+# restore of a db backup (src/services/db_backup.py) migrates the restored file: its url is passed in attributes
+config.set_main_option("sqlalchemy.url", config.attributes.get("database_url", settings.database_url))
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# Called from the application (restore) alembic must not replace its logging configuration.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -44,6 +47,11 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_name(name, type_, parent_names) -> bool:
+    """Full text search tables (FTS5 and its shadow tables) and GIN indexes are not in metadata: skip them."""
+    return not (type_ in ("table", "index") and FULL_TEXT_SUFFIX in (name or ""))
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -60,6 +68,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -69,7 +78,7 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_name=include_name)
 
     with context.begin_transaction():
         context.run_migrations()
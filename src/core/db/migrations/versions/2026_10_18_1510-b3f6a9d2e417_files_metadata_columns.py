@@ -0,0 +1,55 @@
+"""Files metadata columns instead of size strings in BLOB
+
+Revision ID: b3f6a9d2e417
+Revises: 8e2d4b7c1a90
+Create Date: 2026-10-18 15:10:43.208117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f6a9d2e417'
+down_revision = '8e2d4b7c1a90'
+branch_labels = None
+depends_on = None
+
+files = sa.table(
+    'files',
+    sa.column('id', sa.Integer),
+    sa.column('file', sa.LargeBinary),
+    sa.column('size', sa.Integer),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('files') as batch_op:
+        batch_op.add_column(sa.Column('size', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('content_type', sa.String(length=128), nullable=True))
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_files_user_id_user', 'user', ['user_id'], ['id'])
+        batch_op.alter_column('file', existing_type=sa.BLOB(), nullable=True)
+
+    # size strings like b"123.4 kb." -> size in bytes, the BLOB column is left for binary payloads only
+    connection = op.get_bind()
+    for file_id, size_string in connection.execute(sa.select(files.c.id, files.c.file)).all():
+        try:
+            size = round(float(bytes(size_string).decode("utf-8").removesuffix(" kb.")) * 1000)
+        except (TypeError, ValueError):
+            size = None
+        connection.execute(files.update().where(files.c.id == file_id).values(size=size, file=None))
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    for file_id, size in connection.execute(sa.select(files.c.id, files.c.size)).all():
+        size_string = "{} kb.".format(round((size or 0) / 1000, 1)).encode("utf-8")
+        connection.execute(files.update().where(files.c.id == file_id).values(file=size_string))
+
+    with op.batch_alter_table('files') as batch_op:
+        batch_op.alter_column('file', existing_type=sa.BLOB(), nullable=False)
+        batch_op.drop_constraint('fk_files_user_id_user', type_='foreignkey')
+        batch_op.drop_column('user_id')
+        batch_op.drop_column('content_type')
+        batch_op.drop_column('size')
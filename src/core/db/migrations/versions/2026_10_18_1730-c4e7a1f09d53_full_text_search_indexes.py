@@ -0,0 +1,72 @@
+"""Full text search indexes for files, suspensions and tasks
+
+Revision ID: c4e7a1f09d53
+Revises: b3f6a9d2e417
+Create Date: 2026-10-18 17:30:12.604381
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7a1f09d53'
+down_revision = 'b3f6a9d2e417'
+branch_labels = None
+depends_on = None
+
+# the same indexes are created by src/core/db/full_text_search.py for Base.metadata.create_all
+FULL_TEXT_INDEXES = {
+    'files': ('name',),
+    'suspensions': ('description', 'implementing_measures'),
+    'tasks': ('task', 'description'),
+}
+
+
+def sqlite_upgrade(table_name: str, columns: tuple[str, ...]) -> list[str]:
+    fts_table = table_name + '_fts'
+    names = ', '.join(columns)
+    new_values = ', '.join('new.' + name for name in columns)
+    old_values = ', '.join('old.' + name for name in columns)
+    delete_old = f"INSERT INTO {fts_table}({fts_table}, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts_table}(rowid, {names}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+        f"{names}, content='{table_name}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {table_name} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {table_name} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE OF {names} ON {table_name} "
+        f"BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",  # index the rows written before the migration
+    ]
+
+
+def postgres_upgrade(table_name: str, columns: tuple[str, ...]) -> list[str]:
+    document = " || ' ' || ".join(f"coalesce({name}, '')" for name in columns)
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_fts ON {table_name} "
+        f"USING gin (to_tsvector('simple'::regconfig, {document}))"
+    ]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table_name, columns in FULL_TEXT_INDEXES.items():
+        if dialect == 'sqlite':
+            statements = sqlite_upgrade(table_name, columns)
+        elif dialect == 'postgresql':
+            statements = postgres_upgrade(table_name, columns)
+        else:
+            statements = []
+        for statement in statements:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table_name in FULL_TEXT_INDEXES:
+        if dialect == 'sqlite':
+            for action in ('insert', 'delete', 'update'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table_name}_fts_{action}")
+            op.execute(f"DROP TABLE IF EXISTS {table_name}_fts")
+        elif dialect == 'postgresql':
+            op.execute(f"DROP INDEX IF EXISTS ix_{table_name}_fts")
@@ -0,0 +1,173 @@
+"""Daily rollup of suspensions maintained by triggers
+
+Revision ID: d7a2c5e8f3b1
+Revises: c4e7a1f09d53
+Create Date: 2026-10-18 19:10:41.215730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a2c5e8f3b1'
+down_revision = 'c4e7a1f09d53'
+branch_labels = None
+depends_on = None
+
+# the same table and triggers are created by src/core/db/daily_rollup.py for Base.metadata.create_all
+DAILY_ROLLUP_TABLE = 'suspension_daily_rollup'
+DAILY_ROLLUP_TRIGGER = 'suspension_daily_rollup_sync'
+MINUTES_IN_DAY = 24 * 60
+ROLLUP_SOURCE_TABLE = 'suspensions'
+ROLLUP_SOURCE_COLUMNS = ('suspension_start', 'suspension_finish', 'user_id', 'tech_process', 'risk_accident')
+
+
+def sqlite_daily_rollup_ddl() -> list[str]:
+    def minutes(row: str) -> str:
+        return f"coalesce((julianday({row}.suspension_finish) - julianday({row}.suspension_start)) * {MINUTES_IN_DAY}, 0)"
+
+    def group(row: str) -> str:
+        return (
+            f"day = date({row}.suspension_start) AND user_id = {row}.user_id "
+            f"AND tech_process = {row}.tech_process AND risk_accident = coalesce({row}.risk_accident, '')"
+        )
+
+    add_new = (
+        f"INSERT INTO {DAILY_ROLLUP_TABLE} "
+        f"(day, user_id, tech_process, risk_accident, suspensions_total, total_minutes, max_minutes) "
+        f"SELECT date(new.suspension_start), new.user_id, new.tech_process, coalesce(new.risk_accident, ''), "
+        f"1, {minutes('new')}, {minutes('new')} WHERE new.suspension_start IS NOT NULL "
+        f"ON CONFLICT (day, user_id, tech_process, risk_accident) DO UPDATE SET "
+        f"suspensions_total = suspensions_total + 1, total_minutes = total_minutes + excluded.total_minutes, "
+        f"max_minutes = max(max_minutes, excluded.max_minutes);"
+    )
+    group_max = (
+        f"(SELECT max({minutes(ROLLUP_SOURCE_TABLE)}) FROM {ROLLUP_SOURCE_TABLE} "
+        f"WHERE user_id = old.user_id AND suspension_start >= date(old.suspension_start) "
+        f"AND suspension_start < date(old.suspension_start, '+1 day') AND tech_process = old.tech_process "
+        f"AND coalesce(risk_accident, '') = coalesce(old.risk_accident, ''))"
+    )
+    subtract_old = (
+        f"UPDATE {DAILY_ROLLUP_TABLE} SET suspensions_total = suspensions_total - 1, "
+        f"total_minutes = total_minutes - {minutes('old')}, "
+        f"max_minutes = CASE WHEN {minutes('old')} < max_minutes THEN max_minutes "
+        f"ELSE coalesce({group_max}, 0) END WHERE {group('old')}; "
+        f"DELETE FROM {DAILY_ROLLUP_TABLE} WHERE {group('old')} AND suspensions_total <= 0;"
+    )
+    columns = ", ".join(ROLLUP_SOURCE_COLUMNS)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {DAILY_ROLLUP_TRIGGER}_insert AFTER INSERT ON {ROLLUP_SOURCE_TABLE} "
+        f"BEGIN {add_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {DAILY_ROLLUP_TRIGGER}_delete AFTER DELETE ON {ROLLUP_SOURCE_TABLE} "
+        f"BEGIN {subtract_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {DAILY_ROLLUP_TRIGGER}_update AFTER UPDATE OF {columns} "
+        f"ON {ROLLUP_SOURCE_TABLE} BEGIN {subtract_old} {add_new} END",
+    ]
+
+
+def postgres_daily_rollup_ddl() -> list[str]:
+    return [
+        f"""CREATE OR REPLACE FUNCTION {DAILY_ROLLUP_TRIGGER}() RETURNS trigger AS $$
+DECLARE
+    duration double precision;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.suspension_start IS NOT NULL THEN
+        duration := coalesce(EXTRACT(EPOCH FROM (OLD.suspension_finish - OLD.suspension_start)) / 60.0, 0);
+        UPDATE {DAILY_ROLLUP_TABLE} AS rollup SET
+            suspensions_total = rollup.suspensions_total - 1,
+            total_minutes = rollup.total_minutes - duration,
+            max_minutes = CASE WHEN duration < rollup.max_minutes THEN rollup.max_minutes ELSE coalesce((
+                SELECT max(coalesce(EXTRACT(EPOCH FROM (s.suspension_finish - s.suspension_start)) / 60.0, 0))
+                FROM {ROLLUP_SOURCE_TABLE} AS s
+                WHERE s.user_id = OLD.user_id AND s.suspension_start >= OLD.suspension_start::date
+                AND s.suspension_start < OLD.suspension_start::date + 1 AND s.tech_process = OLD.tech_process
+                AND coalesce(s.risk_accident, '') = coalesce(OLD.risk_accident, '')
+            ), 0) END
+        WHERE rollup.day = OLD.suspension_start::date AND rollup.user_id = OLD.user_id
+            AND rollup.tech_process = OLD.tech_process AND rollup.risk_accident = coalesce(OLD.risk_accident, '');
+        DELETE FROM {DAILY_ROLLUP_TABLE} AS rollup
+        WHERE rollup.day = OLD.suspension_start::date AND rollup.user_id = OLD.user_id
+            AND rollup.tech_process = OLD.tech_process AND rollup.risk_accident = coalesce(OLD.risk_accident, '')
+            AND rollup.suspensions_total <= 0;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.suspension_start IS NOT NULL THEN
+        duration := coalesce(EXTRACT(EPOCH FROM (NEW.suspension_finish - NEW.suspension_start)) / 60.0, 0);
+        INSERT INTO {DAILY_ROLLUP_TABLE} AS rollup
+            (day, user_id, tech_process, risk_accident, suspensions_total, total_minutes, max_minutes)
+        VALUES (
+            NEW.suspension_start::date, NEW.user_id, NEW.tech_process, coalesce(NEW.risk_accident, ''),
+            1, duration, duration
+        )
+        ON CONFLICT (day, user_id, tech_process, risk_accident) DO UPDATE SET
+            suspensions_total = rollup.suspensions_total + 1,
+            total_minutes = rollup.total_minutes + EXCLUDED.total_minutes,
+            max_minutes = GREATEST(rollup.max_minutes, EXCLUDED.max_minutes);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+        f"DROP TRIGGER IF EXISTS {DAILY_ROLLUP_TRIGGER} ON {ROLLUP_SOURCE_TABLE}",
+        f"CREATE TRIGGER {DAILY_ROLLUP_TRIGGER} AFTER INSERT OR DELETE OR UPDATE OF "
+        f"{', '.join(ROLLUP_SOURCE_COLUMNS)} ON {ROLLUP_SOURCE_TABLE} "
+        f"FOR EACH ROW EXECUTE FUNCTION {DAILY_ROLLUP_TRIGGER}()",
+    ]
+
+
+def backfill(dialect: str) -> str:
+    """Итоги по простоям, записанным до миграции."""
+    if dialect == 'sqlite':
+        day = 'date(suspension_start)'
+        minutes = f"coalesce((julianday(suspension_finish) - julianday(suspension_start)) * {MINUTES_IN_DAY}, 0)"
+    else:
+        day = 'CAST(suspension_start AS DATE)'
+        minutes = "coalesce(EXTRACT(EPOCH FROM (suspension_finish - suspension_start)) / 60.0, 0)"
+    return (
+        f"INSERT INTO {DAILY_ROLLUP_TABLE} "
+        f"(day, user_id, tech_process, risk_accident, suspensions_total, total_minutes, max_minutes) "
+        f"SELECT {day}, user_id, tech_process, coalesce(risk_accident, ''), count(id), sum({minutes}), max({minutes}) "
+        f"FROM {ROLLUP_SOURCE_TABLE} WHERE suspension_start IS NOT NULL "
+        f"GROUP BY {day}, user_id, tech_process, coalesce(risk_accident, '')"
+    )
+
+
+def upgrade() -> None:
+    created = DAILY_ROLLUP_TABLE not in sa.inspect(op.get_bind()).get_table_names()  # not by create_all already
+    if created:
+        op.create_table(DAILY_ROLLUP_TABLE,
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('tech_process', sa.Integer(), nullable=False),
+        sa.Column('risk_accident', sa.String(length=64), nullable=False),
+        sa.Column('suspensions_total', sa.Integer(), nullable=False),
+        sa.Column('total_minutes', sa.Float(), nullable=False),
+        sa.Column('max_minutes', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('day', 'user_id', 'tech_process', 'risk_accident')
+        )
+        op.create_index('ix_suspension_daily_rollup_user_id_day', DAILY_ROLLUP_TABLE, ['user_id', 'day'], unique=False)
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        statements = sqlite_daily_rollup_ddl()
+    elif dialect == 'postgresql':
+        statements = postgres_daily_rollup_ddl()
+    else:
+        return
+    for statement in statements:
+        op.execute(statement)
+    if created:
+        op.execute(backfill(dialect))
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for action in ('insert', 'delete', 'update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {DAILY_ROLLUP_TRIGGER}_{action}")
+    elif dialect == 'postgresql':
+        op.execute(f"DROP TRIGGER IF EXISTS {DAILY_ROLLUP_TRIGGER} ON {ROLLUP_SOURCE_TABLE}")
+        op.execute(f"DROP FUNCTION IF EXISTS {DAILY_ROLLUP_TRIGGER}()")
+    op.drop_index('ix_suspension_daily_rollup_user_id_day', table_name=DAILY_ROLLUP_TABLE)
+    op.drop_table(DAILY_ROLLUP_TABLE)
@@ -0,0 +1,86 @@
+"""Data versions of tables maintained by triggers for ETag
+
+Revision ID: e1b8d4f6a2c7
+Revises: d7a2c5e8f3b1
+Create Date: 2026-10-18 20:30:27.482915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1b8d4f6a2c7'
+down_revision = 'd7a2c5e8f3b1'
+branch_labels = None
+depends_on = None
+
+# the same table and triggers are created by src/core/db/data_version.py for Base.metadata.create_all
+DATA_VERSION_TABLE = 'data_versions'
+DATA_VERSION_SUFFIX = '_data_version'
+VERSIONED_TABLES = ('suspensions', 'suspensions_files', 'tasks', 'tasks_files', 'files', 'user')
+
+
+def bump_version_sql(table_name: str) -> str:
+    return (
+        f"INSERT INTO {DATA_VERSION_TABLE} (table_name, version) VALUES ('{table_name}', 1) "
+        f"ON CONFLICT (table_name) DO UPDATE SET version = {DATA_VERSION_TABLE}.version + 1, "
+        f"updated_at = CURRENT_TIMESTAMP;"
+    )
+
+
+def sqlite_upgrade(table_name: str) -> list[str]:
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {table_name}{DATA_VERSION_SUFFIX}_{action.lower()} AFTER {action} '
+        f'ON "{table_name}" BEGIN {bump_version_sql(table_name)} END'
+        for action in ('INSERT', 'UPDATE', 'DELETE')
+    ]
+
+
+def postgres_upgrade(table_name: str) -> list[str]:
+    return [
+        f"""CREATE OR REPLACE FUNCTION bump{DATA_VERSION_SUFFIX}() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO {DATA_VERSION_TABLE} (table_name, version) VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (table_name) DO UPDATE SET version = {DATA_VERSION_TABLE}.version + 1, updated_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+        f'DROP TRIGGER IF EXISTS {table_name}{DATA_VERSION_SUFFIX} ON "{table_name}"',
+        f'CREATE TRIGGER {table_name}{DATA_VERSION_SUFFIX} AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE '
+        f'ON "{table_name}" FOR EACH STATEMENT EXECUTE FUNCTION bump{DATA_VERSION_SUFFIX}()',
+    ]
+
+
+def upgrade() -> None:
+    if DATA_VERSION_TABLE not in sa.inspect(op.get_bind()).get_table_names():  # not by create_all already
+        op.create_table(DATA_VERSION_TABLE,
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.PrimaryKeyConstraint('table_name')
+        )
+    dialect = op.get_bind().dialect.name
+    for table_name in VERSIONED_TABLES:
+        if dialect == 'sqlite':
+            statements = sqlite_upgrade(table_name)
+        elif dialect == 'postgresql':
+            statements = postgres_upgrade(table_name)
+        else:
+            statements = []
+        for statement in statements:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table_name in VERSIONED_TABLES:
+        if dialect == 'sqlite':
+            for action in ('insert', 'update', 'delete'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table_name}{DATA_VERSION_SUFFIX}_{action}")
+        elif dialect == 'postgresql':
+            op.execute(f'DROP TRIGGER IF EXISTS {table_name}{DATA_VERSION_SUFFIX} ON "{table_name}"')
+    if dialect == 'postgresql':
+        op.execute(f"DROP FUNCTION IF EXISTS bump{DATA_VERSION_SUFFIX}()")
+    op.drop_table(DATA_VERSION_TABLE)
@@ -2,11 +2,14 @@
 from datetime import date, datetime
 
 from fastapi_users_db_sqlalchemy import SQLAlchemyBaseUserTable
-from sqlalchemy import ForeignKey, String, Text
+from sqlalchemy import ForeignKey, Index, LargeBinary, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.sql import expression, func
-from sqlalchemy.sql.sqltypes import BLOB, TIMESTAMP
+from sqlalchemy.sql.sqltypes import TIMESTAMP
 from src.api.constants import *
+from src.core.db.daily_rollup import DAILY_ROLLUP_TABLE, register_daily_rollup
+from src.core.db.data_version import DATA_VERSION_TABLE, register_data_version
+from src.core.db.full_text_search import register_full_text_index
 
 
 class Base(DeclarativeBase):
@@ -26,6 +29,10 @@ class Suspension(Base):
     """Модель простоев."""
 
     __tablename__ = "suspensions"
+    __table_args__ = (  # shaped for WHERE / ORDER BY of SuspensionRepository: period, user, keyset (start, id)
+        Index("ix_suspensions_suspension_start_id", "suspension_start", "id"),
+        Index("ix_suspensions_user_id_suspension_start_id", "user_id", "suspension_start", "id"),
+    )
     risk_accident: Mapped[str] = mapped_column(String(64), nullable=True)  # Risk_Accident model (Many_to_many)  # todo
     description: Mapped[str]  # mapped_column(Text(SUSPENSION_DESCRIPTION_LENGTH))  # next migration if ok todo
     suspension_start: Mapped[datetime] = mapped_column(server_default=func.current_timestamp(), nullable=True)
@@ -35,15 +42,44 @@ class Suspension(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
 
     files: Mapped[list["FileAttached"]] = relationship(secondary="suspensions_files", back_populates="suspensions")
+    user: Mapped["User"] = relationship(lazy="raise")  # load explicitly with joinedload in repository queries
 
     def __repr__(self):
         return f"Suspension: {self.id} {self.risk_accident} {self.suspension_start} по {self.suspension_finish}"
 
 
+class SuspensionDailyRollup(Base):
+    """
+    Дневные итоги простоев: день начала простоя x пользователь x тех-процесс x источник угроз -
+    количество, сумма и максимум длительности в минутах. Поддерживаются триггерами БД (src/core/db/daily_rollup.py).
+    """
+
+    __tablename__ = DAILY_ROLLUP_TABLE
+    __table_args__ = (Index("ix_suspension_daily_rollup_user_id_day", "user_id", "day"),)  # period of one user
+
+    id = None  # means identity through the day and the dimensions
+    day: Mapped[date] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), primary_key=True)
+    tech_process: Mapped[int] = mapped_column(primary_key=True)
+    risk_accident: Mapped[str] = mapped_column(String(64), primary_key=True)  # "" if the suspension has none
+    suspensions_total: Mapped[int]
+    total_minutes: Mapped[float]
+    max_minutes: Mapped[float]
+
+    def __repr__(self):
+        return f"<Rollup {self.day} {self.user_id} {self.tech_process} {self.risk_accident}: {self.suspensions_total}>"
+
+
 class Task(Base):
     """Модель задач: 1 пользователь = 1 задача."""
 
     __tablename__ = "tasks"
+    __table_args__ = (  # shaped for WHERE / ORDER BY of TaskRepository: archive flag, user / executor, keyset
+        Index("ix_tasks_task_start_id", "task_start", "id"),
+        Index("ix_tasks_is_archived_task_start_id", "is_archived", "task_start", "id"),
+        Index("ix_tasks_user_id_is_archived_deadline_id", "user_id", "is_archived", "deadline", "id"),
+        Index("ix_tasks_executor_id_is_archived_deadline_id", "executor_id", "is_archived", "deadline", "id"),
+    )
     task: Mapped[str] = mapped_column(String(64), nullable=True)  # String(TASK_NAME_LENGTH), nullable=True)  # todo
     description: Mapped[str]  # mapped_column(Text(TASK_DESCRIPTION_LENGTH)) # # next migration if ok todo
     task_start: Mapped[date] = mapped_column(nullable=True)
@@ -54,6 +90,8 @@ class Task(Base):
     is_archived: Mapped[bool] = mapped_column(server_default=expression.false())
 
     files: Mapped[list["FileAttached"]] = relationship(secondary="tasks_files", back_populates="tasks")
+    user: Mapped["User"] = relationship(foreign_keys="Task.user_id", lazy="raise")  # load with joinedload
+    executor: Mapped["User"] = relationship(foreign_keys="Task.executor_id", lazy="raise")  # load with joinedload
 
     def __repr__(self):
         return f"Task: {self.id} {self.task} {self.task_start} по {self.deadline}"
@@ -70,7 +108,11 @@ class FileAttached(Base):
     __tablename__ = "files"
 
     name: Mapped[str] = mapped_column(String(256))  # mapped_column(String(FILE_NAME_LENGTH))  # todo
-    file: Mapped[BLOB] = mapped_column(BLOB)
+    file: Mapped[bytes] = mapped_column(LargeBinary, nullable=True, deferred=True)  # BLOB | bytea: loaded on demand
+    size: Mapped[int] = mapped_column(nullable=True)  # in bytes
+    content_type: Mapped[str] = mapped_column(String(FILE_CONTENT_TYPE_LENGTH), nullable=True)
+    content_hash: Mapped[str] = mapped_column(String(FILE_CONTENT_HASH_LENGTH), nullable=True, index=True)  # sha256
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=True)  # кто загрузил файл
     tasks: Mapped[list["Task"]] = relationship(secondary="tasks_files", back_populates="files")
     suspensions: Mapped[list["Suspension"]] = relationship(secondary="suspensions_files", back_populates="files")
 
@@ -82,6 +124,7 @@ class TasksFiles(Base):
     """Модель отношений задачи-прикрепленные файлы."""
 
     __tablename__ = "tasks_files"
+    __table_args__ = (Index("ix_tasks_files_file_id", "file_id"),)  # reverse side of the primary key
 
     id = None  # means identity through external keys not unique ids
     task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id"), primary_key=True)
@@ -95,6 +138,7 @@ class SuspensionsFiles(Base):
     """Модель отношений простои-прикрепленные файлы."""
 
     __tablename__ = "suspensions_files"
+    __table_args__ = (Index("ix_suspensions_files_file_id", "file_id"),)  # reverse side of the primary key
 
     id = None  # means identity through external keys not unique ids
     suspension_id: Mapped[int] = mapped_column(ForeignKey("suspensions.id"), primary_key=True)
@@ -102,3 +146,32 @@ class SuspensionsFiles(Base):
 
     def __repr__(self):
         return f"<Suspension {self.suspension_id} - Files {self.file_id}>"
+
+
+
+class DataVersion(Base):
+    """
+    Версии данных таблиц для ETag эндпоинтов чтения: каждая запись в таблицу увеличивает ее версию
+    (триггеры БД, src/core/db/data_version.py), поэтому неизменность ответа проверяется без чтения самих данных.
+    """
+
+    __tablename__ = DATA_VERSION_TABLE
+
+    id = None  # means identity through the table name
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int]
+
+    def __repr__(self):
+        return f"<DataVersion {self.table_name}: {self.version}>"
+
+
+register_full_text_index(FileAttached.__table__, "name")
+register_full_text_index(Suspension.__table__, "description", "implementing_measures")
+register_full_text_index(Task.__table__, "task", "description")
+register_daily_rollup(Base.metadata)
+register_data_version(Suspension.__table__)
+register_data_version(SuspensionsFiles.__table__)
+register_data_version(Task.__table__)
+register_data_version(TasksFiles.__table__)
+register_data_version(FileAttached.__table__)
+register_data_version(User.__table__)
@@ -1,5 +1,6 @@
 """src/core/db/repository/__init__.py"""
 from .base import AbstractRepository, ContentRepository
+from .data_version import DataVersionRepository
 from .file_attached import FileRepository
 from .suspension import SuspensionRepository
 from .task import TaskRepository
@@ -8,6 +9,7 @@ from .users import UsersRepository
 __all__ = (
     "AbstractRepository",
     "ContentRepository",
+    "DataVersionRepository",
     "FileRepository",
     "SuspensionRepository",
     "TaskRepository",
@@ -1,17 +1,57 @@
 """src/core/db/repository/base.py"""
 
 import abc
-from typing import Sequence, TypeVar
-
-from sqlalchemy import delete, func, select, update
+import base64
+import binascii
+import json
+import operator
+from datetime import date, datetime
+from typing import Any, Sequence, TypeVar
+
+from sqlalchemy import Select, delete, func, select, tuple_, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.core.exceptions import AlreadyExistsException, NotFoundException
+from sqlalchemy.orm import InstrumentedAttribute
+from src.core.db.full_text_search import apply_full_text_search
+from src.core.exceptions import (AlreadyExistsException,
+                                 InvalidCursorException, NotFoundException)
 from src.core.utils import auto_commit
 
 DatabaseModel = TypeVar("DatabaseModel")
 
 
+def encode_cursor(*values: Any) -> str:
+    """Кодирует значения ключа сортировки последней строки страницы в непрозрачный курсор."""
+    values = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, keyset: Sequence[InstrumentedAttribute]) -> list[Any]:
+    """Декодирует курсор в значения ключа сортировки, приводя их к python-типам колонок."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(keyset):
+            raise ValueError(cursor)
+        return [
+            column.type.python_type.fromisoformat(value)
+            if column.type.python_type in (date, datetime) and value is not None else value
+            for column, value in zip(keyset, values)
+        ]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise InvalidCursorException(cursor) from exc
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    """Декодирует курсор страницы результатов поиска в смещение (у ранжированной выдачи нет keyset-ключа)."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+            raise ValueError(cursor)
+        return values[0]
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorException(cursor) from exc
+
+
 class AbstractRepository(abc.ABC):
     """Абстрактный класс, для реализации паттерна Repository."""
 
@@ -81,6 +121,70 @@ class AbstractRepository(abc.ABC):
         self._session.add_all(objects)
         return objects
 
+    async def get_page(
+            self,
+            query: Select,
+            keyset: Sequence[InstrumentedAttribute],
+            descending: bool,
+            limit: int | None = None,
+            cursor: str | None = None,
+    ) -> tuple[Sequence[DatabaseModel], str | None]:
+        """
+        Keyset-пагинация: сортирует запрос по keyset (колонка сортировки и уникальный id), отдает страницу
+        и курсор следующей страницы (None, если страница последняя). Без limit отдает все строки после курсора.
+        Строки с пустой (NULL) колонкой сортировки идут последними на любой СУБД отдельной группой по id:
+        сравнение строк с NULL не дает истины, поэтому каждая группа выбирается своим запросом по индексу.
+        """
+        key, id_column = keyset
+        after = operator.lt if descending else operator.gt
+        keys_query = query.where(key.is_not(None)).order_by(
+            *(column.desc() if descending else column.asc() for column in keyset)
+        )
+        null_keys_query = query.where(key.is_(None)).order_by(id_column.desc() if descending else id_column.asc())
+        if cursor is not None:
+            key_value, id_value = decode_cursor(cursor, keyset)
+            if key_value is None:
+                keys_query = None  # the cursor is already in the group of NULL keys
+                null_keys_query = null_keys_query.where(after(id_column, id_value))
+            else:
+                keys_query = keys_query.where(after(tuple_(key, id_column), (key_value, id_value)))
+        rows_to_fetch = None if limit is None else limit + 1
+        objects = []
+        if keys_query is not None:
+            objects += (await self._session.scalars(keys_query.limit(rows_to_fetch))).all()
+        if rows_to_fetch is None or len(objects) < rows_to_fetch:
+            objects += (await self._session.scalars(
+                null_keys_query.limit(None if rows_to_fetch is None else rows_to_fetch - len(objects))
+            )).all()
+        if limit is None or len(objects) <= limit:
+            return objects, None
+        last_object = objects[limit - 1]
+        return objects[:limit], encode_cursor(*(getattr(last_object, column.key) for column in keyset))
+
+    async def get_search_page(
+            self,
+            query: Select,
+            search_text: str,
+            limit: int | None = None,
+            cursor: str | None = None,
+            transliterate: bool = False,
+    ) -> tuple[Sequence[DatabaseModel], str | None]:
+        """
+        Полнотекстовый поиск по индексу модели: страница результатов, отсортированных по релевантности,
+        и курсор следующей страницы (None, если страница последняя).
+        """
+        query = apply_full_text_search(
+            query, self._model, search_text, self._session.get_bind().dialect.name, transliterate
+        )
+        offset = 0 if cursor is None else decode_offset_cursor(cursor)
+        if limit is None:
+            objects = await self._session.scalars(query.offset(offset))
+            return objects.all(), None
+        objects = (await self._session.scalars(query.offset(offset).limit(limit + 1))).all()
+        if len(objects) <= limit:
+            return objects, None
+        return objects[:limit], encode_cursor(offset + limit)
+
     async def count_all(self) -> int:
         """Возвращает количество юнитов категории."""
         return await self._session.scalar(select(func.count()).select_from(self._model))
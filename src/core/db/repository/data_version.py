@@ -0,0 +1,27 @@
+"""src/core/db/repository/data_version.py"""
+
+from collections.abc import Sequence
+
+from fastapi import Depends
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.db.db import get_session
+from src.core.db.models import DataVersion
+from src.core.db.repository.base import AbstractRepository
+
+
+class DataVersionRepository(AbstractRepository):
+    """Репозиторий для работы с моделью DataVersion."""
+
+    def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
+        super().__init__(session, DataVersion)
+
+    async def get_versions(self, table_names: Sequence[str]) -> Sequence[Row]:
+        """Версии данных таблиц (у таблицы, в которую еще не писали, строки версии нет)."""
+        return (await self._session.execute(
+            select(
+                DataVersion.table_name, DataVersion.version, DataVersion.updated_at
+            ).where(
+                DataVersion.table_name.in_(table_names)
+            ).order_by(DataVersion.table_name)
+        )).all()
@@ -1,8 +1,8 @@
 """src/core/db/repository/file_attached.py"""
-from collections.abc import Sequence
+from collections.abc import Collection, Sequence
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.db.db import get_session
 from src.core.db.models import FileAttached, SuspensionsFiles, TasksFiles
@@ -27,6 +27,44 @@ class FileRepository(ContentRepository):
         )
         return objects.all()
 
+    async def search(
+            self,
+            search_text: str,
+            limit: int | None = None,
+            cursor: str | None = None,
+    ) -> tuple[Sequence[FileAttached], str | None]:
+        """
+        Полнотекстовый поиск файлов по имени: страница по релевантности и курсор следующей.
+        Имена транслитерируются при загрузке, поэтому к запросу добавляется его транслитерация.
+        """
+        return await self.get_search_page(select(self._model), search_text, limit, cursor, transliterate=True)
+
+    async def get_all_names_and_ids(self) -> Sequence[Row]:
+        """Возвращает имена и ids всех файлов (без загрузки остальных колонок)."""
+        rows = await self._session.execute(select(self._model.name, self._model.id).order_by(self._model.id))
+        return rows.all()
+
+    async def get_names_by_ids(self, ids: Sequence[int]) -> Sequence[str]:
+        """Возвращает имена файлов по их ids (без загрузки остальных колонок)."""
+        names = await self._session.scalars(select(self._model.name).where(self._model.id.in_(ids)))
+        return names.all()
+
+    async def get_content_hashes_by_ids(self, ids: Sequence[int]) -> Sequence[str | None]:
+        """Возвращает хэши содержимого файлов по их ids."""
+        content_hashes = await self._session.scalars(select(self._model.content_hash).where(self._model.id.in_(ids)))
+        return content_hashes.all()
+
+    async def get_payload(self, file_id: int) -> bytes | None:
+        """Возвращает бинарное содержимое колонки file (отложенная загрузка: в списках файлов оно не читается)."""
+        return await self._session.scalar(select(self._model.file).where(self._model.id == file_id))
+
+    async def get_referenced_content_hashes(self, content_hashes: Collection[str]) -> set[str]:
+        """Возвращает хэши содержимого, на которые ссылается хотя бы одна запись в БД."""
+        referenced = await self._session.scalars(
+            select(self._model.content_hash).distinct().where(self._model.content_hash.in_(content_hashes))
+        )
+        return set(referenced.all())
+
     async def get_all_files_from_suspensions(self) -> Sequence[SuspensionsFiles]:  # todo get список файлов за 1 запрос
         """Получить список файлов, прикрепленных ко всем простоям."""
         objects = await self._session.scalars(select(SuspensionsFiles))
@@ -4,10 +4,14 @@ from collections.abc import Sequence
 from datetime import datetime
 
 from fastapi import Depends
-from sqlalchemy import delete, func, insert, select
+from sqlalchemy import (Row, Subquery, and_, bindparam, delete, func, insert, literal_column, or_, select, true,
+                        union_all)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
+from src.core.db.daily_rollup import MINUTES_IN_DAY, split_period
 from src.core.db.db import get_session
-from src.core.db.models import FileAttached, Suspension, SuspensionsFiles
+from src.core.db.expressions import day_of, days_between
+from src.core.db.models import FileAttached, Suspension, SuspensionDailyRollup, SuspensionsFiles
 from src.core.db.repository.base import ContentRepository
 from src.core.exceptions import NotFoundException
 
@@ -25,24 +29,70 @@ class SuspensionRepository(ContentRepository):
             finish_sample: datetime,
     ) -> int:
         """Считает количество простоев в периоде для пользователя (или для всех, если пользователь не передан)."""
-        total_suspensions_for_period_query = select(
-            func.count(Suspension.suspension_start)
-        ).where(
-            Suspension.suspension_start >= start_sample
-        ).where(
-            Suspension.suspension_start <= finish_sample
-        )
+        totals = self.get_period_totals(user_id, start_sample, finish_sample)
+        return await self._session.scalar(select(totals.c.suspensions_total))
+
+    @staticmethod
+    def get_period_totals(user_id: int | None, start_sample: datetime, finish_sample: datetime) -> Subquery:
+        """
+        Итоги периода (suspensions_total, sum_time и max_time в сутках) для пользователя (или для всех):
+        целые дни периода - из дневных итогов suspension_daily_rollup, неполные крайние дни - из suspensions,
+        поэтому стоимость запроса не растет с длиной периода.
+        """
+        duration = days_between(Suspension.suspension_start, Suspension.suspension_finish)
+        raw_query = select(
+            func.count(Suspension.id).label("suspensions_total"),
+            func.sum(duration).label("sum_time"),
+            func.max(duration).label("max_time"),
+        ).where(Suspension.suspension_start >= start_sample).where(Suspension.suspension_start <= finish_sample)
         if user_id is not None:
-            return await self._session.scalar(total_suspensions_for_period_query.where(Suspension.user_id == user_id))
-        return await self._session.scalar(total_suspensions_for_period_query)
+            raw_query = raw_query.where(Suspension.user_id == user_id)
+        full_days = split_period(start_sample, finish_sample)
+        if full_days is None:
+            return raw_query.subquery()
+        first_day, last_day = full_days
+        raw_query = raw_query.where(or_(
+            Suspension.suspension_start < datetime.combine(first_day, datetime.min.time()),
+            Suspension.suspension_start >= datetime.combine(last_day, datetime.min.time()),
+        ))
+        rollup_query = select(
+            func.sum(SuspensionDailyRollup.suspensions_total).label("suspensions_total"),
+            (func.sum(SuspensionDailyRollup.total_minutes) / MINUTES_IN_DAY).label("sum_time"),
+            (func.max(SuspensionDailyRollup.max_minutes) / MINUTES_IN_DAY).label("max_time"),
+        ).where(and_(SuspensionDailyRollup.day >= first_day, SuspensionDailyRollup.day < last_day))
+        if user_id is not None:
+            rollup_query = rollup_query.where(SuspensionDailyRollup.user_id == user_id)
+        parts = union_all(raw_query, rollup_query).subquery()
+        return select(
+            func.coalesce(func.sum(parts.c.suspensions_total), 0).label("suspensions_total"),
+            func.sum(parts.c.sum_time).label("sum_time"),
+            func.max(parts.c.max_time).label("max_time"),
+        ).subquery()
 
-    async def get_all(self) -> Sequence[Suspension]:  # todo присоединять user, чтобы не делать 1000 запросов к БД
-        """Возвращает все объекты модели из базы данных, отсортированные по времени."""
-        objects = await self._session.scalars(
-            select(Suspension)
-            .order_by(Suspension.suspension_start.desc())
+    async def get_all(
+            self,
+            limit: int | None = None,
+            cursor: str | None = None,
+    ) -> tuple[Sequence[Suspension], str | None]:
+        """Возвращает страницу простоев, отсортированных по времени (вместе с пользователями), и курсор следующей."""
+        return await self.get_page(
+            select(Suspension).options(joinedload(Suspension.user)),
+            (Suspension.suspension_start, Suspension.id),
+            True,
+            limit,
+            cursor
+        )
+
+    async def search(
+            self,
+            search_text: str,
+            limit: int | None = None,
+            cursor: str | None = None,
+    ) -> tuple[Sequence[Suspension], str | None]:
+        """Полнотекстовый поиск простоев по описанию и мерам: страница по релевантности и курсор следующей."""
+        return await self.get_search_page(
+            select(Suspension).options(joinedload(Suspension.user)), search_text, limit, cursor
         )
-        return objects.all()
 
     async def get_last_id_by_time_for_user(self, user_id: int | None) -> int:
         """Возвращает последний по времени в БД простой для пользователя."""
@@ -54,38 +104,40 @@ class SuspensionRepository(ContentRepository):
             .order_by(Suspension.suspension_start.desc())
         )
 
-    async def get_suspensions_for_user(self, user_id: int, limit: int = 3, offset: int = 0) -> Sequence[Suspension]:
-        """Получить список простоев пользователя."""
-        suspensions_for_user = await self._session.scalars(
-            select(Suspension)
-            .where(Suspension.user_id == user_id)
-            # .limit(limit)  # todo реализовать пагинацию
-            # .offset(offset)
-            .order_by(Suspension.suspension_start.desc())
+    async def get_suspensions_for_user(
+            self,
+            user_id: int,
+            limit: int | None = None,
+            cursor: str | None = None,
+    ) -> tuple[Sequence[Suspension], str | None]:
+        """Получить страницу простоев пользователя и курсор следующей страницы."""
+        return await self.get_page(
+            select(Suspension).options(joinedload(Suspension.user)).where(Suspension.user_id == user_id),
+            (Suspension.suspension_start, Suspension.id),
+            True,
+            limit,
+            cursor
         )
-        return suspensions_for_user.all()
 
     async def get_suspensions_for_period_for_user(
             self,
             user_id: int | None,
             start_sample: datetime,
-            finish_sample: datetime
-    ) -> Sequence[Suspension]:
-        """Получить список простоев в периоде для пользователя (или для всех, если пользователь не передан)."""
-        suspensions_for_period_query = select(Suspension).where(
+            finish_sample: datetime,
+            limit: int | None = None,
+            cursor: str | None = None,
+    ) -> tuple[Sequence[Suspension], str | None]:
+        """Получить страницу простоев в периоде для пользователя (или для всех, если пользователь не передан)."""
+        suspensions_for_period_query = select(Suspension).options(joinedload(Suspension.user)).where(
             Suspension.suspension_start >= start_sample
         ).where(
             Suspension.suspension_start <= finish_sample
-        ).order_by(
-            Suspension.suspension_start.desc()
         )
         if user_id is not None:
-            suspensions_for_period_for_user = await self._session.scalars(
-                suspensions_for_period_query.where(Suspension.user_id == user_id)
-            )
-            return suspensions_for_period_for_user.all()
-        suspensions_for_period_for_users = await self._session.scalars(suspensions_for_period_query)
-        return suspensions_for_period_for_users.all()
+            suspensions_for_period_query = suspensions_for_period_query.where(Suspension.user_id == user_id)
+        return await self.get_page(
+            suspensions_for_period_query, (Suspension.suspension_start, Suspension.id), True, limit, cursor
+        )
 
     async def suspension_max_time_for_period_for_user(
             self,
@@ -94,16 +146,8 @@ class SuspensionRepository(ContentRepository):
             finish_sample: datetime
     ) -> int:
         """Максимальный простой в периоде для пользователя (или для всех, если пользователь не передан)."""
-        max_suspension_for_period_query = select(
-            func.max(func.julianday(Suspension.suspension_finish) - func.julianday(Suspension.suspension_start))
-        ).where(
-            Suspension.suspension_start >= start_sample
-        ).where(
-            Suspension.suspension_start <= finish_sample
-        )
-        if user_id is not None:
-            return await self._session.scalar(max_suspension_for_period_query.where(Suspension.user_id == user_id))
-        return await self._session.scalar(max_suspension_for_period_query)
+        totals = self.get_period_totals(user_id, start_sample, finish_sample)
+        return await self._session.scalar(select(totals.c.max_time))
 
     async def sum_time_for_period_for_user(
             self,
@@ -113,18 +157,57 @@ class SuspensionRepository(ContentRepository):
 
     ) -> int:
         """Сумма простоев в периоде для пользователя (или для всех, если пользователь не передан)."""
-        sum_time_for_period_query = select(
-            func.sum(
-                func.julianday(Suspension.suspension_finish) - func.julianday(Suspension.suspension_start)
+        totals = self.get_period_totals(user_id, start_sample, finish_sample)
+        return await self._session.scalar(select(totals.c.sum_time))
+
+    async def get_analytics_for_period_for_user(
+            self,
+            user_id: int | None,
+            start_sample: datetime,
+            finish_sample: datetime,
+    ) -> Row:
+        """
+        Итоги простоев в периоде для пользователя (или для всех, если пользователь не передан) одним запросом:
+        количество, сумма и максимум длительности в периоде, а также id и время крайнего простоя в БД.
+        """
+        last_suspension = aliased(Suspension)
+        last_suspension_query = select(last_suspension.id, last_suspension.suspension_start).order_by(
+            last_suspension.suspension_start.desc(), last_suspension.id.desc()
+        ).limit(1)
+        if user_id is not None:
+            last_suspension_query = last_suspension_query.where(last_suspension.user_id == user_id)
+        last_suspension_query = last_suspension_query.subquery()
+        analytics_query = self.get_period_totals(user_id, start_sample, finish_sample)
+        return (await self._session.execute(
+            select(
+                analytics_query,
+                last_suspension_query.c.id.label("last_suspension_id"),
+                last_suspension_query.c.suspension_start.label("last_suspension_start"),
+            ).select_from(analytics_query).outerjoin(last_suspension_query, true())
+        )).one()
+
+    async def rebuild_daily_rollup(self) -> int:
+        """
+        Пересобирает дневные итоги suspension_daily_rollup по всем простоям (первичное заполнение или сверка;
+        дальше итоги поддерживают триггеры). Возвращает число строк итогов.
+        """
+        day = day_of(Suspension.suspension_start)
+        risk_accident = func.coalesce(Suspension.risk_accident, literal_column("''"))
+        minutes = func.coalesce(days_between(Suspension.suspension_start, Suspension.suspension_finish) * MINUTES_IN_DAY, 0)
+        await self._session.execute(delete(SuspensionDailyRollup))
+        await self._session.execute(
+            insert(SuspensionDailyRollup).from_select(
+                ["day", "user_id", "tech_process", "risk_accident", "suspensions_total", "total_minutes", "max_minutes"],
+                select(
+                    day, Suspension.user_id, Suspension.tech_process, risk_accident,
+                    func.count(Suspension.id), func.sum(minutes), func.max(minutes),
+                ).where(
+                    Suspension.suspension_start.is_not(None)
+                ).group_by(day, Suspension.user_id, Suspension.tech_process, risk_accident)
             )
-        ).where(
-            Suspension.suspension_start >= start_sample
-        ).where(
-            Suspension.suspension_start <= finish_sample
         )
-        if user_id is not None:
-            return await self._session.scalar(sum_time_for_period_query.where(Suspension.user_id == user_id))
-        return await self._session.scalar(sum_time_for_period_query)
+        await self._session.commit()
+        return await self._session.scalar(select(func.count()).select_from(SuspensionDailyRollup))
 
     async def set_files_to_suspension(self, suspension_id: int, files_ids: list[int]) -> None:
         """Присваивает простою список файлов."""  # in to repository/base.py todo
@@ -150,6 +233,23 @@ class SuspensionRepository(ContentRepository):
         )
         return suspension_files_relations.all()
 
+    async def get_files_names_for_suspensions(self, suspension_ids: Sequence[int]) -> Sequence[Row]:
+        """
+        Получить за 1 запрос отношения простой-файл для списка простоев вместе с именами файлов.
+        Строка: (suspension_id, file_id, name); name is None, если файла нет в таблице FileAttached.
+        """
+        if not suspension_ids:
+            return []
+        files_names = await self._session.execute(
+            select(SuspensionsFiles.suspension_id, SuspensionsFiles.file_id, FileAttached.name)
+            .outerjoin(FileAttached, FileAttached.id == SuspensionsFiles.file_id)
+            .where(  # literal_execute: ids are rendered inline, so the number of bind params is not limited
+                SuspensionsFiles.suspension_id.in_(bindparam("suspension_ids", suspension_ids, literal_execute=True))
+            )
+            .order_by(SuspensionsFiles.suspension_id.asc(), SuspensionsFiles.file_id.asc())
+        )
+        return files_names.all()
+
     async def get_files_from_suspension(self, suspension_id: int) -> Sequence[FileAttached]:
         """Получить список файлов, прикрепленных к простою."""
         files = await self._session.scalars(
@@ -3,8 +3,9 @@
 from collections.abc import Sequence
 
 from fastapi import Depends
-from sqlalchemy import delete, insert, select
+from sqlalchemy import Row, bindparam, delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from src.core.db.db import get_session
 from src.core.db.models import FileAttached, Task, TasksFiles
 from src.core.db.repository.base import ContentRepository
@@ -17,13 +18,30 @@ class TaskRepository(ContentRepository):
     def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
         super().__init__(session, Task)
 
-    async def get_all(self) -> Sequence[Task]:  # rename and move base.py todo
-        """Возвращает все задачи из базы данных, отсортированные по времени."""
-        objects = await self._session.scalars(
-            select(Task)
-            .order_by(Task.task_start.desc())
+    async def search(
+            self,
+            search_text: str,
+            limit: int | None = None,
+            cursor: str | None = None,
+    ) -> tuple[Sequence[Task], str | None]:
+        """Полнотекстовый поиск задач по названию и описанию: страница по релевантности и курсор следующей."""
+        return await self.get_search_page(
+            select(Task).options(joinedload(Task.user), joinedload(Task.executor)), search_text, limit, cursor
+        )
+
+    async def get_all(
+            self,
+            limit: int | None = None,
+            cursor: str | None = None,
+    ) -> tuple[Sequence[Task], str | None]:  # rename and move base.py todo
+        """Возвращает страницу задач, отсортированных по времени (вместе с постановщиком и исполнителем)."""
+        return await self.get_page(
+            select(Task).options(joinedload(Task.user), joinedload(Task.executor)),
+            (Task.task_start, Task.id),
+            True,
+            limit,
+            cursor
         )
-        return objects.all()
 
     async def get_all_id_sorted(self) -> Sequence[Task]:  # rename and move base.py todo
         """Возвращает все задачи из базы данных, отсортированные по id."""
@@ -33,38 +51,55 @@ class TaskRepository(ContentRepository):
         )
         return objects.all()
 
-    async def get_all_opened(self) -> Sequence[Task]:
-        """Возвращает активные задачи из базы данных, отсортированные по времени."""
-        objects = await self._session.scalars(
-            select(Task)
-            .where(Task.is_archived == 0)
-            .order_by(Task.task_start.desc())
+    async def get_all_opened(
+            self,
+            limit: int | None = None,
+            cursor: str | None = None,
+    ) -> tuple[Sequence[Task], str | None]:
+        """Возвращает страницу активных задач, отсортированных по времени, и курсор следующей страницы."""
+        return await self.get_page(
+            select(Task).options(joinedload(Task.user), joinedload(Task.executor)).where(Task.is_archived == 0),
+            (Task.task_start, Task.id),
+            True,
+            limit,
+            cursor
         )
-        return objects.all()
 
-    async def get_tasks_ordered(self, user_id: int, limit: int = 3, offset: int = 0) -> Sequence[Task]:
-        """Получить список задач, выставленных пользователем."""
-        tasks_ordered_for_user = await self._session.scalars(
+    async def get_tasks_ordered(
+            self,
+            user_id: int,
+            limit: int | None = None,
+            cursor: str | None = None,
+    ) -> tuple[Sequence[Task], str | None]:
+        """Получить страницу задач, выставленных пользователем, по возрастанию дедлайна."""
+        return await self.get_page(
             select(Task)
+            .options(joinedload(Task.user), joinedload(Task.executor))
             .where(Task.user_id == user_id)
-            .where(Task.is_archived == 0)
-            # .limit(limit)  # todo реализовать пагинацию
-            # .offset(offset)
-            .order_by(Task.deadline.asc())
+            .where(Task.is_archived == 0),
+            (Task.deadline, Task.id),
+            False,
+            limit,
+            cursor
         )
-        return tasks_ordered_for_user.all()
 
-    async def get_tasks_todo(self, user_id: int, limit: int = 3, offset: int = 0) -> Sequence[Task]:
-        """Получить список задач, выставленных пользователю."""
-        tasks_todo = await self._session.scalars(
+    async def get_tasks_todo(
+            self,
+            user_id: int,
+            limit: int | None = None,
+            cursor: str | None = None,
+    ) -> tuple[Sequence[Task], str | None]:
+        """Получить страницу задач, выставленных пользователю, по возрастанию дедлайна."""
+        return await self.get_page(
             select(Task)
+            .options(joinedload(Task.user), joinedload(Task.executor))
             .where(Task.executor_id == user_id)
-            .where(Task.is_archived == 0)
-            # .limit(limit)  # todo реализовать пагинацию
-            # .offset(offset)
-            .order_by(Task.deadline.asc())
+            .where(Task.is_archived == 0),
+            (Task.deadline, Task.id),
+            False,
+            limit,
+            cursor
         )
-        return tasks_todo.all()
 
     async def set_files_to_task(self, task_id: int, files_ids: list[int]) -> None:
         """Присваивает задаче список файлов."""  # in to repository/base.py todo
@@ -90,6 +125,23 @@ class TaskRepository(ContentRepository):
         )
         return task_files_relations.all()
 
+    async def get_files_names_for_tasks(self, task_ids: Sequence[int]) -> Sequence[Row]:
+        """
+        Получить за 1 запрос отношения задача-файл для списка задач вместе с именами файлов.
+        Строка: (task_id, file_id, name); name is None, если файла нет в таблице FileAttached.
+        """
+        if not task_ids:
+            return []
+        files_names = await self._session.execute(
+            select(TasksFiles.task_id, TasksFiles.file_id, FileAttached.name)
+            .outerjoin(FileAttached, FileAttached.id == TasksFiles.file_id)
+            .where(  # literal_execute: ids are rendered inline, so the number of bind params is not limited
+                TasksFiles.task_id.in_(bindparam("task_ids", task_ids, literal_execute=True))
+            )
+            .order_by(TasksFiles.task_id.asc(), TasksFiles.file_id.asc())
+        )
+        return files_names.all()
+
     async def get_files_from_task(self, task_id: int) -> Sequence[FileAttached]:
         """Получить список файлов, прикрепленных к задаче."""
         files = await self._session.scalars(
@@ -1,4 +1,5 @@
 """src/core/db/repository/user.py"""
+from functools import partial
 from typing import Sequence
 
 from fastapi import Depends
@@ -7,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.db.db import get_session
 from src.core.db.models import User
 from src.core.db.repository.base import ContentRepository
+from src.core.db.user_cache import user_cache
 from src.core.exceptions import NotFoundException
 
 
@@ -16,9 +18,15 @@ class UsersRepository(ContentRepository):
     def __init__(self, session: AsyncSession = Depends(get_session)) -> None:
         super().__init__(session, User)
 
+    async def get_or_none(self, _id: int) -> User | None:
+        """Получает пользователя по ID из справочника в памяти или из базы. В случае отсутствия возвращает None."""
+        return await user_cache.get(self._session, _id, partial(super().get_or_none, _id))
+
     async def get_or_none_email(self, _email: str) -> User | None:
-        """Получает из базы объект модели по email. В случае отсутствия возвращает None."""
-        return await self._session.scalar(select(User).where(User.email == _email))
+        """Получает пользователя по email из справочника в памяти или из базы. В случае отсутствия возвращает None."""
+        return await user_cache.get_by_email(
+            self._session, _email, partial(self._session.scalar, select(User).where(User.email == _email))
+        )
 
     async def get_by_email(self, _email: str) -> User:
         """Получает объект модели по email. В случае отсутствия объекта бросает ошибку."""
@@ -1,5 +1,6 @@
 """src/core/db/user.py"""
-from typing import Optional, Union
+from functools import partial
+from typing import Any, Optional, Union
 
 import structlog
 from fastapi import Depends, Request
@@ -14,14 +15,22 @@ from src.api.constants import (IS_REGISTERED, LOGIN, PASSWORD_EMAIL_WARNING,
 from src.api.schemas import UserCreate
 from src.core.db.db import get_session
 from src.core.db.models import User
+from src.core.db.user_cache import user_cache
 from src.settings import settings
 
 log = structlog.get_logger()
 
 
+class CachedUserDatabase(SQLAlchemyUserDatabase):
+    """Доступ fastapi-users к пользователям: current_user читает пользователя по id из справочника в памяти."""
+
+    async def get(self, id: int) -> Optional[User]:
+        return await user_cache.get(self.session, id, partial(super().get, id))
+
+
 # Асинхронный генератор get_user_db: дает доступ к БД чз SQLAlchemy как (dependency) для объекта класса UserManager
 async def get_user_db(session: AsyncSession = Depends(get_session)):
-    yield SQLAlchemyUserDatabase(session, User)
+    yield CachedUserDatabase(session, User)
 
 # Транспорт: токен передается чз заголовок HTTP-запроса Authorization: Bearer. URL эндпоинта для получения токена.
 bearer_transport = BearerTransport(tokenUrl=LOGIN)
@@ -61,8 +70,24 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     async def on_after_register(
             self, user: User, request: Optional[Request] = None
     ):
+        user_cache.invalidate(user.id)
         await log.ainfo("{}{}".format(user.email, IS_REGISTERED))
 
+    # Изменение, верификация, сброс пароля и удаление пользователя сбрасывают его в справочнике пользователей
+    async def on_after_update(
+            self, user: User, update_dict: dict[str, Any], request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
+    async def on_after_verify(self, user: User, request: Optional[Request] = None):
+        user_cache.invalidate(user.id)
+
+    async def on_after_reset_password(self, user: User, request: Optional[Request] = None):
+        user_cache.invalidate(user.id)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        user_cache.invalidate(user.id)
+
 
 # Корутина, возвращающая объект класса UserManager.
 async def get_user_manager(user_db=Depends(get_user_db)):
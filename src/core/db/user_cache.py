@@ -0,0 +1,102 @@
+"""src/core/db/user_cache.py"""
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from src.core.db.models import DataVersion, User
+from src.settings import settings
+
+
+class UserCache:
+    """
+    Справочник пользователей в памяти процесса: id -> значения колонок пользователя, email -> id.
+    Пользователей мало и меняются они редко: запись живет ttl секунд (USER_CACHE_TTL, 0 - кэш выключен),
+    помечена версией данных таблицы user (data_versions, ее увеличивают триггеры БД при любой записи) и отдается,
+    только пока версия не изменилась: изменения из других процессов и восстановление БД видны сразу.
+    Хуки UserManager дополнительно сбрасывают пользователя при регистрации, изменении и удалении.
+    Найденный пользователь сливается в сессию запроса без запроса в БД (merge с load=False),
+    поэтому ORM-объекты разных сессий не смешиваются.
+    """
+
+    def __init__(self, ttl: float = settings.USER_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._by_id: dict[int, tuple[float, tuple | None, dict]] = {}  # id -> (expires, data version, values)
+        self._id_by_email: dict[str, int] = {}
+
+    @staticmethod
+    async def _data_version(session: AsyncSession) -> tuple | None:
+        """Версия данных таблицы user (None, если в таблицу еще не писали): общая для всех процессов."""
+        row = (await session.execute(
+            select(DataVersion.version, DataVersion.updated_at).where(DataVersion.table_name == User.__tablename__)
+        )).one_or_none()
+        return None if row is None else tuple(row)
+
+    def _lookup(self, user_id: int | None, data_version: tuple | None) -> dict | None:
+        entry = self._by_id.get(user_id)
+        if entry is None or entry[0] < time.monotonic() or entry[1] != data_version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[2]
+
+    @staticmethod
+    async def _merge(session: AsyncSession, values: dict | None) -> User | None:
+        if values is None:
+            return None
+        user = User(**values)
+        make_transient_to_detached(user)
+        return await session.merge(user, load=False)
+
+    async def get(
+            self, session: AsyncSession, user_id: int, load: Callable[[], Awaitable[User | None]]
+    ) -> User | None:
+        """Пользователь по id из кэша (в сессии session) или прочитанный load() и запомненный."""
+        data_version = await self._data_version(session)  # before load(): a later write makes the entry stale
+        user = await self._merge(session, self._lookup(user_id, data_version))
+        return user if user is not None else self._put(await load(), data_version)
+
+    async def get_by_email(
+            self, session: AsyncSession, email: str, load: Callable[[], Awaitable[User | None]]
+    ) -> User | None:
+        """Пользователь по email из кэша (в сессии session) или прочитанный load() и запомненный."""
+        data_version = await self._data_version(session)
+        values = self._lookup(self._id_by_email.get(email), data_version)
+        user = await self._merge(session, values if values is None or values["email"] == email else None)
+        return user if user is not None else self._put(await load(), data_version)
+
+    def _put(self, user: User | None, data_version: tuple | None) -> User | None:
+        """Запоминает пользователя, прочитанного из БД при версии данных data_version, и возвращает его."""
+        if user is not None and self.ttl > 0:
+            values = {column.key: getattr(user, column.key) for column in inspect(User).column_attrs}
+            self._by_id[user.id] = (time.monotonic() + self.ttl, data_version, values)
+            self._id_by_email[user.email] = user.id
+        return user
+
+    def invalidate(self, user_id: int | None = None) -> None:
+        """Сбрасывает пользователя user_id или (None) весь справочник."""
+        if user_id is None:
+            self._by_id.clear()
+            self._id_by_email.clear()
+            return
+        self._by_id.pop(user_id, None)
+        for email in [email for email, cached_id in self._id_by_email.items() if cached_id == user_id]:
+            del self._id_by_email[email]
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        """Счетчики попаданий и промахов, доля попаданий и число пользователей в кэше."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._by_id),
+            "ttl": self.ttl,
+        }
+
+
+user_cache = UserCache()  # one directory per process
@@ -23,3 +23,9 @@ TechProcess = StrEnum('TechProcess', json.loads(settings.TECH_PROCESS))
 
 RiskAccidentSource = StrEnum('RiskAccidentSource', json.loads(settings.RISK_SOURCE))
 """Enum-класс используемых угроз."""
+
+BackupKind = StrEnum('BackupKind', {"FULL": "full", "INCREMENTAL": "incremental"})
+"""Enum-класс видов бэкапа БД: полный снимок или страницы, измененные с последнего полного снимка."""
+
+OutageState = StrEnum('OutageState', {"UP": "up", "SUSPECT": "suspect", "DOWN": "down", "RECOVERING": "recovering"})
+"""Enum-класс состояний детектора простоев: UP -> SUSPECT -> DOWN -> RECOVERING -> UP."""
@@ -1,3 +1,4 @@
-from .exceptions import AlreadyExistsException, NotFoundException
+from .exceptions import (AlreadyExistsException, InvalidCursorException,
+                         NotFoundException, NotModifiedException)
 
-__all__ = ("AlreadyExistsException", "NotFoundException")
+__all__ = ("AlreadyExistsException", "InvalidCursorException", "NotFoundException", "NotModifiedException")
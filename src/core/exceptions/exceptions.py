@@ -2,7 +2,9 @@
 from http import HTTPStatus
 from typing import Any
 
-from src.api.constants import ALREADY_EXISTS, NOT_FOUND, WITH_ID
+from src.api.constants import (ALREADY_EXISTS, DB_RESTORE_POINT_NOT_FOUND,
+                               DB_RESTORE_VERIFICATION_ERROR, ETAG,
+                               INVALID_CURSOR, NOT_FOUND, WITH_ID)
 from src.core.db.models import Base as DatabaseModel
 from starlette.exceptions import HTTPException
 
@@ -26,3 +28,27 @@ class AlreadyExistsException(ApplicationException):
     def __init__(self, obj: DatabaseModel):
         self.status_code = HTTPStatus.BAD_REQUEST
         self.detail = "{}{}".format(obj, ALREADY_EXISTS)
+
+
+class InvalidCursorException(ApplicationException):
+    def __init__(self, cursor: str):
+        self.status_code = HTTPStatus.UNPROCESSABLE_ENTITY
+        self.detail = "{}{}".format(INVALID_CURSOR, cursor)
+
+
+class NotModifiedException(ApplicationException):
+    def __init__(self, etag: str):
+        self.status_code = HTTPStatus.NOT_MODIFIED
+        self.headers = {ETAG: etag}
+
+
+class RestorePointNotFoundException(ApplicationException):
+    def __init__(self, until: Any):
+        self.status_code = HTTPStatus.NOT_FOUND
+        self.detail = "{}{}".format(DB_RESTORE_POINT_NOT_FOUND, until)
+
+
+class RestoreVerificationException(ApplicationException):
+    def __init__(self, error: str):
+        self.status_code = HTTPStatus.CONFLICT
+        self.detail = "{}{}".format(DB_RESTORE_VERIFICATION_ERROR, error)
@@ -0,0 +1,28 @@
+"""src/restore.py
+
+Восстановление БД из бэкапов каталога DB_BACKUP_DIR на момент времени:
+python -m src.restore  # из последнего бэкапа
+python -m src.restore --until 2024-10-18T12:00  # из последнего бэкапа не позже момента (время TIMEZONE_OFFSET)
+python -m src.restore --until 2024-10-18T12:00 --target restored.db  # в отдельный файл, рабочая БД не меняется
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+from src.core.logging.setup import setup_logging
+from src.services.db_backup import DBBackupService
+
+
+def start_restore():
+    parser = argparse.ArgumentParser(description="Восстановление БД из полного бэкапа и инкремента к нему.")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None, help="момент восстановления (ISO)")
+    parser.add_argument("--target", type=Path, default=None, help="файл БД (по умолчанию - рабочая БД)")
+    arguments = parser.parse_args()
+    setup_logging()
+    report = asyncio.run(DBBackupService().restore_db(arguments.until, target=arguments.target))
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    start_restore()
@@ -0,0 +1,86 @@
+"""src/services/connection_probe.py"""
+import asyncio
+import math
+import time
+from collections import defaultdict, deque
+from collections.abc import Iterable
+
+import httpx
+import structlog
+from src.api.constants import FAILED_GET_URL
+from src.api.schemas import ProbeResult
+from src.settings import settings
+
+log = structlog.get_logger() if settings.FILE_NAME_IN_LOG is False else structlog.get_logger().bind(file_name=__file__)
+
+
+class ConnectionProbe:
+    """
+    Неблокирующая проверка доступа к url: один httpx.AsyncClient с пулом соединений на все проверки,
+    явные таймауты соединения и чтения, параллельный опрос url и окно времени ответа по каждому url.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.PROBE_READ_TIMEOUT, connect=settings.PROBE_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.PROBE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PROBE_MAX_CONNECTIONS,
+            ),
+            transport=transport,
+        )
+        self._latencies: defaultdict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=settings.PROBE_LATENCY_WINDOW)
+        )
+
+    async def __aenter__(self) -> "ConnectionProbe":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Закрывает пул соединений."""
+        await self._client.aclose()
+
+    def get_percentiles(self, url: str) -> dict[str, float]:
+        """Перцентили времени ответа url (мс, по ближайшему рангу) по окну последних успешных проверок."""
+        latencies = sorted(self._latencies[url])
+        if not latencies:
+            return {}
+        return {
+            f"p{percentile}": round(latencies[max(math.ceil(percentile / 100 * len(latencies)) - 1, 0)], 1)
+            for percentile in settings.PROBE_LATENCY_PERCENTILES
+        }
+
+    async def probe(self, url: str, timeout: float | None = None) -> ProbeResult:
+        """
+        Проверяет url: доступен, если получен любой HTTP-ответ до истечения таймаутов.
+        timeout - таймаут чтения для цели мониторинга вместо общего (соединение - не дольше него же).
+        """
+        started = time.perf_counter()
+        try:
+            if timeout is None:
+                response = await self._client.get(url)
+            else:
+                response = await self._client.get(
+                    url, timeout=httpx.Timeout(timeout, connect=min(timeout, settings.PROBE_CONNECT_TIMEOUT))
+                )
+        except (httpx.HTTPError, httpx.InvalidURL) as error:
+            await log.aerror(FAILED_GET_URL, url=url, error=repr(error))
+            return ProbeResult(
+                url=url, is_up=False, error=type(error).__name__, percentiles_ms=self.get_percentiles(url)
+            )
+        latency_ms = (time.perf_counter() - started) * 1000
+        self._latencies[url].append(latency_ms)
+        return ProbeResult(
+            url=url,
+            is_up=True,
+            status_code=response.status_code,
+            latency_ms=round(latency_ms, 1),
+            percentiles_ms=self.get_percentiles(url),
+        )
+
+    async def probe_all(self, urls: Iterable[str], timeout: float | None = None) -> list[ProbeResult]:
+        """Проверяет url параллельно: общее время - время самого медленного url, а не сумма."""
+        return list(await asyncio.gather(*(self.probe(url, timeout) for url in urls)))
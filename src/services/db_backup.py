@@ -1,29 +1,259 @@
 """src/services/db_backup.py"""
 
 import asyncio
-import re
-from datetime import date
+import gzip
+import os
+import shutil
+import sqlite3
+import struct
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
 from pathlib import Path
-from shutil import copy2
-from typing import Generator
 
 import structlog
+from alembic import command
+from alembic.config import Config
+from pydantic import TypeAdapter
 from src.api.constants import *
+from src.api.schemas import DBBackupReport, DBRestoreReport
+from src.core.db.data_version import DATA_VERSION_SUFFIX, bump_version_sql
+from src.core.db.db import engine
+from src.core.db.full_text_search import FULL_TEXT_SUFFIX
+from src.core.enums import BackupKind
+from src.core.exceptions.exceptions import RestorePointNotFoundException, RestoreVerificationException
 from src.settings import settings
 
 log = structlog.get_logger()
 
 SERVICES_DIR = Path(__file__).resolve().parent.parent.parent
 BACKUP_DIR = SERVICES_DIR.joinpath(settings.DB_BACKUP_DIR)
+ALEMBIC_INI = SERVICES_DIR.joinpath("alembic.ini")
+MIGRATIONS_DIR = SERVICES_DIR.joinpath("src", "core", "db", "migrations")
+BACKUP_MANIFEST = "manifest.json"  # index of the backups: retention never rescans the folder
+BACKUP_SNAPSHOT = ".snapshot.db"  # uncompressed online snapshot, removed after each backup
+BACKUP_TIME_FORMAT = "%Y-%m-%d_%H%M%S_%f"
+COPY_CHUNK = 2**20
+DELTA_MAGIC = b"TADELTA1"
+DELTA_HEADER = struct.Struct(">II")  # page size, page count of the snapshot
+DELTA_PAGE = struct.Struct(">I")  # number of the changed page, its bytes follow
+MANIFEST_ADAPTER = TypeAdapter(list[DBBackupReport])
+RESTORE_SUFFIX = ".restore"  # the db is rebuilt next to the target and replaces it only after the checks
+SQLITE_SIDE_FILES = ("-wal", "-shm", "-journal")
+
+
+def backup_sqlite(
+        source: Path,
+        target: Path,
+        pages: int = settings.DB_BACKUP_PAGES,
+        step_sleep: float = settings.DB_BACKUP_STEP_SLEEP,
+) -> tuple[int, int]:
+    """
+    Онлайн-снимок SQLite через backup API: страницы копируются порциями по pages с паузой step_sleep,
+    между порциями писатели получают БД; если БД изменилась во время копирования, SQLite сам начинает
+    копирование заново, поэтому снимок согласован. Снимок пишется во временный файл, проверяется
+    PRAGMA integrity_check и только после этого атомарно заменяет target. Возвращает (число страниц, размер страницы).
+    Блокирующая функция: из асинхронного кода запускается в потоке.
+    """
+    temp_target = target.with_name(target.name + ".tmp")
+    source_connection = sqlite3.connect(f"{source.resolve().as_uri()}?mode=ro", uri=True)  # no empty db if absent
+    try:
+        target_connection = sqlite3.connect(temp_target)
+        try:
+            source_connection.backup(target_connection, pages=pages, sleep=step_sleep)
+            integrity = target_connection.execute("PRAGMA integrity_check").fetchone()[0]
+            page_count = target_connection.execute("PRAGMA page_count").fetchone()[0]
+            page_size = target_connection.execute("PRAGMA page_size").fetchone()[0]
+        finally:
+            target_connection.close()
+    finally:
+        source_connection.close()
+    if integrity != "ok":
+        temp_target.unlink(missing_ok=True)
+        raise sqlite3.DatabaseError(f"{DB_BACKUP_INTEGRITY_ERROR} {integrity}")
+    os.replace(temp_target, target)
+    return page_count, page_size
+
+
+def compress_file(source: Path, target: Path, level: int = settings.DB_BACKUP_COMPRESS_LEVEL) -> None:
+    """Сжимает файл в gzip потоком (память не зависит от размера БД); target появляется только целиком."""
+    temp_target = target.with_name(target.name + ".tmp")
+    with open(source, "rb") as source_file, gzip.open(temp_target, "wb", compresslevel=level) as target_file:
+        shutil.copyfileobj(source_file, target_file, COPY_CHUNK)
+    os.replace(temp_target, target)
+
+
+def write_delta(
+        base: Path,
+        snapshot: Path,
+        target: Path,
+        page_size: int,
+        level: int = settings.DB_BACKUP_COMPRESS_LEVEL,
+) -> int:
+    """
+    Пишет инкремент: страницы снимка, отличающиеся от страниц полного снимка base (сравнение потоком, постранично),
+    в сжатый файл target. Возвращает число измененных страниц.
+    """
+    temp_target = target.with_name(target.name + ".tmp")
+    page_count = snapshot.stat().st_size // page_size
+    changed_pages = 0
+    with (
+        gzip.open(base, "rb") as base_file,
+        open(snapshot, "rb") as snapshot_file,
+        gzip.open(temp_target, "wb", compresslevel=level) as delta_file,
+    ):
+        delta_file.write(DELTA_MAGIC + DELTA_HEADER.pack(page_size, page_count))
+        for page_number in range(page_count):
+            page = snapshot_file.read(page_size)
+            if base_file.read(page_size) != page:
+                delta_file.write(DELTA_PAGE.pack(page_number) + page)
+                changed_pages += 1
+    os.replace(temp_target, target)
+    return changed_pages
+
+
+def restore_snapshot(full: Path, target: Path, delta: Path | None = None) -> None:
+    """Собирает файл БД target из полного снимка и (если задан) инкремента к нему."""
+    with gzip.open(full, "rb") as full_file, open(target, "wb") as target_file:
+        shutil.copyfileobj(full_file, target_file, COPY_CHUNK)
+    if delta is None:
+        return
+    with gzip.open(delta, "rb") as delta_file, open(target, "r+b") as target_file:
+        if delta_file.read(len(DELTA_MAGIC)) != DELTA_MAGIC:
+            raise ValueError(f"{DB_BACKUP_DELTA_ERROR} {delta}")
+        page_size, page_count = DELTA_HEADER.unpack(delta_file.read(DELTA_HEADER.size))
+        while record := delta_file.read(DELTA_PAGE.size):
+            (page_number,) = DELTA_PAGE.unpack(record)
+            target_file.seek(page_number * page_size)
+            target_file.write(delta_file.read(page_size))
+        target_file.truncate(page_count * page_size)
+
+
+def count_rows(path: Path) -> dict[str, int]:
+    """Число строк каждой таблицы БД (кроме служебных таблиц SQLite и полнотекстового индекса)."""
+    with closing(sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)) as connection:
+        tables = [
+            name for (name,) in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+            if FULL_TEXT_SUFFIX not in name
+        ]
+        return {name: connection.execute(f'SELECT count(*) FROM "{name}"').fetchone()[0] for name in tables}
+
+
+def get_revision(path: Path) -> str | None:
+    """Ревизия alembic файла БД (None - БД не под управлением alembic)."""
+    with closing(sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)) as connection:
+        if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'alembic_version'").fetchone() is None:
+            return None
+        row = connection.execute("SELECT version_num FROM alembic_version").fetchone()
+        return None if row is None else row[0]
+
+
+def upgrade_database(path: Path) -> None:
+    """Миграции alembic файла БД до head. env.py запускает свой event loop: из асинхронного кода - в потоке."""
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.attributes["database_url"] = f"sqlite+aiosqlite:///{path.resolve()}"
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
+def bump_data_versions(path: Path) -> None:
+    """
+    Новые версии данных всех таблиц восстановленной БД: ETag и кэши пользователей и аналитики всех процессов
+    сверяются с data_versions, поэтому ответы, прочитанные до восстановления, больше не считаются актуальными.
+    """
+    with closing(sqlite3.connect(path)) as connection:
+        table_names = [name for (name,) in connection.execute(  # tables with data version triggers
+            "SELECT tbl_name FROM sqlite_master WHERE type = 'trigger' AND name GLOB ?",
+            (f"*{DATA_VERSION_SUFFIX}_insert",)
+        )]
+        with connection:
+            for table_name in table_names:
+                connection.execute(bump_version_sql(table_name))
+
+
+def select_restore_point(backups: list[DBBackupReport], until: datetime | None = None) -> DBBackupReport:
+    """Последний бэкап не позже until (без часового пояса - время TIMEZONE_OFFSET); until=None - последний."""
+    if until is not None and until.tzinfo is None:
+        until = until.replace(tzinfo=TZINFO)
+    candidates = [backup for backup in backups if until is None or backup.created_at <= until]
+    if not candidates:
+        raise RestorePointNotFoundException(until)
+    return max(candidates, key=lambda backup: backup.created_at)
+
+
+def rebuild_database(point: DBBackupReport, target: Path, folder=BACKUP_DIR) -> dict[str, int]:
+    """
+    Собирает БД на момент бэкапа point (полный снимок + инкремент) в target и проверяет ее:
+    integrity_check и число строк каждой таблицы против записанного при бэкапе. Возвращает число строк.
+    """
+    if point.kind == BackupKind.FULL:
+        restore_snapshot(folder.joinpath(point.file), target)
+    else:
+        restore_snapshot(folder.joinpath(point.base), target, folder.joinpath(point.file))
+    with closing(sqlite3.connect(target)) as connection:
+        integrity = connection.execute("PRAGMA integrity_check").fetchone()[0]
+    if integrity != "ok":
+        raise RestoreVerificationException(integrity)
+    row_counts = count_rows(target)
+    if point.row_counts and row_counts != point.row_counts:
+        raise RestoreVerificationException(f"{point.row_counts} != {row_counts}")
+    return row_counts
+
+
+def load_database(source: Path, target: Path) -> None:
+    """
+    Загружает БД source в существующую БД target через backup API, а не заменой файла: запись идет через
+    блокировки и журнал (WAL) самой target, поэтому открытые соединения пула сразу видят новые данные,
+    а их журналы не остаются от прежнего файла.
+    """
+    with closing(sqlite3.connect(source)) as source_connection, closing(sqlite3.connect(target)) as target_connection:
+        source_connection.backup(target_connection)
+
+
+def select_retained(
+        backups: list[DBBackupReport],
+        keep_daily: int = settings.DB_BACKUP_KEEP_DAILY,
+        keep_weekly: int = settings.DB_BACKUP_KEEP_WEEKLY,
+        keep_monthly: int = settings.DB_BACKUP_KEEP_MONTHLY,
+        max_backups: int = settings.MAX_DB_BACKUP_FILES,
+) -> set[str]:
+    """
+    Ротация дед-отец-сын: последний бэкап каждого из keep_daily последних дней, keep_weekly недель
+    и keep_monthly месяцев, но не больше max_backups самых новых из них;
+    полный снимок хранится, пока хранится хотя бы один его инкремент.
+    """
+    periods = (
+        (keep_daily, lambda created_at: created_at.date()),
+        (keep_weekly, lambda created_at: created_at.isocalendar()[:2]),
+        (keep_monthly, lambda created_at: (created_at.year, created_at.month)),
+    )
+    newest_first = sorted(backups, key=lambda backup: backup.created_at, reverse=True)
+    retained: set[str] = set()
+    for keep, period in periods:
+        seen = set()
+        for backup in newest_first:
+            key = period(backup.created_at)
+            if key in seen:
+                continue
+            if len(seen) >= keep:
+                break
+            seen.add(key)
+            retained.add(backup.file)
+    retained = set([backup.file for backup in newest_first if backup.file in retained][:max_backups])
+    return retained | {backup.base for backup in backups if backup.file in retained and backup.base}
 
 
 class DBBackupService:
     """
     Сервис для автоматического архивирования БД:
-    self.db_path = app/db_backups/tech_accident_db_local.db
+    self.db_path = app/tech_accident_db_local.db - рабочая БД; в app/db_backups - сжатые полные снимки,
+    инкременты к последнему полному снимку и манифест всех бэкапов.
     """
     def __init__(self,) -> None:
-        self.db_path = BACKUP_DIR.joinpath(settings.DATABASE_NAME)
+        self.db_path = SERVICES_DIR.joinpath(settings.DATABASE_NAME)
 
     async def check_folder_exists(self, folder=BACKUP_DIR) -> None:
         """ Проверяет наличие каталога, и создает его если нет."""
@@ -31,32 +261,148 @@ class DBBackupService:
             folder.mkdir(parents=True, exist_ok=True)
             await log.ainfo("{}".format(DIR_CREATED), folder=folder)
 
-    async def get_list_of_names_in_dir(self, folder=BACKUP_DIR) -> list | Generator:
-        """ Возвращает список файлов в каталоге, соответсвующих регулярному выражению файла-даты."""
+    @staticmethod
+    def read_manifest(folder=BACKUP_DIR) -> list[DBBackupReport]:
+        """Бэкапы из манифеста каталога (от старых к новым)."""
+        manifest = folder.joinpath(BACKUP_MANIFEST)
+        if not manifest.exists():
+            return []
+        return MANIFEST_ADAPTER.validate_json(manifest.read_bytes())
+
+    @staticmethod
+    def write_manifest(backups: list[DBBackupReport], folder=BACKUP_DIR) -> None:
+        """Атомарно перезаписывает манифест каталога."""
+        manifest = folder.joinpath(BACKUP_MANIFEST)
+        temp_manifest = manifest.with_name(manifest.name + ".tmp")
+        temp_manifest.write_bytes(MANIFEST_ADAPTER.dump_json(backups, indent=2))
+        os.replace(temp_manifest, manifest)
+
+    @staticmethod
+    def get_base(backups: list[DBBackupReport], created_at: datetime, page_size: int, folder=BACKUP_DIR) -> DBBackupReport | None:
+        """Полный снимок для инкремента: последний, не старше DB_BACKUP_FULL_INTERVAL, с тем же размером страницы."""
+        full_backups = [backup for backup in backups if backup.kind == BackupKind.FULL]
+        if not full_backups:
+            return None
+        base = max(full_backups, key=lambda backup: backup.created_at)
+        if (
+                base.page_size != page_size
+                or created_at - base.created_at > timedelta(seconds=settings.DB_BACKUP_FULL_INTERVAL)
+                or not folder.joinpath(base.file).exists()
+        ):
+            return None
+        return base
+
+    def make_backup(self, backups: list[DBBackupReport], folder=BACKUP_DIR) -> DBBackupReport:
+        """Снимок БД и полный бэкап или инкремент к последнему полному. Блокирующий: запускается в потоке."""
+        created_at = datetime.now(TZINFO)
+        started = time.perf_counter()
+        snapshot = folder.joinpath(BACKUP_SNAPSHOT)
+        try:
+            page_count, page_size = backup_sqlite(self.db_path, snapshot)
+            row_counts = count_rows(snapshot)
+            base = self.get_base(backups, created_at, page_size, folder)
+            stamp = created_at.strftime(BACKUP_TIME_FORMAT)
+            if base is None:
+                file = "{}_{}.db.gz".format(BackupKind.FULL, stamp)
+                compress_file(snapshot, folder.joinpath(file))
+                changed_pages = page_count
+            else:
+                file = "{}_{}.delta.gz".format(BackupKind.INCREMENTAL, stamp)
+                changed_pages = write_delta(folder.joinpath(base.file), snapshot, folder.joinpath(file), page_size)
+        finally:
+            snapshot.unlink(missing_ok=True)
+        return DBBackupReport(
+            file=file,
+            kind=BackupKind.FULL if base is None else BackupKind.INCREMENTAL,
+            base=None if base is None else base.file,
+            created_at=created_at,
+            size_bytes=folder.joinpath(file).stat().st_size,
+            pages=page_count,
+            page_size=page_size,
+            changed_pages=changed_pages,
+            duration_sec=round(time.perf_counter() - started, 3),
+            integrity="ok",
+            row_counts=row_counts,
+        )
+
+    async def remove_expired(self, backups: list[DBBackupReport], folder=BACKUP_DIR) -> list[DBBackupReport]:
+        """Удаляет бэкапы вне ротации (по манифесту, без обхода каталога) и сохраняет манифест."""
+        retained = select_retained(backups)
+        for backup in backups:
+            if backup.file not in retained:
+                folder.joinpath(backup.file).unlink(missing_ok=True)
+                await log.ainfo("{}{}".format(backup.file, DELETED_OK), old_file_to_remove=backup.file)
+        backups = sorted(
+            (backup for backup in backups if backup.file in retained), key=lambda backup: backup.created_at
+        )
+        self.write_manifest(backups, folder)
+        return backups
+
+    async def make_copy_db(self, folder=BACKUP_DIR) -> DBBackupReport | None:
+        """
+        Делает онлайн-снимок рабочей БД (в потоке, не блокируя event loop) и сохраняет его сжатым:
+        полностью или инкрементом к последнему полному снимку; затем применяет ротацию.
+        Возвращает отчет о бэкапе или None при ошибке.
+        """
         await self.check_folder_exists(folder)
-        return [re.findall(DATE_PATTERN, str(file)) for file in folder.glob("*.db")]
-        # return folder.glob("*.db")  # if is needed to return iterator
+        backups = self.read_manifest(folder)
+        report = None
+        try:
+            report = await asyncio.to_thread(self.make_backup, backups, folder)
+            backups.append(report)
+            await log.ainfo("{}".format(FILE_SAVED), **report.model_dump())
+        except sqlite3.Error as error:  # no db file (mode=ro) or a broken snapshot
+            await log.aerror("{}".format(COPY_FILE_ERROR), file=str(self.db_path), error=str(error))
+        await self.remove_expired(backups, folder)
+        return report
 
-    async def make_copy_db(self, folder=BACKUP_DIR) -> None:
-        """ Проверяет есть ли каталог для архивов БД и копирует архив в этот каталог."""
-        db_to_backup = SERVICES_DIR.joinpath(settings.DATABASE_NAME)
+    async def restore_db(
+            self,
+            until: datetime | None = None,
+            folder=BACKUP_DIR,
+            target: Path | None = None,
+    ) -> DBRestoreReport:
+        """
+        Восстанавливает БД (по умолчанию рабочую) из последнего бэкапа не позже until: сборка и проверки - рядом
+        с target, затем миграции alembic до head; рабочая БД перед заменой сохраняется бэкапом (восстановление
+        можно откатить); в существующую БД данные загружаются через backup API, после чего пул соединений сбрасывается.
+        Версии данных восстановленной БД увеличиваются: кэши всех процессов перечитывают пользователей и итоги.
+        """
+        target = self.db_path if target is None else target
+        point = select_restore_point(self.read_manifest(folder), until)
+        started = time.perf_counter()
+        restored = target.with_name(target.name + RESTORE_SUFFIX)
         try:
-            await self.check_folder_exists()
-            copy2(db_to_backup, BACKUP_DIR)
-            new_backup_db = self.db_path.rename(BACKUP_DIR.joinpath("{}{}".format(date.today(), ".db")))
-            await log.ainfo("{}".format(FILE_SAVED), file=new_backup_db)
-        except FileNotFoundError:
-            await log.aerror("{}".format(COPY_FILE_ERROR), file=str(db_to_backup))
-        except FileExistsError:
-            await log.aerror("{}".format(FILE_EXISTS_ERROR), file=str(db_to_backup))
-        if self.db_path.exists():
-            Path(self.db_path).unlink()  # delete duplicate tech_accident_db_local.db
-            await log.ainfo("{}{}".format(settings.DATABASE_NAME, DELETED_OK), file=self.db_path)
-        total_db_files = await self.get_list_of_names_in_dir(folder)
-        if len(total_db_files) >= settings.MAX_DB_BACKUP_FILES:
-            old_file_to_remove = "{}{}".format(min(total_db_files)[0], ".db")
-            Path(BACKUP_DIR.joinpath(old_file_to_remove)).unlink()  # delete the oldest backup
-            await log.ainfo("{}{}".format(min(total_db_files)[0], DELETED_OK), old_file_to_remove=old_file_to_remove)
+            row_counts = await asyncio.to_thread(rebuild_database, point, restored, folder)
+            revision_before = get_revision(restored)
+            if revision_before is not None:
+                await asyncio.to_thread(upgrade_database, restored)
+            revision_after = get_revision(restored)
+            await asyncio.to_thread(bump_data_versions, restored)
+            if target == self.db_path and target.exists():
+                await self.make_copy_db(folder)
+            if target.exists():
+                await asyncio.to_thread(load_database, restored, target)
+            else:
+                for suffix in SQLITE_SIDE_FILES:  # a stale journal of a removed db must not be applied to the new one
+                    target.with_name(target.name + suffix).unlink(missing_ok=True)
+                os.replace(restored, target)
+        finally:
+            restored.unlink(missing_ok=True)
+        if target == self.db_path:
+            await engine.dispose()
+        report = DBRestoreReport(
+            restore_point=point.created_at,
+            files=[point.file] if point.base is None else [point.base, point.file],
+            target=str(target),
+            size_bytes=target.stat().st_size,
+            row_counts=row_counts,
+            revision_before=revision_before,
+            revision_after=revision_after,
+            duration_sec=round(time.perf_counter() - started, 3),
+        )
+        await log.ainfo("{}".format(DB_RESTORED), **report.model_dump())
+        return report
 
     async def run_db_backup(self,) -> None:
         """Запускает периодический процесс создания копии БД."""
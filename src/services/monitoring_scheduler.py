@@ -0,0 +1,70 @@
+"""src/services/monitoring_scheduler.py"""
+import asyncio
+import random
+from collections.abc import Sequence
+from typing import Generator
+
+import structlog
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.constants import MONITORING_STARTED, MONITORING_TARGETS_NOT_UNIQUE
+from src.api.schemas import MonitoringTarget
+from src.core.db.db import get_session
+from src.services.connection_probe import ConnectionProbe
+from src.services.outage_detector import OutageDetector
+from src.services.register_connection_errors import (
+    ConnectionErrorService, get_internet_access_target)
+from src.settings import settings
+
+log = structlog.get_logger() if settings.FILE_NAME_IN_LOG is False else structlog.get_logger().bind(file_name=__file__)
+
+
+def get_monitoring_targets() -> list[MonitoringTarget]:
+    """Цели мониторинга из settings.MONITORING_TARGETS (json); если список пуст - только доступ к интернет."""
+    targets = TypeAdapter(list[MonitoringTarget]).validate_json(settings.MONITORING_TARGETS)
+    return targets or [get_internet_access_target()]
+
+
+class MonitoringScheduler:
+    """
+    Планировщик мониторинга: у каждой цели свой цикл проверок со своим интервалом, разбросом и таймаутом,
+    свой детектор простоев и свой тех-процесс / источник угроз в записываемых простоях.
+    Проверки всех целей идут через один пул соединений, одновременно - не больше concurrency проверок.
+    """
+
+    def __init__(
+            self,
+            targets: Sequence[MonitoringTarget] | None = None,
+            sessionmaker: Generator[AsyncSession, None, None] = get_session,
+            probe: ConnectionProbe | None = None,
+            concurrency: int = settings.MONITORING_CONCURRENCY,
+    ) -> None:
+        self._targets = get_monitoring_targets() if targets is None else list(targets)
+        if len({target.name for target in self._targets}) != len(self._targets):
+            raise ValueError(MONITORING_TARGETS_NOT_UNIQUE)
+        self._probe = ConnectionProbe() if probe is None else probe
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.services = {
+            target.name: ConnectionErrorService(sessionmaker, self._probe, target) for target in self._targets
+        }
+        self.detectors = {target.name: OutageDetector(interval=target.interval) for target in self._targets}
+
+    async def probe_target(self, name: str) -> None:
+        """Одна проверка цели: ждет свободного места под семафором, чтобы проверки не копились без ограничений."""
+        async with self._semaphore:
+            await self.services[name].probe_and_register(self.detectors[name])
+
+    async def run_target(self, name: str) -> None:
+        """Цикл проверок одной цели: пауза задается детектором простоев, разброс - jitter цели."""
+        jitter = self.services[name].target.jitter
+        while True:
+            await asyncio.sleep(self.detectors[name].delay + random.uniform(0, jitter))
+            await self.probe_target(name)
+
+    async def run(self) -> None:
+        """Запускает циклы проверок всех целей; при остановке закрывает пул соединений."""
+        await log.ainfo(MONITORING_STARTED, targets=[target.name for target in self._targets])
+        try:
+            await asyncio.gather(*(self.run_target(name) for name in self.services))
+        finally:
+            await self._probe.aclose()
@@ -0,0 +1,85 @@
+"""src/services/outage_detector.py"""
+import math
+from datetime import datetime
+
+from src.core.enums import OutageState
+from src.settings import settings
+
+
+class OutageDetector:
+    """
+    Конечный автомат детектора простоев: UP -> SUSPECT -> DOWN -> RECOVERING -> UP.
+    Единичный сбой (SUSPECT) или единичный ответ во время простоя (RECOVERING) не меняют вердикт,
+    пока не наберется порог подряд идущих проверок. Хранит только счетчики и две отметки времени:
+    память не зависит от длительности простоя.
+    """
+
+    def __init__(
+            self,
+            interval: float = settings.SLEEP_TEST_CONNECTION,
+            down_threshold: int = settings.OUTAGE_DOWN_THRESHOLD,
+            up_threshold: int = settings.OUTAGE_UP_THRESHOLD,
+            backoff_max: float = settings.PROBE_BACKOFF_MAX,
+    ) -> None:
+        self.interval = interval
+        self.down_threshold = max(down_threshold, 1)
+        self.up_threshold = max(up_threshold, 1)
+        self.backoff_max = max(backoff_max, interval)
+        # doublings until backoff_max is reached: the exponent stays small however long the outage lasts
+        self.backoff_exponent = math.ceil(math.log2(self.backoff_max / interval)) if interval > 0 else 0
+        self.state = OutageState.UP
+        self.failures = 0  # failed probes in a row
+        self.successes = 0  # successful probes in a row
+        self.outage_start: datetime | None = None  # the first failed probe of the outage
+        self.recovered_at: datetime | None = None  # the first successful probe after the outage
+
+    @property
+    def delay(self) -> float:
+        """Пауза до следующей проверки: в простое удваивается с каждой неудачей (до backoff_max)."""
+        if self.state != OutageState.DOWN:
+            return self.interval
+        exponent = min(self.failures - self.down_threshold, self.backoff_exponent)
+        return min(self.interval * 2 ** exponent, self.backoff_max)
+
+    def register(self, is_up: bool, probed_at: datetime) -> tuple[datetime, datetime] | None:
+        """
+        Учитывает результат проверки и переводит автомат в следующее состояние.
+        Возвращает (начало, окончание) простоя ровно один раз - при переходе RECOVERING -> UP.
+        """
+        if is_up:
+            return self._register_success(probed_at)
+        self._register_failure(probed_at)
+        return None
+
+    def _register_failure(self, probed_at: datetime) -> None:
+        self.failures += 1
+        self.successes = 0
+        self.recovered_at = None
+        if self.state == OutageState.UP:
+            self.state = OutageState.SUSPECT
+            self.outage_start = probed_at
+        elif self.state == OutageState.RECOVERING:  # flapping: the outage goes on
+            self.state = OutageState.DOWN
+        if self.state == OutageState.SUSPECT and self.failures >= self.down_threshold:
+            self.state = OutageState.DOWN
+
+    def _register_success(self, probed_at: datetime) -> tuple[datetime, datetime] | None:
+        self.successes += 1
+        if self.state in (OutageState.UP, OutageState.SUSPECT):  # a false alarm is not an outage
+            self._reset()
+            return None
+        if self.state == OutageState.DOWN:
+            self.state = OutageState.RECOVERING
+            self.recovered_at = probed_at
+        if self.successes < self.up_threshold:
+            return None
+        outage = (self.outage_start, self.recovered_at)
+        self._reset()
+        return outage
+
+    def _reset(self) -> None:
+        self.state = OutageState.UP
+        self.failures = 0
+        self.successes = 0
+        self.outage_start = None
+        self.recovered_at = None
@@ -1,65 +1,75 @@
 """src/services/register_connection_errors.py"""
 import asyncio
 import contextlib
+import random
 from datetime import datetime, timedelta
 from typing import Generator
 
-import requests
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.api.constants import (FAILED_GET_URL, FIRST_COUNTER, INFO_CONNECTIONS,
-                               INTERNET_ERROR, MEASURES, ROUTER_ERROR,
-                               SUPPOSE_OK, SUSPENSION_CREATED,
-                               SUSPENSION_DB_LOADED, TIME_COUNTER, TIME_INFO,
-                               TZINFO, URL_CONNECTION_ERROR)
+from src.api.constants import (INFO_CONNECTIONS, INTERNET_ACCESS_TARGET,
+                               LATENCY_PERCENTILES, OUTAGE_STATE_CHANGED,
+                               ROUTER_ERROR, SUSPENSION_CREATED,
+                               SUSPENSION_DB_LOADED, TIME_INFO, TZINFO,
+                               URL_CONNECTION_ERROR)
+from src.api.schemas import MonitoringTarget
 from src.core.db.db import get_session
 from src.core.db.models import Suspension
 from src.core.db.repository.suspension import SuspensionRepository
+from src.services.connection_probe import ConnectionProbe
+from src.services.outage_detector import OutageDetector
 from src.settings import settings
 
 log = structlog.get_logger() if settings.FILE_NAME_IN_LOG is False else structlog.get_logger().bind(file_name=__file__)
 
 
+def get_internet_access_target() -> MonitoringTarget:
+    """Цель мониторинга доступа к интернет: CONNECTION_TEST_URL_* и тех-процесс INTERNET_ACCESS_TECH_PROCESS."""
+    return MonitoringTarget(
+        name=INTERNET_ACCESS_TARGET,
+        urls=[settings.CONNECTION_TEST_URL_BASE, settings.CONNECTION_TEST_URL_2],
+        tech_process=str(settings.INTERNET_ACCESS_TECH_PROCESS),
+        risk_accident=ROUTER_ERROR,
+    )
+
+
 class ConnectionErrorService:
-    """Сервис для автоматической регистрации случаев простоя."""
-    def __init__(self, sessionmaker: Generator[AsyncSession, None, None] = get_session) -> None:
+    """Сервис для автоматической регистрации случаев простоя цели мониторинга (по умолчанию - доступ к интернет)."""
+    def __init__(
+            self,
+            sessionmaker: Generator[AsyncSession, None, None] = get_session,
+            probe: ConnectionProbe | None = None,
+            target: MonitoringTarget | None = None,
+    ) -> None:
         self._sessionmaker = contextlib.asynccontextmanager(sessionmaker)
+        self._probe = ConnectionProbe() if probe is None else probe
+        self.target = get_internet_access_target() if target is None else target
+        now = datetime.now(TZINFO).replace(tzinfo=None)  # timestamp without time zone: asyncpg rejects aware values
         self.suspension_example = {
-            "suspension_start": datetime.now(TZINFO) - timedelta(minutes=5),
-            "suspension_finish": datetime.now(TZINFO),
-            "risk_accident": ROUTER_ERROR,
-            "tech_process": settings.INTERNET_ACCESS_TECH_PROCESS,
-            "description": INTERNET_ERROR,
-            "implementing_measures": MEASURES,
+            "suspension_start": now - timedelta(minutes=5),
+            "suspension_finish": now,
+            "risk_accident": self.target.risk_accident.value,
+            "tech_process": int(self.target.tech_process.value),
+            "description": self.target.description,
+            "implementing_measures": self.target.implementing_measures,
             "user_id": settings.BOT_USER,  # todo ПОД "user_id" = 2 скрывается id бота фиксации простоев - хрупко!
         }
 
-    async def check_connection(
-            self,
-            CONNECTION_TEST_URL_BASE: str = settings.CONNECTION_TEST_URL_BASE,
-            CONNECTION_TEST_URL_2: str = settings.CONNECTION_TEST_URL_2
-    ) -> dict[str, int | str]:
-        """ Проверяет наличие доступа к интернет."""
-        try:
-            status_code_base_url = requests.get(CONNECTION_TEST_URL_BASE).status_code
-        # если ошибка соединения с базовым сайтом, то тест сайта Яндекс
-        # если и сайта Яндекс не доступен - в run_check_connection() вызывается except!
-        except requests.exceptions.ConnectionError:
-            await log.aerror(FAILED_GET_URL, url=CONNECTION_TEST_URL_BASE)
-            status_code_url_ya = requests.get(CONNECTION_TEST_URL_2).status_code
-            info_connections = {
-                CONNECTION_TEST_URL_BASE: URL_CONNECTION_ERROR,
-                CONNECTION_TEST_URL_2: status_code_url_ya,
-                TIME_INFO: datetime.now(TZINFO).isoformat(timespec='seconds')
-            }
-            await log.ainfo(INFO_CONNECTIONS, info_connections=info_connections)
-            return info_connections
+    async def check_connection(self, *urls: str) -> dict[str, int | str | dict]:
+        """
+        Проверяет доступность цели мониторинга: url опрашиваются параллельно и без блокировки event loop.
+        Если не доступен ни один url - бросает ConnectionError.
+        """
+        urls = urls or self.target.urls
+        results = await self._probe.probe_all(urls, self.target.timeout)
         info_connections = {
-            CONNECTION_TEST_URL_BASE: status_code_base_url,
-            CONNECTION_TEST_URL_2: SUPPOSE_OK,
-            TIME_INFO: datetime.now(TZINFO).isoformat(timespec='seconds')
+            result.url: result.status_code if result.is_up else URL_CONNECTION_ERROR for result in results
         }
-        await log.ainfo(INFO_CONNECTIONS, info_connections=info_connections)
+        info_connections[LATENCY_PERCENTILES] = {result.url: result.percentiles_ms for result in results}
+        info_connections[TIME_INFO] = datetime.now(TZINFO).isoformat(timespec='seconds')
+        await log.ainfo(INFO_CONNECTIONS, target=self.target.name, info_connections=info_connections)
+        if not any(result.is_up for result in results):
+            raise ConnectionError(info_connections)
         return info_connections
 
     async def run_create_suspension(self, suspension_object: dict | None) -> None:
@@ -72,44 +82,48 @@ class ConnectionErrorService:
             await suspension_repository.create(suspension)
             await log.ainfo(SUSPENSION_DB_LOADED, suspension=suspension)
 
-    async def run_check_connection(
-            self,
-            time_counter: int = settings.SLEEP_TEST_CONNECTION,
-            suspension_start: bool | datetime = None,
-    ) -> None:
-        """ Запускает периодический процесс тестирование доступа к интернет и сохранение в БД простоев."""
+    async def probe_and_register(self, detector: OutageDetector) -> None:
+        """Одна проверка доступа к интернет: переводит детектор простоев и записывает в БД завершившийся простой."""
+        previous_state = detector.state
         try:
-            while True:
-                await asyncio.sleep(settings.SLEEP_TEST_CONNECTION)
-                await self.check_connection(settings.CONNECTION_TEST_URL_BASE, settings.CONNECTION_TEST_URL_2)
-                if time_counter != settings.SLEEP_TEST_CONNECTION:  # Нач. счетчик простоя = интервалу теста соединения
-                    await log.ainfo(
-                        SUSPENSION_CREATED,
-                        start=str(suspension_start),
-                        finish=datetime.now(TZINFO).isoformat(timespec='seconds'),
-                        counter=time_counter
-                    )
-                    suspension = self.suspension_example  # фиксируется время простоя и заносится в БД
-                    suspension["suspension_start"] = suspension_start
-                    suspension["suspension_finish"] = datetime.now(TZINFO)
-                    await self.run_create_suspension(suspension)
-                    time_counter = settings.SLEEP_TEST_CONNECTION  # обнуляем счетчик, если соединение восстановилось
-                    suspension_start = None  # обнуляем счетчик времени старта простоя
-        except requests.exceptions.ConnectionError:  # если ошибка соединения
-            await log.aerror(FAILED_GET_URL, url=settings.CONNECTION_TEST_URL_2)
-            if suspension_start is not None:  # если не первый старт фиксации простоя
-                time_counter += settings.SLEEP_TEST_CONNECTION
-                suspension_start = suspension_start
-                await log.ainfo(
-                    TIME_COUNTER,
-                    counter=time_counter,
-                    err=ConnectionError,
-                    url=settings.CONNECTION_TEST_URL_2
-                )
-                await asyncio.sleep(settings.SLEEP_TEST_CONNECTION)  # задаем задержку проверки соединения
-                await self.run_check_connection(time_counter, suspension_start)  # рекурсивно проверяем соединение
-            suspension_start = datetime.now(TZINFO)
-            time_counter += settings.SLEEP_TEST_CONNECTION
-            await log.ainfo(FIRST_COUNTER, counter=time_counter, suspension_start=str(suspension_start))
-            await asyncio.sleep(settings.SLEEP_TEST_CONNECTION)
-            await self.run_check_connection(time_counter, suspension_start)
+            await self.check_connection()
+            is_up = True
+        except ConnectionError:  # если не доступен ни один url
+            is_up = False
+        outage = detector.register(is_up, datetime.now(TZINFO))
+        if detector.state != previous_state:
+            await log.ainfo(
+                OUTAGE_STATE_CHANGED,
+                target=self.target.name,
+                previous_state=previous_state,
+                state=detector.state,
+                failures=detector.failures,
+                outage_start=str(detector.outage_start),
+            )
+        if outage is None:
+            return
+        suspension_start, suspension_finish = outage
+        await log.ainfo(
+            SUSPENSION_CREATED,
+            target=self.target.name,
+            tech_process=self.target.tech_process.value,
+            start=str(suspension_start),
+            finish=str(suspension_finish),
+        )
+        await self.run_create_suspension(  # a new dict for every outage: suspension_example is not mutated
+            {
+                **self.suspension_example,
+                "suspension_start": suspension_start.replace(tzinfo=None),  # local time as in suspension_example
+                "suspension_finish": suspension_finish.replace(tzinfo=None),
+            }
+        )
+
+    async def run_check_connection(self, detector: OutageDetector | None = None) -> None:
+        """
+        Запускает периодический процесс проверки цели мониторинга и сохранение в БД простоев:
+        цикл с паузой, заданной детектором простоев (в простое пауза растет экспоненциально), и разбросом jitter.
+        """
+        detector = OutageDetector(interval=self.target.interval) if detector is None else detector
+        while True:
+            await asyncio.sleep(detector.delay + random.uniform(0, self.target.jitter))
+            await self.probe_and_register(detector)
@@ -6,6 +6,7 @@ from functools import lru_cache
 from pathlib import Path
 
 from pydantic_settings import BaseSettings
+from sqlalchemy import URL
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -24,6 +25,8 @@ def get_env_path() -> Path | None:
 
 class Settings(BaseSettings):
     """Настройки проекта."""
+    ANALYTICS_CACHE_SIZE: int = 256  # LRU entries of analytics results per process (0 - off)
+    ANALYTICS_CACHE_TTL: int = 60  # seconds an analytics result stays in the cache (0 - off)
     ANALYTICS_INTERVAL: int = 30  # time shift (in days) to display total suspensions
     APP_TITLE: str = "Учет фактов простоя ИС"
     APP_DESCRIPTION: str = "Журнал учета фактов простоя информационной системы УК ПИФ"
@@ -33,29 +36,55 @@ class Settings(BaseSettings):
     DEFAULT_TASK_DEADLINE: int = 7  # typical task deadline in days
     DEBUG: bool = False
     FILES_DOWNLOAD_DIR: str = "uploaded_files"
+    FILES_STORE_DIR: str = ".store"  # content-addressed storage of files content inside FILES_DOWNLOAD_DIR
     FILE_TYPE_DOWNLOAD: str | list = ("doc", "docx", "xls", "xlsx", "img", "png", "txt", "pdf", "jpeg")
+    ZIP_STORED_FILE_TYPES: str | list = ("docx", "xlsx", "png", "pdf", "jpeg", "jpg")  # already compressed: no deflate
     MAX_FILE_SIZE_DOWNLOAD: int = 10000  # Max available file size in kb
+    FILE_UPLOAD_CHUNK_SIZE: int = 2**20  # Chunk size in bytes for streaming uploads to disk and zip downloads
+    PAGE_SIZE_MAX: int = 1000  # max rows per page for cursor pagination of list endpoints
     ROOT_PATH: str = "/api"
     SECRET_KEY: str = "secret_key"
     SUSPENSION_DISPLAY_TIME: int = 60 * 24  # in mins as part of a day
     TOKEN_AUTH_LIFETIME_SEC: int = 60 * 60 * 24 * 5
+    USER_CACHE_TTL: int = 5 * 60  # seconds a user stays in the in-process user directory (0 - off)
 
     # Database connection preferences (.env in priority - check it before!)
     DATABASE_URL: str = "sqlite+aiosqlite:///./tech_accident_db_local.db"
     DATABASE_URL_TEST: str = "sqlite+aiosqlite:///./test_db.db"
     DATABASE_NAME: str = "tech_accident_db_local.db"
     DB_BACKUP: bool = True
+    DB_BACKUP_COMPRESS_LEVEL: int = 6  # gzip level of the backup files
     DB_BACKUP_DIR: str = "db_backups"
+    DB_BACKUP_FULL_INTERVAL: int = 60 * 60 * 24 * 7  # seconds: backups in between are increments to the last full
+    DB_BACKUP_KEEP_DAILY: int = 7  # retention: the latest backup of each of the last days
+    DB_BACKUP_KEEP_MONTHLY: int = 12  # retention: the latest backup of each of the last months
+    DB_BACKUP_KEEP_WEEKLY: int = 4  # retention: the latest backup of each of the last weeks
+    DB_BACKUP_PAGES: int = 1024  # pages copied per step of the online backup: writers get the db between steps
+    DB_BACKUP_STEP_SLEEP: float = 0.01  # seconds between the steps of the online backup
     ECHO: bool = False  # echo=True display SQL-queries in console for main DB
     ECHO_TEST_DB: bool = False  # echo=True display SQL-queries in console for test DB
-    MAX_DB_BACKUP_FILES: int = 50
+    MAX_DB_BACKUP_FILES: int = 50  # retention cap of the restore points (their full bases are kept on top)
     SLEEP_DB_BACKUP: int = 60 * 60 * 24
     TIMEZONE_OFFSET: int = 5
-    # POSTGRES_DB: str
-    # POSTGRES_USER: str
-    # POSTGRES_PASSWORD: str
-    # DB_HOST: str = "localhost"
-    # DB_PORT: int = 5432
+    POSTGRES_DB: str = ""  # if set: Postgres (asyncpg) database_url instead of DATABASE_URL
+    POSTGRES_USER: str = "postgres"
+    POSTGRES_PASSWORD: str = ""
+    DB_HOST: str = "localhost"
+    DB_PORT: int = 5432
+    DB_MAX_OVERFLOW: int = 20  # connections over DB_POOL_SIZE at peak load (Postgres)
+    DB_POOL_PRE_PING: bool = True  # checks a connection before use: survives restarts of the db server
+    DB_POOL_RECYCLE: int = 30 * 60  # seconds: reconnects before the server or a proxy drops idle connections
+    DB_POOL_SIZE: int = 10  # connections kept open by every process (Postgres)
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection of the pool
+    DB_STATEMENT_CACHE_SIZE: int = 500  # asyncpg prepared statements per connection (0 behind pgbouncer)
+    SQLITE_BUSY_TIMEOUT: int = 5000  # ms a connection waits for a lock before "database is locked"
+    SQLITE_CACHE_SIZE: int = -64000  # page cache per connection: negative - KiB (64 MB), positive - pages
+    SQLITE_JOURNAL_MODE: str = "WAL"  # readers do not block the writer and the writer does not block readers
+    SQLITE_MMAP_SIZE: int = 256 * 2**20  # bytes of the db file read through memory mapping (0 - off)
+    SQLITE_PRAGMAS: bool = True  # applies the SQLITE_* profile to every new SQLite connection
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # with WAL: fsync on checkpoints only, durable against app crashes
+    SQLITE_TEMP_STORE: str = "MEMORY"  # temporary tables and indexes of sorts in memory
+    TEST_WITH_POSTGRES: bool = True  # tests on a throwaway Postgres if initdb and pg_ctl are on PATH, else SQLite
 
     # Logging preferences (.env in priority - check it before!)
     FILE_NAME_IN_LOG: bool = False  # If true: structlog.get_logger().bind(file_name=__file__)
@@ -70,6 +99,18 @@ class Settings(BaseSettings):
     CONNECTION_TEST_URL_BASE: str = "https://www.agidel-am.ru"
     CONNECTION_TEST_URL_2: str = "https://www.ya.ru"
     SLEEP_TEST_CONNECTION: int = 20
+    PROBE_CONNECT_TIMEOUT: float = 3.0  # seconds to establish a connection: a dead router fails fast
+    PROBE_READ_TIMEOUT: float = 5.0
+    PROBE_MAX_CONNECTIONS: int = 20  # connection pool of the probe client (keep-alive between probes)
+    PROBE_LATENCY_WINDOW: int = 100  # latest probes per url used for latency percentiles
+    PROBE_LATENCY_PERCENTILES: tuple[int, ...] | list = (50, 90, 99)
+    OUTAGE_DOWN_THRESHOLD: int = 3  # failed probes in a row: SUSPECT -> DOWN (a single failure is not an outage)
+    OUTAGE_UP_THRESHOLD: int = 2  # successful probes in a row: RECOVERING -> UP (the outage is written)
+    PROBE_BACKOFF_MAX: int = 300  # seconds: the probe interval is doubled while DOWN up to this limit
+    MONITORING_CONCURRENCY: int = 10  # probes running at the same time for all targets
+    MONITORING_TARGETS: str = "[]"  # json list of MonitoringTarget; empty: the internet access target below
+    WORKER_LEADER_RETRY: int = 30  # seconds between tries of a standby worker to become the leader
+    WORKER_LOCK_FILE: str | Path = BASE_DIR.joinpath("worker.lock")  # only its holder runs monitors and backups
 
     # Download and delete files form ENUM-class preferences (.env in priority - check it before!)
     CHOICE_DOWNLOAD_FILES: str = '{"JSON": "json", "FILES": "files"}'
@@ -102,13 +143,17 @@ class Settings(BaseSettings):
 
     @property
     def database_url(self) -> str:
-        """Получить ссылку для подключения к DB."""
-        # return (
-        #     "postgresql+asyncpg://"
-        #     f"{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
-        #     f"@{self.DB_HOST}:{self.DB_PORT}/{self.POSTGRES_DB}"
-        # )
-        return Settings.DATABASE_URL  # "sqlite+aiosqlite:///./tech_accident_db_local.db"
+        """Получить ссылку для подключения к DB: Postgres (asyncpg), если задан POSTGRES_DB, иначе DATABASE_URL."""
+        if not self.POSTGRES_DB:
+            return self.DATABASE_URL  # "sqlite+aiosqlite:///./tech_accident_db_local.db"
+        return URL.create(
+            "postgresql+asyncpg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.DB_HOST,
+            port=self.DB_PORT,
+            database=self.POSTGRES_DB,
+        ).render_as_string(hide_password=False)
 
 
 @lru_cache()
@@ -0,0 +1,97 @@
+"""src/worker.py
+
+Фоновый процесс мониторинга и бэкапов БД: python -m src.worker
+Запускается отдельно от API (API-процессов может быть сколько угодно): лидер выбирается файловой блокировкой,
+поэтому из нескольких запущенных воркеров работает ровно один, остальные ждут в резерве
+и подхватывают работу, если процесс лидера завершится (ОС снимает блокировку вместе с процессом).
+"""
+import asyncio
+import os
+from pathlib import Path
+
+import structlog
+from sqlalchemy import make_url
+from src.api.constants import WORKER_LEADER, WORKER_STANDBY, WORKER_STOPPED
+from src.core.logging.setup import setup_logging
+from src.services.db_backup import DBBackupService
+from src.services.monitoring_scheduler import MonitoringScheduler
+from src.settings import settings
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+log = structlog.get_logger() if settings.FILE_NAME_IN_LOG is False else structlog.get_logger().bind(file_name=__file__)
+
+
+class LeaderLock:
+    """Неблокирующая эксклюзивная блокировка файла: кто ее захватил - тот лидер, пока жив его процесс."""
+
+    def __init__(self, path: str | Path = settings.WORKER_LOCK_FILE) -> None:
+        self.path = Path(path)
+        self._file = None
+
+    @property
+    def is_acquired(self) -> bool:
+        return self._file is not None
+
+    def try_acquire(self) -> bool:
+        """Пытается захватить блокировку, не дожидаясь ее освобождения; в файл пишется pid лидера."""
+        if self.is_acquired:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def release(self) -> None:
+        """Снимает блокировку: один из воркеров в резерве становится лидером."""
+        if not self.is_acquired:
+            return
+        if os.name == "nt":
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+async def run_worker(lock: LeaderLock | None = None) -> None:
+    """Ждет лидерства и запускает планировщик мониторинга и (если включен) бэкап БД."""
+    lock = LeaderLock() if lock is None else lock
+    while not lock.try_acquire():
+        await log.ainfo(WORKER_STANDBY, lock_file=str(lock.path), pid=os.getpid())
+        await asyncio.sleep(settings.WORKER_LEADER_RETRY)
+    await log.ainfo(WORKER_LEADER, lock_file=str(lock.path), pid=os.getpid())
+    jobs = [MonitoringScheduler().run()]
+    if settings.DB_BACKUP and make_url(settings.database_url).get_backend_name() == "sqlite":  # Postgres: pg_dump
+        jobs.append(DBBackupService().run_db_backup())
+    try:
+        await asyncio.gather(*jobs)
+    finally:
+        lock.release()
+        await log.ainfo(WORKER_STOPPED, pid=os.getpid())
+
+
+def start_worker():
+    setup_logging()
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    start_worker()
@@ -1,9 +1,14 @@
 """Конфигурационный файл для тестов: tests/conftest.py"""
 
 import asyncio
+import contextlib
 import json
 import os
+import shutil
+import socket
+import subprocess
 import sys
+import tempfile
 from pathlib import Path
 from typing import Any, Generator, Sequence, TypeVar
 
@@ -12,7 +17,7 @@ import structlog
 from fastapi import FastAPI
 from httpx import AsyncClient
 from passlib.context import CryptContext
-from sqlalchemy import delete, select
+from sqlalchemy import delete, event, make_url, select
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -20,8 +25,10 @@ from sqlalchemy.orm import sessionmaker
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.api.constants import *
 from src.api.router import api_router
-from src.core.db.db import get_session
+from src.core.db.db import add_sqlite_pragmas, get_engine_options, get_session
+from src.core.db.analytics_cache import analytics_cache
 from src.core.db.models import Base, FileAttached, Suspension, Task, User
+from src.core.db.user_cache import user_cache
 from src.core.logging.setup import setup_logging
 from src.settings import settings
 
@@ -31,6 +38,8 @@ log = structlog.get_logger() if settings.FILE_NAME_IN_LOG is False else structlo
 DatabaseModel = TypeVar("DatabaseModel")
 CONFTEST_ROUTES_DIR = Path(__file__).resolve().parent
 TEST_ROUTES_DIR = CONFTEST_ROUTES_DIR.joinpath("test_routes")
+FILES_STORE_DIR = CONFTEST_ROUTES_DIR.parent.joinpath(settings.FILES_DOWNLOAD_DIR, settings.FILES_STORE_DIR)
+POSTGRES_TEST_FALLBACK = "Throwaway_postgres_is_not_started: tests run on SQLite."
 
 
 @pytest.fixture(scope='session')
@@ -39,7 +48,69 @@ def anyio_backend():
     return 'asyncio'
 
 
-engine = create_async_engine(settings.DATABASE_URL_TEST, echo=settings.ECHO_TEST_DB)
+class ThrowawayPostgres:
+    """
+    Временный кластер Postgres для тестов без docker-compose: initdb и pg_ctl во временном каталоге
+    на свободном порту, без fsync; удаляется вместе с каталогом после тестов.
+    """
+
+    def __init__(self) -> None:
+        self.directory: Path | None = None
+
+    def start(self) -> str:
+        self.directory = Path(tempfile.mkdtemp(prefix="tech_accidents_postgres_"))
+        data = self.directory.joinpath("data")
+        with socket.socket() as free_socket:
+            free_socket.bind(("127.0.0.1", 0))
+            port = free_socket.getsockname()[1]
+        subprocess.run(
+            ["initdb", "-D", str(data), "-U", "postgres", "--auth=trust", "--encoding=UTF8", "--no-sync"],
+            check=True, capture_output=True,
+        )
+        subprocess.run(
+            ["pg_ctl", "-D", str(data), "-l", str(self.directory.joinpath("postgres.log")), "-w", "start",
+             "-o", f"-p {port} -k {self.directory} -c listen_addresses=127.0.0.1 -c fsync=off"],
+            check=True, capture_output=True,
+        )
+        return f"postgresql+asyncpg://postgres@127.0.0.1:{port}/postgres"
+
+    def stop(self) -> None:
+        if self.directory is None:
+            return
+        subprocess.run(
+            ["pg_ctl", "-D", str(self.directory.joinpath("data")), "-m", "immediate", "stop"], capture_output=True
+        )
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = None
+
+
+def get_test_database_url(postgres: ThrowawayPostgres) -> str:
+    """
+    БД для тестов: DATABASE_URL_TEST, если это не SQLite (свой сервер); иначе временный Postgres,
+    если он доступен (TEST_WITH_POSTGRES, initdb и pg_ctl в PATH, запуск не от root), иначе SQLite DATABASE_URL_TEST.
+    """
+    if make_url(settings.DATABASE_URL_TEST).get_backend_name() != "sqlite" or not settings.TEST_WITH_POSTGRES:
+        return settings.DATABASE_URL_TEST
+    if shutil.which("initdb") is None or shutil.which("pg_ctl") is None:
+        return settings.DATABASE_URL_TEST
+    try:
+        return postgres.start()
+    except (OSError, subprocess.CalledProcessError) as error:  # e.g. initdb refuses to run as root
+        log.warning(POSTGRES_TEST_FALLBACK, error=str(getattr(error, "stderr", error)))
+        postgres.stop()
+        return settings.DATABASE_URL_TEST
+
+
+throwaway_postgres = ThrowawayPostgres()
+TEST_DATABASE_URL = get_test_database_url(throwaway_postgres)
+engine = add_sqlite_pragmas(
+    create_async_engine(TEST_DATABASE_URL, echo=settings.ECHO_TEST_DB, **get_engine_options(TEST_DATABASE_URL))
+)
+
+
+def pytest_sessionfinish(session, exitstatus) -> None:
+    """Останавливает и удаляет временный Postgres после всех тестов."""
+    throwaway_postgres.stop()
 
 
 @pytest.fixture(scope='session')
@@ -63,6 +134,7 @@ async def async_db_engine():
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)  # drop all database every time when test complete
+    delete_unlinked_blobs()
 
 
 @pytest.fixture(scope='function')
@@ -121,6 +193,16 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    """
+    Тестовые пользователи и простои создаются и удаляются в обход UserManager и сервисов:
+    справочник пользователей и кэш аналитики - пустые.
+    """
+    user_cache.invalidate()
+    analytics_cache.clear()
+
+
 @pytest.fixture
 async def super_user_orm(async_db: AsyncSession) -> User:
     """Create super_user in database."""
@@ -230,6 +312,45 @@ async def tasks_orm(async_db: AsyncSession, user_from_settings: User, user_orm:
     return tasks_list
 
 
+@pytest.fixture
+async def stub_http_server() -> Generator[str, None, None]:
+    """
+    Локальный HTTP-сервер заглушка для проверок доступа к url: отвечает 200 (keep-alive),
+    на путь /hang отвечает через 1 секунду (для проверки таймаута чтения).
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                if b" /hang " in request.split(b"\r\n")[0]:
+                    await asyncio.sleep(1)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    async with server:
+        yield "http://127.0.0.1:{}".format(server.sockets[0].getsockname()[1])
+
+
+@contextlib.contextmanager
+def count_queries(async_db_engine=engine) -> Generator[list[str], None, None]:
+    """Собирает список SQL-запросов, выполненных движком тестовой БД внутри контекста."""
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_db_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_db_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+
 async def remove_all(async_db, instance: DatabaseModel, instances: Sequence[int] | None = None) -> Sequence[int]:
     """Remove data in database and return the result in ids."""
     if instances is not None:
@@ -278,6 +399,13 @@ async def delete_files_in_folder(files_to_delete: Sequence[Path]) -> Sequence[Pa
     return files_to_delete
 
 
+def delete_unlinked_blobs() -> None:
+    """Удаляет из хранилища содержимое файлов, на которое не осталось ни одной ссылки в каталоге файлов."""
+    for blob in FILES_STORE_DIR.glob("*/*/*"):
+        if blob.is_file() and blob.stat().st_nlink == 1:
+            blob.unlink()
+
+
 async def create_test_files(test_files: list[str] = ("testfile.txt", "testfile2.txt", "testfile3.txt")) -> None:
     """Создает в каталоге тестовые файлы для загрузки, если их нет."""
     for file_name in test_files:
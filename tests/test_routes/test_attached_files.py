@@ -8,8 +8,11 @@ https://anyio.readthedocs.io/en/stable/testing.html
 
 pytest -k test_unauthorized_tries_file_urls -vs
 pytest -k test_user_post_download_files_url -vs
+pytest -k test_super_user_post_download_files_streamed -vs
+pytest -k test_super_user_post_download_files_deduplicated -vs
 pytest -k test_user_get_files_url -vs
 pytest -k test_user_get_file_id_url -vs
+pytest -k test_user_search_files_url -vs
 
 pytest -k test_super_user_delete_file_id_url -vs
 pytest -k test_super_user_delete_files_unused_url -vs
@@ -19,9 +22,12 @@ pytest -k test_super_user_delete_files_unused_url -vs
 print(f'response_dir: {dir(response)}')
 print(f'RESPONSE__dict__: {response.__dict__}')
 """
+import hashlib
+import io
 import json
 import os
 import sys
+import zipfile
 from pathlib import Path
 import pytest
 import structlog
@@ -189,6 +195,88 @@ async def test_user_post_download_files_url(
     await clean_test_database(async_db, User)
 
 
+async def test_super_user_post_download_files_streamed(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        super_user_orm: User,
+        monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирует потоковую запись загружаемого файла на диск частями и контроль MAX_FILE_SIZE_DOWNLOAD:
+    pytest -k test_super_user_post_download_files_streamed -vs
+
+    scenarios - тестовые сценарии: файл из многих частей записывается без искажений, превышение размера - 403.
+    """
+    test_url = FILES_PATH + DOWNLOAD_FILES  # /api/files/download_files
+    super_user_login = {"username": super_user_orm.email, "password": "testings"}
+    monkeypatch.setattr(settings, "FILE_UPLOAD_CHUNK_SIZE", 1000)
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_DOWNLOAD", 10)  # in kb
+    scenarios = (
+        # content, status, name
+        (bytes(range(256)) * 39, 200, "9984 bytes written by 1000 bytes chunks"),  # 1
+        (b"0" * 10001, 403, "10001 bytes exceed 10 kb"),  # 2
+    )
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=super_user_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        for content, status, name in scenarios:
+            files_in_folder_before = {file.name for file in FILES_DIR.glob('*')}
+            response = await ac.post(test_url, headers=headers, files=(("files", ("streamed.txt", content)),))
+            assert response.status_code == status, f"{name}: {test_url} is not {status}: {response.__dict__}"
+            new_files_in_folder = {file.name for file in FILES_DIR.glob('*')} - files_in_folder_before
+            if status != 200:
+                assert new_files_in_folder == set(), f"{name}: {new_files_in_folder} left in files folder"
+                assert (await async_db.scalars(select(FileAttached))).all() == [], f"{name}: file written in db"
+                continue
+            file_name = response.json().get(FILES_WRITTEN_DB)[0].get(FILE_NAME)
+            assert new_files_in_folder == {file_name}, f"{name}: {new_files_in_folder} not as expected: {file_name}"
+            assert FILES_DIR.joinpath(file_name).read_bytes() == content, f"{name}: file content is corrupted"
+            await clean_test_database(async_db, FileAttached)
+            await delete_files_in_folder([FILES_DIR.joinpath(file_name)])
+            await log.ainfo(f"{name}", file_name=file_name, status=response.status_code)
+    await clean_test_database(async_db, User)
+
+
+async def test_super_user_post_download_files_deduplicated(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        super_user_orm: User,
+) -> None:
+    """
+    Тестирует хранение одинакового содержимого файлов один раз и удаление содержимого по подсчету ссылок:
+    pytest -k test_super_user_post_download_files_deduplicated -vs
+    """
+    test_url = FILES_PATH + DOWNLOAD_FILES  # /api/files/download_files
+    super_user_login = {"username": super_user_orm.email, "password": "testings"}
+    content = b"the same regulation pdf attached to many suspensions"
+    content_hash = hashlib.sha256(content).hexdigest()
+    blob_path = FILES_DIR.joinpath(settings.FILES_STORE_DIR, content_hash[:2], content_hash[2:4], content_hash)
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=super_user_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        response = await ac.post(
+            test_url, headers=headers, files=(("files", ("dedup_a.txt", content)), ("files", ("dedup_b.txt", content)))
+        )
+        assert response.status_code == 200, f"{test_url} is not 200. Response: {response.__dict__}"
+        files_in_db = (await async_db.scalars(select(FileAttached).order_by(FileAttached.id))).all()
+        assert [file.content_hash for file in files_in_db] == [content_hash, content_hash], (
+            f"Content hashes in db: {[file.content_hash for file in files_in_db]} not as expected: {content_hash}"
+        )
+        for file in files_in_db:
+            assert (file.size, file.content_type, file.user_id) == (len(content), "text/plain", super_user_orm.id), (
+                f"{file.name} metadata: {(file.size, file.content_type, file.user_id)} not as expected"
+            )
+            assert FILES_DIR.joinpath(file.name).read_bytes() == content, f"{file.name}: content is corrupted"
+            assert FILES_DIR.joinpath(file.name).samefile(blob_path), f"{file.name} is not a link to {blob_path}"
+        for file, blob_exists in zip(files_in_db, (True, False)):  # the content is removed with the last reference
+            response = await ac.delete(FILES_PATH + MAIN_ROUTE, params={SEARCH_FILES_BY_ID: file.id}, headers=headers)
+            assert response.status_code == 200, f"File {file.id} is not deleted. Response: {response.__dict__}"
+            assert not FILES_DIR.joinpath(file.name).exists(), f"{file.name} in files folder, but shouldn't"
+            assert blob_path.exists() is blob_exists, f"Content of {file.name} exists: {blob_path.exists()}"
+            await log.ainfo("dedup_delete", file=file.name, blob_exists=blob_path.exists())
+    await clean_test_database(async_db, FileAttached, User)
+
+
 async def test_user_get_files_url(
         async_client: AsyncClient,
         async_db: AsyncSession,
@@ -302,6 +390,11 @@ async def test_user_get_files_url(
             )
             for name_value, expected_value, exist_value in match_values:
                 assert expected_value == exist_value, f"{name_value} {exist_value} not as expected: {expected_value}"
+            with zipfile.ZipFile(io.BytesIO(response.content)) as zip_file:  # streamed archive is a valid zip
+                assert zip_file.testzip() is None, f"Corrupted file in archive: {zip_file.testzip()}"
+                assert set(zip_file.namelist()) == set(search_results), (
+                    f"Files in archive: {zip_file.namelist()} not as expected: {search_results}"
+                )
             await log.awarning(
                 f"SCENARIO: _{scenario_number}_ info: {name}",
                 files_in_db=files_in_db,
@@ -459,6 +552,69 @@ async def test_user_get_file_id_url(
     await clean_test_database(async_db, User)
 
 
+async def test_user_search_files_url(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        super_user_orm: User,
+) -> None:
+    """
+    Тестирует полнотекстовый поиск файлов по имени (в т.ч. кириллицей по транслитерированным именам):
+    pytest -k test_user_search_files_url -vs
+
+    scenarios - поисковые запросы и ожидаемые файлы (имена до загрузки).
+    """
+    test_url = FILES_PATH + SEARCH  # /api/files/search
+    super_user_login = {"username": super_user_orm.email, "password": "testings"}
+    test_files = ("Приказ о работе.txt", "Отчет по объекту.txt", "schedule.txt")
+    scenarios = (
+        # search_text, expected_files, name
+        ("приказ", {test_files[0]}, "cyrillic query finds transliterated name"),  # 1
+        ("ПРИКАЗ", {test_files[0]}, "case insensitive query"),  # 2
+        ("работе приказ", {test_files[0]}, "all words in any order"),  # 3
+        ("объект", {test_files[1]}, "prefix of transliterated word with hard sign"),  # 4
+        ("sched", {test_files[2]}, "prefix of latin word"),  # 5
+        ("txt", set(test_files), "all files"),  # 6
+        ("приказ schedule", set(), "no file with both words"),  # 7
+        ("!!!", set(), "query without words finds nothing"),  # 8
+    )
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=super_user_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        response = await ac.post(
+            FILES_PATH + DOWNLOAD_FILES,
+            headers=headers,
+            files=[("files", (file_name, file_name.encode())) for file_name in test_files],
+        )
+        assert response.status_code == 200, f"Files are not uploaded. Response: {response.__dict__}"
+        uploaded = {  # uploaded name -> name before upload
+            file[FILE_NAME]: test_files[number] for number, file in enumerate(response.json()[FILES_WRITTEN_DB])
+        }
+        for search_text, expected_files, name in scenarios:
+            response = await ac.get(test_url, params={SEARCH_TEXT: search_text}, headers=headers)
+            assert response.status_code == 200, f"{name}: {test_url} is not 200. Response: {response.__dict__}"
+            found = {uploaded[file[FILE_NAME]] for file in response.json()}
+            assert found == expected_files, f"{name}: found {found} not as expected: {expected_files}"
+            await log.ainfo(f"{name}", search_text=search_text, found=found)
+        paginated_names = []
+        params = {SEARCH_TEXT: "txt", PAGE_LIMIT: 2}
+        while True:
+            response = await ac.get(test_url, params=params, headers=headers)
+            assert len(response.json()) <= 2, f"Page size {len(response.json())} exceeds 2"
+            paginated_names += [file[FILE_NAME] for file in response.json()]
+            if NEXT_CURSOR not in response.headers:
+                break
+            params = {SEARCH_TEXT: "txt", PAGE_LIMIT: 2, PAGE_CURSOR: response.headers[NEXT_CURSOR]}
+        assert sorted(paginated_names) == sorted(uploaded), f"Pages: {paginated_names} not as expected: {uploaded}"
+        files_in_db = (await async_db.scalars(select(FileAttached))).all()
+        response = await ac.delete(
+            FILES_PATH + MAIN_ROUTE, params={SEARCH_FILES_BY_ID: [file.id for file in files_in_db]}, headers=headers
+        )
+        assert response.status_code == 200, f"Files are not deleted. Response: {response.__dict__}"
+        response = await ac.get(test_url, params={SEARCH_TEXT: "txt"}, headers=headers)
+        assert response.json() == [], f"Deleted files are found: {response.json()}"
+    await clean_test_database(async_db, FileAttached, User)
+
+
 async def test_super_user_delete_file_id_url(
         async_client: AsyncClient,
         async_db: AsyncSession,
@@ -8,9 +8,17 @@ https://anyio.readthedocs.io/en/stable/testing.html
 
 pytest -k test_unauthorized_tries_suspension_urls -vs
 pytest -k test_user_get_suspension_analytics_url -vs
+pytest -k test_user_get_suspension_analytics_summary_only -vs
+pytest -k test_analytics_cache_read_through_and_invalidation -vs
+pytest -k test_daily_rollup_incremental_and_period_totals -vs
+pytest -k test_suspension_duration_expression_dialects -vs
 pytest -k test_user_get_suspension_url -vs
 pytest -k test_user_get_all_suspension_url -vs
 pytest -k test_user_get_my_suspension_url -vs
+pytest -k test_suspension_lists_constant_queries -vs
+pytest -k test_suspension_lists_cursor_pagination -vs
+pytest -k test_suspension_conditional_get -vs
+pytest -k test_user_search_suspensions_url -vs
 pytest -k test_user_post_suspension_form_url -vs
 pytest -k test_user_post_suspension_with_files_form_url -vs
 pytest -k test_user_patch_suspension_url -vs
@@ -31,15 +39,21 @@ from pathlib import Path
 import pytest
 import structlog
 from httpx import AsyncClient
-from sqlalchemy import select
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from src.api.constants import *
-from src.core.db.models import FileAttached, Suspension, SuspensionsFiles, User
+from src.core.db import db
+from src.core.db.analytics_cache import AnalyticsCache, analytics_cache
+from src.core.db.expressions import days_between
+from src.core.db.models import FileAttached, Suspension, SuspensionDailyRollup, SuspensionsFiles, User
+from src.core.db.repository.suspension import SuspensionRepository
+from src.core.db.user_cache import user_cache
 from src.settings import settings
-from tests.conftest import (clean_test_database, create_test_files,
-                            delete_files_in_folder,
+from tests.conftest import (clean_test_database, count_queries,
+                            create_test_files, delete_files_in_folder,
                             get_file_names_for_model_db)
 
 log = structlog.get_logger() if settings.FILE_NAME_IN_LOG is False else structlog.get_logger().bind(file_name=__file__)
@@ -221,6 +235,61 @@ async def test_user_get_suspension_analytics_url(
     await clean_test_database(async_db, User, Suspension)
 
 
+async def test_user_get_suspension_analytics_summary_only(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        suspensions_orm: Suspension
+) -> None:
+    """
+    Тестирует режим "только итоги" эндпоинта аналитики: итоги совпадают с полным ответом, списка простоев нет:
+    pytest -k test_user_get_suspension_analytics_summary_only -vs
+pytest -k test_analytics_cache_read_through_and_invalidation -vs
+    """
+    test_url = SUSPENSIONS_PATH + ANALYTICS  # /api/suspensions/analytics
+    user_orm_login = {"username": "user_fixture@f.com", "password": "testings"}
+    now = datetime.now(TZINFO).strftime(DATE_TIME_FORMAT)
+    two_days_ago = (datetime.now(TZINFO) - timedelta(days=2)).strftime(DATE_TIME_FORMAT)
+    search_params = {ANALYTICS_START: two_days_ago, ANALYTICS_FINISH: now}
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=user_orm_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        with count_queries() as full_queries:
+            full_response = await ac.get(test_url, params=search_params, headers=headers)
+        with count_queries() as summary_queries:
+            summary_response = await ac.get(test_url, params={**search_params, SUMMARY_ONLY: True}, headers=headers)
+    assert full_response.status_code == 200, f"{test_url} is not 200. Response: {full_response.__dict__}"
+    assert summary_response.status_code == 200, f"{test_url} is not 200. Response: {summary_response.__dict__}"
+    expected_summary = full_response.json()
+    del expected_summary[SUSPENSION_LIST]
+    assert summary_response.json() == expected_summary, (
+        f"Summary: {summary_response.json()} doesn't match expectations: {expected_summary}"
+    )
+    assert len(summary_queries) < len(full_queries), (
+        f"Summary queries: {len(summary_queries)} not less than full queries: {len(full_queries)}"
+    )
+    await log.ainfo(
+        "summary_only", summary=summary_response.json(), queries=len(summary_queries), full_queries=len(full_queries)
+    )
+    await clean_test_database(async_db, User, Suspension)
+
+
+async def test_suspension_duration_expression_dialects(async_db: AsyncSession) -> None:
+    """
+    Тестирует длительность простоя в сутках без julianday в репозитории: SQL своего диалекта для SQLite и Postgres,
+    одинаковый результат на тестовой БД:
+    pytest -k test_suspension_duration_expression_dialects -vs
+    """
+    duration = days_between(Suspension.suspension_start, Suspension.suspension_finish)
+    sqlite_sql = str(select(duration).compile(dialect=sqlite.dialect()))
+    postgres_sql = str(select(duration).compile(dialect=postgresql.dialect()))
+    assert "julianday" in sqlite_sql and "julianday" not in postgres_sql, f"SQLite: {sqlite_sql}, Postgres: {postgres_sql}"
+    assert "EXTRACT(EPOCH FROM" in postgres_sql, f"Postgres: {postgres_sql}"
+    start = datetime(2024, 1, 1, 8, 0)
+    days = await async_db.scalar(select(days_between(literal(start), literal(start + timedelta(days=1, hours=12)))))
+    assert abs(days - 1.5) < 1e-6, f"Duration: {days} days is not 1.5 days"
+    await log.ainfo("duration_expression", days=days, dialect=async_db.get_bind().dialect.name)
+
+
 async def test_user_patch_suspension_url(
         async_client: AsyncClient,
         async_db: AsyncSession,
@@ -1224,6 +1293,183 @@ async def test_user_get_my_suspension_url(
     await clean_test_database(async_db, User, Suspension, FileAttached, SuspensionsFiles)
 
 
+async def test_suspension_lists_constant_queries(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        suspensions_orm: Suspension,
+) -> None:
+    """
+    Тестирует, что количество запросов в БД при получении списков простоев не зависит от количества строк:
+    pytest -k test_suspension_lists_constant_queries -vs
+
+    scenarios - эндпоинты списков простоев (для каждого сверяется количество запросов до и после добавления строк).
+    """
+    user_orm_login = {"username": "user_fixture@f.com", "password": "testings"}
+    now = datetime.now(TZINFO)
+    scenarios = (
+        # api_url, params, name
+        (SUSPENSIONS_PATH + MAIN_ROUTE, {}, "get_all"),  # 1
+        (SUSPENSIONS_PATH + MY_SUSPENSIONS, {}, "get_my_suspensions"),  # 2
+        (
+            SUSPENSIONS_PATH + ANALYTICS,
+            {
+                ANALYTICS_START: (now - timedelta(days=3)).strftime(DATE_TIME_FORMAT),
+                ANALYTICS_FINISH: (now + timedelta(days=1)).strftime(DATE_TIME_FORMAT)
+            },
+            "get_analytics"
+        ),  # 3
+    )
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=user_orm_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        queries_before = {}
+        for api_url, params, name in scenarios:
+            user_cache.invalidate()  # the users and analytics are read from the db on both passes
+            analytics_cache.clear()
+            with count_queries() as statements:
+                response = await ac.get(api_url, params=params, headers=headers)
+            assert response.status_code == 200, f"{api_url} is not 200. Response: {response.__dict__}"
+            queries_before[name] = len(statements)
+        # add more suspensions (each with its own attached file) for both users:
+        file_objects = [FileAttached(name=f"constant_queries_{number}.txt", size=100) for number in range(20)]
+        async_db.add_all(file_objects)
+        await async_db.commit()
+        for number, file_object in enumerate(file_objects):
+            suspension = Suspension(
+                risk_accident=suspensions_orm[0].risk_accident,
+                description=f"constant_queries_{number}",
+                suspension_start=datetime.now() - timedelta(hours=number + 1),
+                suspension_finish=datetime.now() - timedelta(hours=number),
+                tech_process=suspensions_orm[0].tech_process,
+                implementing_measures=str(number),
+                user_id=suspensions_orm[number % len(suspensions_orm)].user_id,
+            )
+            async_db.add(suspension)
+            await async_db.commit()
+            async_db.add(SuspensionsFiles(suspension_id=suspension.id, file_id=file_object.id))
+        await async_db.commit()
+        for api_url, params, name in scenarios:
+            user_cache.invalidate()  # the users and analytics are read from the db on both passes
+            analytics_cache.clear()
+            with count_queries() as statements:
+                response = await ac.get(api_url, params=params, headers=headers)
+            assert response.status_code == 200, f"{api_url} is not 200. Response: {response.__dict__}"
+            assert len(statements) == queries_before[name], (
+                f"{name}: {len(statements)} queries after adding rows, expected {queries_before[name]}"
+            )
+            await log.ainfo(f"{name}", queries=len(statements), statements=statements)
+        response = await ac.get(SUSPENSIONS_PATH + MAIN_ROUTE, headers=headers)
+        suspensions_with_files = [_ for _ in response.json() if _[SUSPENSION_DESCRIPTION].startswith("constant")]
+        for suspension_response in suspensions_with_files:
+            number = suspension_response[SUSPENSION_DESCRIPTION].split("_")[-1]
+            assert suspension_response[FILES_SET_TO] == [f"constant_queries_{number}.txt"], (
+                f"Suspension files: {suspension_response[FILES_SET_TO]} not as expected"
+            )
+    await clean_test_database(async_db, User, Suspension, FileAttached, SuspensionsFiles)
+
+
+async def test_suspension_lists_cursor_pagination(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        suspensions_orm: Suspension,
+) -> None:
+    """
+    Тестирует keyset-пагинацию списков простоев: обход страниц по курсору из заголовка ответа:
+    pytest -k test_suspension_lists_cursor_pagination -vs
+
+    scenarios - эндпоинты списков простоев, постраничный обход которых должен совпасть с полным списком.
+    """
+    user_orm_login = {"username": "user_fixture@f.com", "password": "testings"}
+    scenarios = (
+        # api_url, limit, name
+        (SUSPENSIONS_PATH + MAIN_ROUTE, 1, "get_all_by_1"),  # 1
+        (SUSPENSIONS_PATH + MAIN_ROUTE, 3, "get_all_by_3"),  # 2
+        (SUSPENSIONS_PATH + MY_SUSPENSIONS, 1, "get_my_suspensions_by_1"),  # 3
+    )
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=user_orm_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        for api_url, limit, name in scenarios:
+            response = await ac.get(api_url, headers=headers)
+            assert response.status_code == 200, f"{api_url} is not 200. Response: {response.__dict__}"
+            assert NEXT_CURSOR not in response.headers, f"{name}: cursor is not expected without limit"
+            expected_ids = [suspension["id"] for suspension in response.json()]
+            paginated_ids = []
+            params = {PAGE_LIMIT: limit}
+            while True:
+                response = await ac.get(api_url, params=params, headers=headers)
+                assert response.status_code == 200, f"{api_url} is not 200. Response: {response.__dict__}"
+                assert len(response.json()) <= limit, f"{name}: page size {len(response.json())} exceeds {limit}"
+                paginated_ids += [suspension["id"] for suspension in response.json()]
+                if NEXT_CURSOR not in response.headers:
+                    break
+                params = {PAGE_LIMIT: limit, PAGE_CURSOR: response.headers[NEXT_CURSOR]}
+            assert paginated_ids == expected_ids, f"{name}: {paginated_ids} not as expected: {expected_ids}"
+            await log.ainfo(f"{name}", paginated_ids=paginated_ids)
+        response = await ac.get(
+            SUSPENSIONS_PATH + MAIN_ROUTE, params={PAGE_LIMIT: 1, PAGE_CURSOR: "not_a_cursor"}, headers=headers
+        )
+        assert response.status_code == 422, f"Invalid cursor is not 422. Response: {response.__dict__}"
+    await clean_test_database(async_db, User, Suspension)
+
+
+async def test_user_search_suspensions_url(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        suspensions_orm: Suspension,
+) -> None:
+    """
+    Тестирует полнотекстовый поиск простоев по описанию и предпринятым действиям:
+    pytest -k test_user_search_suspensions_url -vs
+
+    Индекс должен следовать за изменением и удалением простоев в БД.
+    scenarios - поисковые запросы и номера ожидаемых простоев из suspensions_orm.
+    """
+    test_url = SUSPENSIONS_PATH + SEARCH  # /api/suspensions/search
+    user_orm_login = {"username": "user_fixture@f.com", "password": "testings"}
+    edited = (
+        # description, measures
+        ("Сбой в работе рутера", "Перезагрузка оборудования"),
+        ("Сбой подключения к интернет", "Звонок провайдеру"),
+        ("Отключение электричества", "Перезагрузка рутера"),
+    )
+    for suspension, (description, measures) in zip(suspensions_orm, edited):
+        suspension.description, suspension.implementing_measures = description, measures
+    await async_db.commit()
+    ids = [suspension.id for suspension in suspensions_orm]
+    scenarios = (
+        # search_text, expected_numbers, name
+        ("рутер", {0, 2}, "word prefix in description or in measures"),  # 1
+        ("СБОЙ", {0, 1}, "case insensitive query"),  # 2
+        ("сбой рутера", {0}, "all words of query"),  # 3
+        ("_1_", set(), "old description is removed from index"),  # 4
+    )
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=user_orm_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        for search_text, expected_numbers, name in scenarios:
+            response = await ac.get(test_url, params={SEARCH_TEXT: search_text}, headers=headers)
+            assert response.status_code == 200, f"{name}: {test_url} is not 200. Response: {response.__dict__}"
+            found = {suspension["id"] for suspension in response.json()}
+            expected = {ids[number] for number in expected_numbers}
+            assert found == expected, f"{name}: found {found} not as expected: {expected}"
+            await log.ainfo(f"{name}", search_text=search_text, found=found)
+        response = await ac.get(test_url, params={SEARCH_TEXT: "рутер", PAGE_LIMIT: 1}, headers=headers)
+        next_response = await ac.get(
+            test_url,
+            params={SEARCH_TEXT: "рутер", PAGE_LIMIT: 1, PAGE_CURSOR: response.headers[NEXT_CURSOR]},
+            headers=headers
+        )
+        assert NEXT_CURSOR not in next_response.headers, f"The last page has a cursor: {next_response.headers}"
+        paginated = {suspension["id"] for suspension in response.json() + next_response.json()}
+        assert paginated == {ids[0], ids[2]}, f"Pages: {paginated} not as expected: {ids[0], ids[2]}"
+        await async_db.delete(suspensions_orm[0])
+        await async_db.commit()
+        response = await ac.get(test_url, params={SEARCH_TEXT: "рутер"}, headers=headers)
+        assert [suspension["id"] for suspension in response.json()] == [ids[2]], f"Deleted is found: {response.json()}"
+    await clean_test_database(async_db, User, Suspension)
+
+
 async def test_super_user_add_files_to_suspension_url(
         async_client: AsyncClient,
         async_db: AsyncSession,
@@ -1524,3 +1770,186 @@ async def test_super_user_delete_suspension_url(
             )
     await clean_test_database(async_db, User, Suspension, FileAttached, SuspensionsFiles)
     await delete_files_in_folder(files_to_delete_at_the_end)
+
+
+async def test_analytics_cache_read_through_and_invalidation(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        suspensions_orm: Suspension
+) -> None:
+    """
+    Тестирует кэш итогов аналитики: повторный запрос того же периода не считает итоги в БД, новый простой
+    через API и простой, записанный другим процессом (воркер мониторинга) в обход сервиса, меняют версию данных
+    простоев, и итоги считаются заново (LRU ограничен по числу записей):
+    pytest -k test_analytics_cache_read_through_and_invalidation -vs
+    """
+    test_url = SUSPENSIONS_PATH + ANALYTICS  # /api/suspensions/analytics
+    user_orm_login = {"username": "user_fixture@f.com", "password": "testings"}
+    now = datetime.now(TZINFO)
+    search_params = {
+        ANALYTICS_START: (now - timedelta(days=3)).strftime(DATE_TIME_FORMAT),
+        ANALYTICS_FINISH: (now + timedelta(days=1)).strftime(DATE_TIME_FORMAT),
+        SUMMARY_ONLY: True,
+    }
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=user_orm_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        first_response = await ac.get(test_url, params=search_params, headers=headers)
+        hits = analytics_cache.hits
+        with count_queries() as statements:
+            cached_response = await ac.get(test_url, params=search_params, headers=headers)
+        assert cached_response.json() == first_response.json(), f"Cached: {cached_response.json()}"
+        assert analytics_cache.hits == hits + 1, f"No cache hit: {analytics_cache.hits}"
+        assert not [statement for statement in statements if "FROM suspensions" in statement], statements
+        response = await ac.post(
+            SUSPENSIONS_PATH + POST_SUSPENSION_FORM,
+            params={
+                ANALYTICS_START: (now - timedelta(minutes=10)).strftime(DATE_TIME_FORMAT),
+                ANALYTICS_FINISH: (now - timedelta(minutes=5)).strftime(DATE_TIME_FORMAT),
+                SUSPENSION_DESCRIPTION: "analytics_cache",
+                IMPLEMENTING_MEASURES: "test_measures",
+                TECH_PROCESS: json.loads(settings.TECH_PROCESS)["DU_25"],
+                RISK_ACCIDENT_SOURCE: json.loads(settings.RISK_SOURCE)["ANOTHER"]
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200, f"Suspension is not created. Response: {response.__dict__}"
+        fresh_response = await ac.get(test_url, params=search_params, headers=headers)
+        assert fresh_response.json()[SUSPENSION_TOTAl] == first_response.json()[SUSPENSION_TOTAl] + 1, (
+            f"Stale analytics after a new suspension: {fresh_response.json()}"
+        )
+        async with db.async_session_maker(bind=async_db.bind) as session:  # another process: no service, no hooks
+            session.add(Suspension(
+                risk_accident=suspensions_orm[0].risk_accident,
+                description="analytics_cache_other_process",
+                suspension_start=datetime.now() - timedelta(hours=1),
+                suspension_finish=datetime.now() - timedelta(minutes=30),
+                tech_process=suspensions_orm[0].tech_process,
+                implementing_measures="analytics_cache_other_process",
+                user_id=suspensions_orm[0].user_id,
+            ))
+            await session.commit()
+        other_process_response = await ac.get(test_url, params=search_params, headers=headers)
+    assert other_process_response.json()[SUSPENSION_TOTAl] == first_response.json()[SUSPENSION_TOTAl] + 2, (
+        f"Stale analytics after a suspension of another process: {other_process_response.json()}"
+    )
+
+    async def compute() -> int:
+        return 1
+
+    cache = AnalyticsCache(max_entries=2, ttl=60)
+    day = datetime(2024, 1, 1)
+    key = ("count", 1, day, day + timedelta(days=1))
+    for data_version, misses in (((1,), 1), ((1,), 1), ((2,), 2)):
+        await cache.read_through(key, data_version, compute)
+        assert cache.misses == misses, f"Data version {data_version}: {cache.misses} misses != {misses}"
+    for number in range(3):
+        await cache.read_through(("count", None, day, day + timedelta(days=number)), (2,), compute)
+    assert len(cache._entries) == 2 and key not in cache._entries, "LRU is not bounded"
+    await clean_test_database(async_db, User, Suspension)
+
+
+async def test_daily_rollup_incremental_and_period_totals(
+        async_db: AsyncSession,
+        user_orm: User
+) -> None:
+    """
+    Тестирует дневные итоги простоев: триггеры ведут итоги при вставке, изменении и удалении так же,
+    как их пересобирает backfill, а итоги периода по дневным итогам и краям совпадают с итогами по простоям:
+    pytest -k test_daily_rollup_incremental_and_period_totals -vs
+    """
+    day = datetime(2024, 1, 1)
+    tech_process = next(iter(json.loads(settings.TECH_PROCESS).values()))
+    suspensions = [
+        Suspension(
+            risk_accident=risk_accident,
+            description="daily_rollup",
+            suspension_start=day + timedelta(hours=hours),
+            suspension_finish=day + timedelta(hours=hours, minutes=minutes),
+            tech_process=tech_process,
+            implementing_measures="daily_rollup",
+            user_id=user_orm.id,
+        ) for hours, minutes, risk_accident in (
+            (10, 30, "first"), (12, 90, "first"), (20, 5, None), (30, 60, "first"), (52, 15, "first"), (80, 45, None)
+        )
+    ]
+    async_db.add_all(suspensions)
+    await async_db.commit()
+    suspensions[1].suspension_finish = suspensions[1].suspension_start + timedelta(minutes=10)  # the day max shrinks
+    suspensions[4].suspension_start += timedelta(days=1)  # moves to another day
+    suspensions[4].suspension_finish += timedelta(days=1)
+    await async_db.delete(suspensions[0])
+    await async_db.commit()
+
+    async def rollup_rows() -> list[tuple]:
+        rows = await async_db.execute(select(
+            SuspensionDailyRollup.day, SuspensionDailyRollup.risk_accident, SuspensionDailyRollup.suspensions_total,
+            SuspensionDailyRollup.total_minutes, SuspensionDailyRollup.max_minutes,
+        ).where(SuspensionDailyRollup.user_id == user_orm.id).order_by(
+            SuspensionDailyRollup.day, SuspensionDailyRollup.risk_accident
+        ))
+        return [(*row[:3], round(row[3], 3), round(row[4], 3)) for row in rows.all()]
+
+    incremental = await rollup_rows()
+    assert incremental[0] == (day.date(), "", 1, 5.0, 5.0), f"Wrong rollup of the first day: {incremental}"
+    assert incremental[1] == (day.date(), "first", 1, 10.0, 10.0), f"Max is not recomputed: {incremental}"
+    await SuspensionRepository(async_db).rebuild_daily_rollup()
+    assert await rollup_rows() == incremental, f"Triggers and backfill disagree: {incremental}"
+    for start_sample, finish_sample in (
+            (day + timedelta(hours=11), day + timedelta(days=4)),  # edges and whole days
+            (day, day + timedelta(days=3, hours=9)),
+            (day + timedelta(hours=11), day + timedelta(hours=23)),  # no whole days
+    ):
+        period_totals = SuspensionRepository.get_period_totals(user_orm.id, start_sample, finish_sample)
+        totals = (await async_db.execute(select(period_totals))).one()
+        raw = (await async_db.execute(select(
+            func.count(Suspension.id),
+            func.sum(days_between(Suspension.suspension_start, Suspension.suspension_finish)),
+            func.max(days_between(Suspension.suspension_start, Suspension.suspension_finish)),
+        ).where(
+            Suspension.user_id == user_orm.id,
+            Suspension.suspension_start.between(start_sample, finish_sample),
+        ))).one()
+        assert totals[0] == raw[0], f"Count {totals} != {raw} for {start_sample} - {finish_sample}"
+        assert totals[1] == pytest.approx(raw[1]) and totals[2] == pytest.approx(raw[2]), f"{totals} != {raw}"
+    await clean_test_database(async_db, Suspension, User)
+    assert await rollup_rows() == [], "Rollup rows are left after deleting suspensions"
+
+
+async def test_suspension_conditional_get(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        suspensions_orm: Suspension
+) -> None:
+    """
+    Тестирует условный GET списка и простоя по id: If-None-Match с ETag ответа дает 304 без чтения простоев,
+    любая запись в простои, их файлы или пользователей меняет ETag:
+    pytest -k test_suspension_conditional_get -vs
+    """
+    user_orm_login = {"username": "user_fixture@f.com", "password": "testings"}
+    json_choice = next(iter(json.loads(settings.CHOICE_DOWNLOAD_FILES).values()))
+    scenarios = (
+        # api_url, params, name
+        (SUSPENSIONS_PATH + MAIN_ROUTE, {}, "get_all"),  # 1
+        (SUSPENSIONS_PATH + f"/{suspensions_orm[0].id}", {CHOICE_FORMAT: json_choice}, "get_by_id"),  # 2
+    )
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=user_orm_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        for api_url, params, name in scenarios:
+            response = await ac.get(api_url, params=params, headers=headers)
+            etag = response.headers.get(ETAG)
+            assert response.status_code == 200 and etag.startswith('W/"'), f"{name}: no ETag {response.headers}"
+            with count_queries() as statements:
+                not_modified = await ac.get(api_url, params=params, headers={**headers, IF_NONE_MATCH: etag})
+            assert not_modified.status_code == 304 and not_modified.content == b"", f"{name}: {not_modified}"
+            assert not_modified.headers[ETAG] == etag, f"{name}: ETag of 304 {not_modified.headers}"
+            assert not [statement for statement in statements if "FROM suspensions" in statement], statements
+            other_page = await ac.get(api_url, params={**params, PAGE_LIMIT: 1}, headers={**headers, IF_NONE_MATCH: etag})
+            assert other_page.status_code == 200, f"{name}: ETag does not depend on the query"
+            suspensions_orm[0].description = f"conditional_get_{name}"  # any write changes the version
+            await async_db.commit()
+            modified = await ac.get(api_url, params=params, headers={**headers, IF_NONE_MATCH: etag})
+            assert modified.status_code == 200 and modified.headers[ETAG] != etag, f"{name}: stale {modified}"
+            assert f"conditional_get_{name}" in modified.text, f"{name}: stale body {modified.text}"
+    await clean_test_database(async_db, User, Suspension)
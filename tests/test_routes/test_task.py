@@ -12,6 +12,12 @@ pytest -k test_user_get_all_tasks_url -vs
 pytest -k test_user_get_all_tasks_opened_url -vs
 pytest -k test_user_get_my_tasks_ordered_url -vs
 pytest -k test_user_get_my_tasks_todo_url -vs
+pytest -k test_task_lists_constant_queries -vs
+pytest -k test_task_lists_cursor_pagination -vs
+pytest -k test_task_pages_with_null_keys -vs
+pytest -k test_task_lists_conditional_get -vs
+pytest -k test_task_lists_etag_changes_next_day -vs
+pytest -k test_user_search_tasks_url -vs
 pytest -k test_user_post_task_form_url -vs
 pytest -k test_user_post_task_with_files_form_url -vs
 pytest -k test_user_patch_task_url -vs
@@ -27,6 +33,7 @@ print(f'RESPONSE__dict__: {response.__dict__}')
 import json
 import os
 import sys
+from datetime import date, timedelta
 from pathlib import Path
 
 import pytest
@@ -38,9 +45,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from src.api.constants import *
 from src.core.db.models import FileAttached, Task, TasksFiles, User
+from src.core.db.repository import TaskRepository
+from src.core.db.user_cache import user_cache
 from src.settings import settings
-from tests.conftest import (clean_test_database, create_test_files,
-                            delete_files_in_folder,
+from tests.conftest import (clean_test_database, count_queries,
+                            create_test_files, delete_files_in_folder,
                             get_file_names_for_model_db)
 
 log = structlog.get_logger() if settings.FILE_NAME_IN_LOG is False else structlog.get_logger().bind(file_name=__file__)
@@ -1438,6 +1447,207 @@ async def test_user_get_my_tasks_todo_url(
     await clean_test_database(async_db, User, Task, FileAttached, TasksFiles)
 
 
+async def test_task_lists_constant_queries(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        tasks_orm: Task,
+) -> None:
+    """
+    Тестирует, что количество запросов в БД при получении списков задач не зависит от количества строк:
+    pytest -k test_task_lists_constant_queries -vs
+
+    scenarios - эндпоинты списков задач (для каждого сверяется количество запросов до и после добавления строк).
+    """
+    user_orm_login = {"username": "user_fixture@f.com", "password": "testings"}
+    scenarios = (
+        # api_url, name
+        (TASKS_PATH + MAIN_ROUTE, "get_all"),  # 1
+        (TASKS_PATH + GET_OPENED_ROUTE, "get_opened"),  # 2
+        (TASKS_PATH + MY_TASKS, "get_my_tasks_ordered"),  # 3
+        (TASKS_PATH + ME_TODO, "get_my_tasks_todo"),  # 4
+    )
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=user_orm_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        queries_before = {}
+        for api_url, name in scenarios:
+            user_cache.invalidate()  # the users are read from the db on both passes
+            with count_queries() as statements:
+                response = await ac.get(api_url, headers=headers)
+            assert response.status_code == 200, f"{api_url} is not 200. Response: {response.__dict__}"
+            queries_before[name] = len(statements)
+        # add more tasks (each with its own attached file) with different authors and executors:
+        file_objects = [FileAttached(name=f"constant_queries_{number}.txt", size=100) for number in range(20)]
+        async_db.add_all(file_objects)
+        await async_db.commit()
+        today = datetime.now().date()
+        for number, file_object in enumerate(file_objects):
+            task = Task(
+                task=f"constant_queries_{number}",
+                description=f"constant_queries_{number}",
+                task_start=today,
+                deadline=today + timedelta(days=number),
+                tech_process=tasks_orm[0].tech_process,
+                user_id=tasks_orm[number % len(tasks_orm)].user_id,
+                executor_id=tasks_orm[(number + 1) % len(tasks_orm)].executor_id,
+                is_archived=0
+            )
+            async_db.add(task)
+            await async_db.commit()
+            async_db.add(TasksFiles(task_id=task.id, file_id=file_object.id))
+        await async_db.commit()
+        for api_url, name in scenarios:
+            user_cache.invalidate()  # the users are read from the db on both passes
+            with count_queries() as statements:
+                response = await ac.get(api_url, headers=headers)
+            assert response.status_code == 200, f"{api_url} is not 200. Response: {response.__dict__}"
+            assert len(statements) == queries_before[name], (
+                f"{name}: {len(statements)} queries after adding rows, expected {queries_before[name]}"
+            )
+            await log.ainfo(f"{name}", queries=len(statements), statements=statements)
+        response = await ac.get(TASKS_PATH + MAIN_ROUTE, headers=headers)
+        tasks_with_files = [_ for _ in response.json() if _[TASK].startswith("constant")]
+        assert len(tasks_with_files) == len(file_objects), f"Tasks: {len(tasks_with_files)} not as expected"
+        for task_response in tasks_with_files:
+            number = task_response[TASK].split("_")[-1]
+            assert task_response[FILES_SET_TO] == [f"constant_queries_{number}.txt"], (
+                f"Task files: {task_response[FILES_SET_TO]} not as expected"
+            )
+    await clean_test_database(async_db, User, Task, FileAttached, TasksFiles)
+
+
+async def test_task_lists_cursor_pagination(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        tasks_orm: Task,
+) -> None:
+    """
+    Тестирует keyset-пагинацию списков задач: обход страниц по курсору из заголовка ответа:
+    pytest -k test_task_lists_cursor_pagination -vs
+
+    scenarios - эндпоинты списков задач, постраничный обход которых должен совпасть с полным списком.
+    """
+    user_orm_login = {"username": "user_fixture@f.com", "password": "testings"}
+    scenarios = (
+        # api_url, limit, name
+        (TASKS_PATH + MAIN_ROUTE, 1, "get_all_by_1"),  # 1
+        (TASKS_PATH + GET_OPENED_ROUTE, 3, "get_opened_by_3"),  # 2
+        (TASKS_PATH + MY_TASKS, 1, "get_my_tasks_ordered_by_1"),  # 3
+        (TASKS_PATH + ME_TODO, 2, "get_my_tasks_todo_by_2"),  # 4
+    )
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=user_orm_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        for api_url, limit, name in scenarios:
+            response = await ac.get(api_url, headers=headers)
+            assert response.status_code == 200, f"{api_url} is not 200. Response: {response.__dict__}"
+            expected_ids = [task["id"] for task in response.json()]
+            paginated_ids = []
+            params = {PAGE_LIMIT: limit}
+            while True:
+                response = await ac.get(api_url, params=params, headers=headers)
+                assert response.status_code == 200, f"{api_url} is not 200. Response: {response.__dict__}"
+                assert len(response.json()) <= limit, f"{name}: page size {len(response.json())} exceeds {limit}"
+                paginated_ids += [task["id"] for task in response.json()]
+                if NEXT_CURSOR not in response.headers:
+                    break
+                params = {PAGE_LIMIT: limit, PAGE_CURSOR: response.headers[NEXT_CURSOR]}
+            assert paginated_ids == expected_ids, f"{name}: {paginated_ids} not as expected: {expected_ids}"
+            await log.ainfo(f"{name}", paginated_ids=paginated_ids)
+    await clean_test_database(async_db, User, Task)
+
+
+async def test_task_pages_with_null_keys(async_db: AsyncSession, tasks_orm: Task) -> None:
+    """
+    Тестирует keyset-пагинацию задач без начала или дедлайна (NULL): такие задачи идут последними,
+    обход страниц через границу с ними не теряет и не повторяет задач:
+    pytest -k test_task_pages_with_null_keys -vs
+
+    scenarios - списки задач, ключ сортировки и направление: постраничный обход должен совпасть с ожидаемым порядком.
+    """
+    user_id = tasks_orm[0].user_id
+    for number in range(3):
+        async_db.add(Task(
+            task=f"null_keys_{number}",
+            description=f"null_keys_{number}",
+            task_start=None if number else tasks_orm[0].task_start,
+            deadline=None,
+            tech_process=tasks_orm[0].tech_process,
+            user_id=user_id,
+            executor_id=tasks_orm[0].executor_id,
+            is_archived=0
+        ))
+    await async_db.commit()
+    task_repository = TaskRepository(async_db)
+    scenarios = (
+        # list of tasks, key, descending, name
+        (task_repository.get_all, Task.task_start, True, "get_all"),  # 1
+        (lambda limit, cursor: task_repository.get_tasks_ordered(user_id, limit, cursor), Task.deadline, False,
+         "get_tasks_ordered"),  # 2
+    )
+    for get_tasks, key, descending, name in scenarios:
+        tasks, _ = await get_tasks(None, None)
+        with_keys = sorted(
+            [task for task in tasks if getattr(task, key.key) is not None],
+            key=lambda task: (getattr(task, key.key), task.id),
+            reverse=descending
+        )
+        without_keys = sorted([task for task in tasks if getattr(task, key.key) is None], key=lambda task: task.id,
+                              reverse=descending)
+        expected_ids = [task.id for task in with_keys + without_keys]
+        assert without_keys, f"{name}: no tasks with NULL {key.key}"
+        assert [task.id for task in tasks] == expected_ids, f"{name}: tasks with NULL {key.key} are not the last"
+        for limit in (1, 2, 3):
+            paginated_ids, cursor = [], None
+            while True:
+                tasks, cursor = await get_tasks(limit, cursor)
+                assert len(tasks) <= limit, f"{name}: page size {len(tasks)} exceeds {limit}"
+                paginated_ids += [task.id for task in tasks]
+                if cursor is None:
+                    break
+            assert paginated_ids == expected_ids, f"{name} by {limit}: {paginated_ids} != {expected_ids}"
+    await clean_test_database(async_db, User, Task)
+
+async def test_user_search_tasks_url(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        tasks_orm: Task,
+) -> None:
+    """
+    Тестирует полнотекстовый поиск задач по названию и описанию: pytest -k test_user_search_tasks_url -vs
+
+    scenarios - поисковые запросы и номера ожидаемых задач из tasks_orm.
+    """
+    test_url = TASKS_PATH + SEARCH  # /api/tasks/search
+    user_orm_login = {"username": "user_fixture@f.com", "password": "testings"}
+    edited = (
+        # task, description
+        ("Замена рутера", "Закупить и установить новый рутер"),
+        ("Резервный канал", "Подключить второго провайдера интернет"),
+    )
+    for task, (name, description) in zip(tasks_orm, edited):
+        task.task, task.description = name, description
+    await async_db.commit()
+    ids = [task.id for task in tasks_orm]
+    scenarios = (
+        # search_text, expected_numbers, name
+        ("рутер", {0}, "word prefix in task name and description"),  # 1
+        ("интернет провайдер", {1}, "all words of query"),  # 2
+        ("-2_-1_", set(), "old description is removed from index"),  # 3
+    )
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=user_orm_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        for search_text, expected_numbers, name in scenarios:
+            response = await ac.get(test_url, params={SEARCH_TEXT: search_text}, headers=headers)
+            assert response.status_code == 200, f"{name}: {test_url} is not 200. Response: {response.__dict__}"
+            found = {task["id"] for task in response.json()}
+            expected = {ids[number] for number in expected_numbers}
+            assert found == expected, f"{name}: found {found} not as expected: {expected}"
+            await log.ainfo(f"{name}", search_text=search_text, found=found)
+    await clean_test_database(async_db, User, Task)
+
+
 async def test_super_user_add_files_to_task_url(
         async_client: AsyncClient,
         async_db: AsyncSession,
@@ -1738,3 +1948,82 @@ async def test_super_user_delete_task_url(
             )
     await clean_test_database(async_db, User, Task, FileAttached, TasksFiles)
     await delete_files_in_folder(files_to_delete_at_the_end)
+
+
+async def test_task_lists_conditional_get(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        tasks_orm: Task,
+) -> None:
+    """
+    Тестирует условный GET списков задач: If-None-Match с ETag ответа дает 304 без чтения задач,
+    привязка файла к задаче меняет ETag:
+    pytest -k test_task_lists_conditional_get -vs
+    """
+    user_orm_login = {"username": "user_fixture@f.com", "password": "testings"}
+    scenarios = (
+        # api_url, name
+        (TASKS_PATH + MAIN_ROUTE, "get_all"),  # 1
+        (TASKS_PATH + GET_OPENED_ROUTE, "get_opened"),  # 2
+    )
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=user_orm_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        etags = {}
+        for api_url, name in scenarios:
+            etags[name] = (await ac.get(api_url, headers=headers)).headers[ETAG]
+            with count_queries() as statements:
+                response = await ac.get(api_url, headers={**headers, IF_NONE_MATCH: f'"other", {etags[name]}'})
+            assert response.status_code == 304, f"{name}: {response.status_code} instead of 304"
+            assert not [statement for statement in statements if "FROM tasks" in statement], statements
+        file_object = FileAttached(name="conditional_get.txt", size=100)
+        async_db.add(file_object)
+        await async_db.commit()
+        async_db.add(TasksFiles(task_id=tasks_orm[0].id, file_id=file_object.id))
+        await async_db.commit()
+        for api_url, name in scenarios:
+            response = await ac.get(api_url, headers={**headers, IF_NONE_MATCH: etags[name]})
+            assert response.status_code == 200 and response.headers[ETAG] != etags[name], f"{name}: stale ETag"
+    await clean_test_database(async_db, User, Task, FileAttached, TasksFiles)
+
+
+async def test_task_lists_etag_changes_next_day(
+        async_client: AsyncClient,
+        async_db: AsyncSession,
+        tasks_orm: Task,
+        monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирует ETag списков задач при смене даты: длительность задач считается от сегодняшнего дня,
+    поэтому на следующий день прежний ETag не дает 304 при неизменных данных:
+    pytest -k test_task_lists_etag_changes_next_day -vs
+    """
+    frozen_today = {"date": date(2026, 10, 18)}
+
+    class FrozenDate(date):
+        @classmethod
+        def today(cls) -> date:
+            return frozen_today["date"]
+
+    monkeypatch.setattr("src.api.services.conditional_get.date", FrozenDate)
+    monkeypatch.setattr("src.api.schema.tasks.date", FrozenDate)
+    user_orm_login = {"username": "user_fixture@f.com", "password": "testings"}
+    scenarios = (
+        # api_url, name
+        (TASKS_PATH + MAIN_ROUTE, "get_all"),  # 1
+        (TASKS_PATH + GET_OPENED_ROUTE, "get_opened"),  # 2
+    )
+    async with async_client as ac:
+        login_user_response = await ac.post(LOGIN, data=user_orm_login)
+        headers = {"Authorization": f"Bearer {login_user_response.json()['access_token']}"}
+        etags = {}
+        for api_url, name in scenarios:
+            etags[name] = (await ac.get(api_url, headers=headers)).headers[ETAG]
+            response = await ac.get(api_url, headers={**headers, IF_NONE_MATCH: etags[name]})
+            assert response.status_code == 304, f"{name}: {response.status_code} instead of 304"
+        frozen_today["date"] += timedelta(days=1)
+        for api_url, name in scenarios:
+            response = await ac.get(api_url, headers={**headers, IF_NONE_MATCH: etags[name]})
+            assert response.status_code == 200, f"{name}: {response.status_code} instead of 200 on the next day"
+            assert response.headers[ETAG] != etags[name], f"{name}: ETag of the previous day"
+    await clean_test_database(async_db, User, Task)
@@ -14,28 +14,59 @@ pytest -k test_super_user_patch_users_id -vs
 pytest -k test_user_patch_users_me -vs
 pytest -k test_super_user_get_api_users -vs
 pytest -k test_super_user_get_db_backup -vs
+pytest -k test_connection_probe_stub_server -vs
+pytest -k test_outage_detector_writes_one_suspension -vs
+pytest -k test_outage_detector_long_outage_backoff -vs
+pytest -k test_monitoring_scheduler_targets -vs
+pytest -k test_worker_leader_election -vs
+pytest -k test_online_db_backup -vs
+pytest -k test_incremental_db_backup_retention -vs
+pytest -k test_restore_db_point_in_time -vs
+pytest -k test_one_session_and_connection_per_request -vs
+pytest -k test_user_cache_hits_and_invalidation -vs
+pytest -k test_user_cache_sees_writes_of_other_processes -vs
 
 
 Для отладки рекомендуется использовать:
 print(f'response_dir: {dir(response)}')
 print(f'RESPONSE__dict__: {response.__dict__}')
 """
+import asyncio
 import json
 import os
+import socket
+import sqlite3
 import sys
-from datetime import date
+import time
+from datetime import date, datetime, timedelta
 
 import pytest
 import structlog
+from fastapi import Depends, FastAPI
 from httpx import AsyncClient
-from sqlalchemy import select
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, event, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from src.core.db.models import User
+from src.api.services import SuspensionService
+from src.core.db import db
+from src.core.db.models import Base, Suspension, User
+from src.core.db.repository import UsersRepository
+from src.core.db.user import get_user_db
+from src.core.db.user_cache import user_cache
+from src.core.enums import BackupKind, OutageState, RiskAccidentSource
 from src.api.constants import *
+from src.api.schemas import DBBackupReport, MonitoringTarget
+from src.services.connection_probe import ConnectionProbe
+from src.core.exceptions.exceptions import RestorePointNotFoundException
+from src.services.db_backup import DBBackupService, restore_snapshot, select_retained
+from src.services.monitoring_scheduler import MonitoringScheduler
+from src.services.outage_detector import OutageDetector
+from src.services.register_connection_errors import ConnectionErrorService
 from src.settings import settings
-from tests.conftest import remove_all
+from src.worker import LeaderLock, run_worker
+from tests.conftest import clean_test_database, count_queries, remove_all
 
 log = structlog.get_logger() if settings.FILE_NAME_IN_LOG is False else structlog.get_logger().bind(file_name=__file__)
 pytestmark = pytest.mark.anyio  # make all test mark with `anyio` or use decorator: # @pytest.mark.anyio
@@ -50,6 +81,7 @@ async def test_unauthorized_tries_service_and_auth_urls(async_client: AsyncClien
         ("/api/services/test_url", {"url": "https://agidel-am.ru/"}, 200),
         ("/api/users/me", {}, 401),
         ("/api/services/db_backup", {}, 401),
+        ("/api/services/user_cache", {}, 401),
         ("/api/users/{id}", {}, 401),
         ("/api/users", {}, 401)
     )
@@ -63,6 +95,7 @@ async def test_unauthorized_tries_service_and_auth_urls(async_client: AsyncClien
     post_data_urls = (
         ("/api/auth/jwt/login", {"username": "some_unknown@username.com", "password": "unknown_password"}, 400),
         ("/api/auth/jwt/logout", {}, 401),
+        ("/api/services/db_restore", {}, 401),
     )
 
     async with async_client as ac:
@@ -375,3 +408,456 @@ async def test_super_user_get_db_backup(
     await log.ainfo("get_api_users_by_super_user", response=response_db_backup.json(), url=response_db_backup.url,
                     status_code=response_db_backup.status_code, login_data=login_data,
                     users_ids_after_remove=users_ids_after_remove)
+
+
+async def test_connection_probe_stub_server(
+        async_client: AsyncClient,
+        stub_http_server: str,
+        monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирует неблокирующую проверку доступа к url на локальном сервере-заглушке:
+    pytest -k test_connection_probe_stub_server -vs
+
+    Доступный, отказывающий в соединении и зависший url опрашиваются параллельно: общее время - не сумма таймаутов.
+    """
+    monkeypatch.setattr(settings, "PROBE_READ_TIMEOUT", 0.3)
+    with socket.socket() as closed_socket:  # a port without a server: connection refused
+        closed_socket.bind(("127.0.0.1", 0))
+        down_url = "http://127.0.0.1:{}".format(closed_socket.getsockname()[1])
+    up_url, hang_url = stub_http_server + "/", stub_http_server + "/hang"
+    async with ConnectionProbe() as probe:
+        for _ in range(5):
+            started = time.perf_counter()
+            up, down, hang = await probe.probe_all((up_url, down_url, hang_url))
+            assert time.perf_counter() - started < 0.9, f"Urls are not probed concurrently: {up, down, hang}"
+        assert (up.is_up, up.status_code) == (True, 200), f"Stub server is not up: {up}"
+        assert set(up.percentiles_ms) == {f"p{percentile}" for percentile in settings.PROBE_LATENCY_PERCENTILES}
+        assert up.percentiles_ms["p50"] <= up.percentiles_ms["p99"], f"Percentiles are not ordered: {up}"
+        assert (down.is_up, down.error) == (False, "ConnectError"), f"Closed port is not down: {down}"
+        assert (hang.is_up, hang.error) == (False, "ReadTimeout"), f"Hanging url is not timed out: {hang}"
+        connection_service = ConnectionErrorService(probe=probe)
+        info_connections = await connection_service.check_connection(up_url, down_url)
+        assert (info_connections[up_url], info_connections[down_url]) == (200, URL_CONNECTION_ERROR), (
+            f"Info connections: {info_connections} not as expected"
+        )
+        with pytest.raises(ConnectionError):
+            await connection_service.check_connection(down_url, hang_url)
+        await log.ainfo("connection_probe", up=up, down=down, hang=hang)
+    async with async_client as ac:
+        response = await ac.get("/api/services/test_url", params={"url": up_url})
+        assert response.status_code == 200, f"test_url is not 200. Response: {response.__dict__}"
+        assert response.json()[up_url] == 200, f"Stub server is not up: {response.json()}"
+        response = await ac.get("/api/services/test_url", params={"url": down_url})
+        assert response.json()["error"] == "ConnectError", f"Closed port is not down: {response.json()}"
+
+
+async def test_outage_detector_writes_one_suspension(async_db: AsyncSession, stub_http_server: str) -> None:
+    """
+    Тестирует детектор простоев: ложная тревога и "мигание" связи не создают лишних простоев,
+    в простое пауза между проверками растет экспоненциально, простой записывается в БД один раз:
+    pytest -k test_outage_detector_writes_one_suspension -vs
+
+    scenarios - доступность url в очередной проверке и ожидаемые состояние, пауза и число простоев в БД.
+    """
+    with socket.socket() as closed_socket:  # a port without a server: connection refused
+        closed_socket.bind(("127.0.0.1", 0))
+        down_url = "http://127.0.0.1:{}".format(closed_socket.getsockname()[1])
+
+    async def session_for_service():
+        yield async_db
+
+    scenarios = (
+        # is_up, state, delay, suspensions_in_db, name
+        (False, OutageState.SUSPECT, 1, 0, "the first failure is only suspected"),  # 1
+        (True, OutageState.UP, 1, 0, "false alarm: no outage"),  # 2
+        (False, OutageState.SUSPECT, 1, 0, "the outage starts"),  # 3
+        (False, OutageState.DOWN, 1, 0, "down threshold is reached"),  # 4
+        (False, OutageState.DOWN, 2, 0, "backoff doubles the delay"),  # 5
+        (False, OutageState.DOWN, 4, 0, "backoff doubles the delay"),  # 6
+        (False, OutageState.DOWN, 4, 0, "backoff is limited"),  # 7
+        (True, OutageState.RECOVERING, 1, 0, "the first answer is not a recovery yet"),  # 8
+        (False, OutageState.DOWN, 4, 0, "flapping: the outage goes on"),  # 9
+        (True, OutageState.RECOVERING, 1, 0, "recovering again"),  # 10
+        (True, OutageState.UP, 1, 1, "up threshold is reached: the outage is written"),  # 11
+        (True, OutageState.UP, 1, 1, "no more suspensions while up"),  # 12
+    )
+    detector = OutageDetector(interval=1, down_threshold=2, up_threshold=2, backoff_max=4)
+    async with ConnectionProbe() as probe:
+        connection_service = ConnectionErrorService(sessionmaker=session_for_service, probe=probe)
+        example = dict(connection_service.suspension_example)
+        probed_at = {}
+        for number, (is_up, state, delay, suspensions_in_db, name) in enumerate(scenarios, start=1):
+            connection_service.target.urls = [stub_http_server + "/" if is_up else down_url]
+            probed_at[number] = datetime.now(TZINFO)
+            await connection_service.probe_and_register(detector)
+            suspensions = (await async_db.scalars(select(Suspension))).all()
+            match_values = (
+                ("State: ", state, detector.state),
+                ("Delay: ", delay, detector.delay),
+                ("Suspensions in db: ", suspensions_in_db, len(suspensions)),
+            )
+            for name_value, expected_value, exist_value in match_values:
+                assert expected_value == exist_value, f"{number} {name}: {name_value}{exist_value} != {expected_value}"
+    suspension = suspensions[0]
+    assert probed_at[3] <= suspension.suspension_start.replace(tzinfo=TZINFO) <= probed_at[4], (
+        f"Outage start {suspension.suspension_start} is not the first failure of the outage"
+    )
+    assert probed_at[10] <= suspension.suspension_finish.replace(tzinfo=TZINFO) <= probed_at[11], (
+        f"Outage finish {suspension.suspension_finish} is not the first answer of the recovery"
+    )
+    assert connection_service.suspension_example == example, "suspension_example is mutated"
+    await clean_test_database(async_db, Suspension)
+
+
+def test_outage_detector_long_outage_backoff() -> None:
+    """
+    Тестирует паузу детектора в долгом простое: после тысяч неудачных проверок пауза остается равной backoff_max
+    (без OverflowError), простой не теряется:
+    pytest -k test_outage_detector_long_outage_backoff -vs
+    """
+    detector = OutageDetector(interval=1.5, down_threshold=2, up_threshold=2, backoff_max=600)
+    outage_start = datetime.now(TZINFO)
+    for number in range(1, 1201):
+        detector.register(False, outage_start + timedelta(seconds=number))
+        assert detector.delay <= detector.backoff_max, f"{number}: delay {detector.delay} > {detector.backoff_max}"
+    assert detector.state == OutageState.DOWN, f"State: {detector.state} != {OutageState.DOWN}"
+    assert detector.delay == detector.backoff_max, f"Delay: {detector.delay} != {detector.backoff_max}"
+    assert detector.outage_start == outage_start + timedelta(seconds=1), f"Outage start: {detector.outage_start}"
+
+
+async def test_monitoring_scheduler_targets(async_db: AsyncSession, stub_http_server: str) -> None:
+    """
+    Тестирует планировщик мониторинга нескольких целей: простой записывается с тех-процессом и источником угроз
+    своей цели, одновременных проверок - не больше concurrency:
+    pytest -k test_monitoring_scheduler_targets -vs
+    """
+    with socket.socket() as closed_socket:  # a port without a server: connection refused
+        closed_socket.bind(("127.0.0.1", 0))
+        down_url = "http://127.0.0.1:{}".format(closed_socket.getsockname()[1])
+
+    async def session_for_service():
+        yield async_db
+
+    risk_accident = next(iter(RiskAccidentSource))
+    targets = [
+        MonitoringTarget(name="clients", urls=[down_url], tech_process="27", risk_accident=risk_accident.name),
+        MonitoringTarget(name="depository", urls=[stub_http_server + "/"], tech_process="26", risk_accident="ROUTER"),
+    ]
+    scheduler = MonitoringScheduler(targets, session_for_service)
+    for name in scheduler.detectors:
+        scheduler.detectors[name] = OutageDetector(interval=0, down_threshold=1, up_threshold=1)
+    for _ in range(2):  # clients: UP -> DOWN, depository stays UP
+        await asyncio.gather(*(scheduler.probe_target(name) for name in scheduler.services))
+    scheduler.services["clients"].target.urls = [stub_http_server + "/"]  # clients: DOWN -> RECOVERING -> UP
+    await asyncio.gather(*(scheduler.probe_target(name) for name in scheduler.services))
+    suspensions = (await async_db.scalars(select(Suspension))).all()
+    assert [(suspension.tech_process, suspension.risk_accident) for suspension in suspensions] == [
+        (27, risk_accident.value)
+    ], f"Suspensions: {suspensions} not attributed to the target clients"
+    await clean_test_database(async_db, Suspension)
+
+    hanging = [  # the stub answers /hang in 1 second: 4 probes by 2 at a time take 2 seconds
+        MonitoringTarget(name=f"hang_{number}", urls=[stub_http_server + "/hang"], tech_process="25",
+                         risk_accident="ROUTER")
+        for number in range(4)
+    ]
+    scheduler = MonitoringScheduler(hanging, session_for_service, concurrency=2)
+    started = time.perf_counter()
+    await asyncio.gather(*(scheduler.probe_target(name) for name in scheduler.services))
+    elapsed = time.perf_counter() - started
+    assert 2 <= elapsed < 3, f"4 probes with concurrency 2 took {elapsed} seconds"
+    await log.ainfo("monitoring_scheduler", elapsed=elapsed)
+
+
+async def test_worker_leader_election(tmp_path, monkeypatch) -> None:
+    """
+    Тестирует выбор лидера воркеров: блокировку держит только один, второй ждет в резерве
+    и становится лидером после ее освобождения:
+    pytest -k test_worker_leader_election -vs
+    """
+    monkeypatch.setattr(settings, "WORKER_LEADER_RETRY", 0.1)
+    lock_file = tmp_path / "worker.lock"
+    leader, standby = LeaderLock(lock_file), LeaderLock(lock_file)
+    assert leader.try_acquire(), "The first worker is not the leader"
+    assert lock_file.read_text() == str(os.getpid()), "The pid of the leader is not written"
+    assert not standby.try_acquire(), "Two workers hold the lock at the same time"
+    with pytest.raises(TimeoutError):  # the standby worker does not start monitors while the lock is held
+        await asyncio.wait_for(run_worker(standby), timeout=0.5)
+    assert not standby.is_acquired, "The standby worker took the lock of the leader"
+    leader.release()
+    assert standby.try_acquire(), "The standby worker is not the leader after the lock is released"
+    standby.release()
+
+
+async def test_online_db_backup(tmp_path) -> None:
+    """
+    Тестирует онлайн-бэкап SQLite: снимок делается порциями страниц, пока в БД пишут, проходит проверку
+    целостности и содержит строки на момент снимка; отсутствующая БД не создается пустой:
+    pytest -k test_online_db_backup -vs
+    """
+    source = tmp_path / "live.db"
+    with sqlite3.connect(source) as connection:
+        connection.execute("CREATE TABLE rows (id INTEGER PRIMARY KEY, payload TEXT)")
+        connection.executemany("INSERT INTO rows (payload) VALUES (?)", [("x" * 500,) for _ in range(5000)])
+    backup_service = DBBackupService()
+    backup_service.db_path = source
+    writes = 0
+
+    async def write_during_backup() -> None:
+        nonlocal writes
+        with sqlite3.connect(source) as writer:
+            for _ in range(20):
+                writer.execute("INSERT INTO rows (payload) VALUES ('new')")
+                writer.commit()
+                writes += 1
+                await asyncio.sleep(0.001)  # the backup runs in a thread: the event loop is not blocked
+
+    report, _ = await asyncio.gather(backup_service.make_copy_db(tmp_path / "backups"), write_during_backup())
+    assert writes == 20, "Writers were blocked by the backup"
+    assert report.integrity == "ok" and report.size_bytes > 0 and report.pages > 1, f"Bad report: {report}"
+    assert not list((tmp_path / "backups").glob("*.tmp")), "The temporary snapshot is left"
+    snapshot = tmp_path / "restored.db"
+    restore_snapshot(tmp_path / "backups" / report.file, snapshot)
+    with sqlite3.connect(snapshot) as connection:
+        total_rows = connection.execute("SELECT count(*) FROM rows").fetchone()[0]
+    assert 5000 <= total_rows <= 5020, f"Snapshot has {total_rows} rows"
+
+    backup_service.db_path = tmp_path / "absent.db"
+    assert await backup_service.make_copy_db(tmp_path / "backups") is None, "A backup of an absent db is made"
+    assert not backup_service.db_path.exists(), "The absent db is created by the backup"
+    await log.ainfo("online_db_backup", report=report.model_dump(), total_rows=total_rows)
+
+
+async def test_incremental_db_backup_retention(tmp_path) -> None:
+    """
+    Тестирует инкрементные сжатые бэкапы и ротацию дед-отец-сын: инкремент содержит только измененные страницы,
+    полный снимок + инкремент восстанавливают БД, ротация по манифесту хранит нужные бэкапы и их основы:
+    pytest -k test_incremental_db_backup_retention -vs
+    """
+    source, folder = tmp_path / "live.db", tmp_path / "backups"
+    with sqlite3.connect(source) as connection:
+        connection.execute("CREATE TABLE rows (id INTEGER PRIMARY KEY, payload TEXT)")
+        connection.executemany("INSERT INTO rows (payload) VALUES (?)", [(os.urandom(200).hex(),) for _ in range(5000)])
+    backup_service = DBBackupService()
+    backup_service.db_path = source
+    full = await backup_service.make_copy_db(folder)
+    with sqlite3.connect(source) as connection:
+        connection.execute("UPDATE rows SET payload = 'changed' WHERE id = 2500")
+        connection.execute("INSERT INTO rows (payload) VALUES ('new')")
+    incremental = await backup_service.make_copy_db(folder)
+    assert full.kind == BackupKind.FULL and full.changed_pages == full.pages, f"Bad full backup: {full}"
+    assert incremental.kind == BackupKind.INCREMENTAL and incremental.base == full.file, f"Bad: {incremental}"
+    assert 0 < incremental.changed_pages < full.pages // 10, f"Too many changed pages: {incremental}"
+    assert incremental.size_bytes < full.size_bytes // 10, f"Delta is not smaller: {incremental}, {full}"
+    assert full.size_bytes < source.stat().st_size, "Full backup is not compressed"
+    assert [backup.file for backup in backup_service.read_manifest(folder)] == [full.file, incremental.file]
+    restored = tmp_path / "restored.db"
+    restore_snapshot(folder / full.file, restored, folder / incremental.file)
+    with sqlite3.connect(restored) as connection:
+        assert connection.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert connection.execute("SELECT count(*) FROM rows").fetchone()[0] == 5001
+        assert connection.execute("SELECT payload FROM rows WHERE id = 2500").fetchone()[0] == "changed"
+
+    start = datetime(2024, 1, 1, 23, tzinfo=TZINFO)  # a full backup every monday, an increment every day
+    backups = []
+    for day in range(365):
+        created_at = start + timedelta(days=day)
+        is_full = created_at.weekday() == 0 or not backups
+        backups.append(DBBackupReport(
+            file=f"{day}", kind=BackupKind.FULL if is_full else BackupKind.INCREMENTAL,
+            base=None if is_full else next(b.file for b in reversed(backups) if b.kind == BackupKind.FULL),
+            created_at=created_at, size_bytes=1, pages=1, page_size=4096, changed_pages=1, duration_sec=0,
+            integrity="ok",
+        ))
+    retained = select_retained(backups, keep_daily=7, keep_weekly=4, keep_monthly=12, max_backups=50)
+    by_file = {backup.file: backup for backup in backups}
+    assert {str(day) for day in range(358, 365)} <= retained, "The last 7 days are not retained"
+    assert len({by_file[file].created_at.month for file in retained}) == 12, "Not every month is retained"
+    assert all(by_file[file].base in retained for file in retained if by_file[file].base), "A base is removed"
+    assert len(retained) < 40, f"Too many backups retained: {len(retained)}"
+    capped = select_retained(backups, keep_daily=7, keep_weekly=4, keep_monthly=12, max_backups=3)
+    assert {str(day) for day in range(362, 365)} <= capped and len(capped) == 4, f"Bad cap: {capped}"
+    backup_service.write_manifest(backups, folder)  # files of the manifest are absent: pruning doesn't need them
+    kept = await backup_service.remove_expired(backup_service.read_manifest(folder), folder)
+    assert {backup.file for backup in kept} == select_retained(backups), "Retention by the manifest is wrong"
+    assert backup_service.read_manifest(folder) == kept, "Manifest is not pruned"
+    await log.ainfo("incremental_db_backup", full=full.model_dump(), incremental=incremental.model_dump())
+
+
+async def test_restore_db_point_in_time(tmp_path) -> None:
+    """
+    Тестирует восстановление БД на момент времени: полный снимок + инкремент, число строк как при бэкапе,
+    миграции alembic до head, сохранение заменяемой БД бэкапом, новые версии данных для кэшей всех процессов:
+    pytest -k test_restore_db_point_in_time -vs
+    """
+    source, folder = tmp_path / "live.db", tmp_path / "backups"
+    sync_engine = create_engine(f"sqlite:///{source}")
+    Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+
+    def add_users(first: int, total: int) -> None:
+        with sqlite3.connect(source) as connection:
+            connection.executemany(
+                "INSERT INTO user (id, email, hashed_password, is_active, is_superuser, is_verified) "
+                "VALUES (?, ?, 'hash', 1, 0, 1)",
+                [(user_id, f"restore_{user_id}@f.com") for user_id in range(first, first + total)],
+            )
+
+    with sqlite3.connect(source) as connection:  # the db is one migration behind the head
+        connection.execute("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL PRIMARY KEY)")
+        connection.execute("INSERT INTO alembic_version VALUES ('b3f6a9d2e417')")
+    add_users(1, 100)
+    backup_service = DBBackupService()
+    backup_service.db_path = source
+    full = await backup_service.make_copy_db(folder)
+    add_users(101, 50)
+    incremental = await backup_service.make_copy_db(folder)
+    add_users(151, 50)
+    assert incremental.kind == BackupKind.INCREMENTAL and incremental.row_counts["user"] == 150
+
+    restored = tmp_path / "restored.db"
+    report = await backup_service.restore_db(incremental.created_at, folder, restored)
+    assert report.files == [full.file, incremental.file], f"Restored from: {report.files}"
+    assert report.row_counts == incremental.row_counts, f"Row counts: {report.row_counts}"
+    assert (report.revision_before, report.revision_after) == ("b3f6a9d2e417", "e1b8d4f6a2c7"), "No migration"
+    with sqlite3.connect(restored) as connection:
+        assert connection.execute("SELECT count(*) FROM user").fetchone()[0] == 150
+        assert connection.execute("SELECT count(*) FROM files_fts").fetchone()[0] == 0, "FTS index is absent"
+
+    report = await backup_service.restore_db(full.created_at, folder)  # the live db itself
+    assert report.row_counts["user"] == 100 and report.target == str(source), f"Bad restore: {report}"
+    with sqlite3.connect(source) as connection:
+        assert connection.execute("SELECT count(*) FROM user").fetchone()[0] == 100
+        user_version = connection.execute("SELECT version FROM data_versions WHERE table_name = 'user'").fetchone()
+        assert user_version == (101,), f"Data version is not bumped after the backup's 100: {user_version}"
+    pre_restore = backup_service.read_manifest(folder)[-1]
+    assert pre_restore.row_counts["user"] == 200, "The replaced db is not saved by a backup"
+    assert not list(tmp_path.glob("*.restore")), "The rebuilt file is left"
+    with pytest.raises(RestorePointNotFoundException):
+        await backup_service.restore_db(full.created_at - timedelta(seconds=1), folder)
+
+    await log.ainfo("restore_db", report=report.model_dump())
+
+
+async def test_one_session_and_connection_per_request(async_db_engine, monkeypatch) -> None:
+    """
+    Тестирует единицу работы запроса: сервис, его репозитории и менеджер пользователей получают одну сессию,
+    а все запросы и commit-ы запроса идут через одно соединение пула:
+    pytest -k test_one_session_and_connection_per_request -vs
+    """
+    monkeypatch.setattr(db, "engine", async_db_engine)  # the real get_session on the test database
+    checkouts = []
+    listener = lambda *args: checkouts.append(args)  # noqa: E731
+    event.listen(async_db_engine.sync_engine.pool, "checkout", listener)
+    app = FastAPI()
+
+    @app.get("/unit_of_work")
+    async def unit_of_work(
+            suspension_service: SuspensionService = Depends(),
+            users_repository: UsersRepository = Depends(),
+            user_db=Depends(get_user_db),
+    ) -> dict[str, int]:
+        sessions = {
+            id(suspension_service._session),
+            id(suspension_service._repository._session),
+            id(suspension_service._file_repository._session),
+            id(suspension_service._users_repository._session),
+            id(users_repository._session),
+            id(user_db.session),
+        }
+        for _ in range(3):  # every commit used to return the connection and to check out a new one
+            await users_repository.get_all_active()
+            await users_repository._session.commit()
+        return {"sessions": len(sessions), "checkouts": len(checkouts)}
+
+    try:
+        async with AsyncClient(app=app, base_url="http://testserver") as ac:
+            responses = [(await ac.get("/unit_of_work")).json() for _ in range(2)]
+    finally:
+        event.remove(async_db_engine.sync_engine.pool, "checkout", listener)
+    assert responses[0] == {"sessions": 1, "checkouts": 1}, f"Not one session and connection: {responses[0]}"
+    assert len(checkouts) == 2, f"Connections checked out by 2 requests: {len(checkouts)}"
+
+
+async def test_user_cache_hits_and_invalidation(async_client: AsyncClient, async_db: AsyncSession) -> None:
+    """
+    Тестирует справочник пользователей в памяти: повторный запрос текущего пользователя и поиск по id и email
+    не читают таблицу user, изменение пользователя через UserManager сбрасывает его в справочнике:
+    pytest -k test_user_cache_hits_and_invalidation -vs
+    """
+    login = {"username": "user_cache@nofoobar.com", "password": "testing_cache"}
+    user = User(email=login["username"], hashed_password=CryptContext(schemes=["bcrypt"]).hash(login["password"]))
+    async_db.add(user)
+    await async_db.commit()
+    try:
+        async with async_client as ac:
+            login_response = await ac.post(LOGIN, data=login)
+            headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+            misses = user_cache.misses
+            await ac.get("/api/users/me", headers=headers)  # miss: read from the db and put to the directory
+            with count_queries() as statements:
+                hits = user_cache.hits
+                response = await ac.get("/api/users/me", headers=headers)
+            assert response.status_code == 200, f"/api/users/me is not 200. Response: {response.__dict__}"
+            assert user_cache.hits == hits + 1 and user_cache.misses == misses + 1, f"No hit: {user_cache.stats}"
+            assert not [statement for statement in statements if "FROM user" in statement], statements
+            async with db.async_session_maker(bind=async_db.bind) as session:
+                users_repository = UsersRepository(session)
+                with count_queries() as statements:
+                    by_id = await users_repository.get(user.id)
+                    by_email = await users_repository.get_by_email(login["username"])
+                assert not [statement for statement in statements if "FROM user" in statement], statements
+                assert by_id is by_email and by_id.email == login["username"], f"{by_id} is not {by_email}"
+            response = await ac.patch("/api/users/me", json={"email": "user_cache_new@nofoobar.com"}, headers=headers)
+            assert response.status_code == 200, f"/api/users/me is not patched. Response: {response.__dict__}"
+            assert user.id not in user_cache._by_id, f"User is not invalidated: {user_cache.stats}"
+            response = await ac.get("/api/users/me", headers=headers)
+            assert response.json()["email"] == "user_cache_new@nofoobar.com", f"Stale user: {response.json()}"
+            async with db.async_session_maker(bind=async_db.bind) as session:
+                assert await UsersRepository(session).get_or_none_email(login["username"]) is None, "Stale email"
+    finally:
+        await remove_all(async_db, User, [user.id])
+    await log.ainfo("user_cache", stats=user_cache.stats)
+
+
+async def test_user_cache_sees_writes_of_other_processes(async_client: AsyncClient, async_db: AsyncSession) -> None:
+    """
+    Тестирует справочник пользователей при записи в обход хуков UserManager (другой процесс API, восстановление БД):
+    понижение суперпользователя и деактивация действуют сразу, а не по истечении USER_CACHE_TTL:
+    pytest -k test_user_cache_sees_writes_of_other_processes -vs
+    """
+    login = {"username": "user_cache_other@nofoobar.com", "password": "testing_cache"}
+    user = User(
+        email=login["username"],
+        hashed_password=CryptContext(schemes=["bcrypt"]).hash(login["password"]),
+        is_superuser=True
+    )
+    async_db.add(user)
+    await async_db.commit()
+    try:
+        async with async_client as ac:
+            login_response = await ac.post(LOGIN, data=login)
+            headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+            scenarios = (
+                # values written by another process, api_url, expected status, name
+                ({}, f"/api/users/{user.id}", 200, "superuser is cached"),  # 1
+                ({"is_superuser": False}, f"/api/users/{user.id}", 403, "demoted superuser"),  # 2
+                ({}, "/api/users/me", 200, "demoted user is cached"),  # 3
+                ({"is_active": False}, "/api/users/me", 401, "deactivated user"),  # 4
+            )
+            for number, (values, api_url, status_code, name) in enumerate(scenarios, start=1):
+                if values:
+                    async with db.async_session_maker(bind=async_db.bind) as session:  # no UserManager hooks
+                        await session.execute(update(User).where(User.id == user.id).values(**values))
+                        await session.commit()
+                else:
+                    await ac.get(api_url, headers=headers)  # put the user to the directory
+                misses = user_cache.misses
+                async_db.expunge_all()  # the requests share the test session: no user from the previous request
+                response = await ac.get(api_url, headers=headers)
+                assert response.status_code == status_code, f"{number} {name}: {response.status_code} != {status_code}"
+                if not values:
+                    assert user_cache.misses == misses, f"{number} {name}: user is read from db: {user_cache.stats}"
+    finally:
+        await remove_all(async_db, User, [user.id])